@@ -1,9 +1,9 @@
-import difflib
 import inspect
 from itertools import chain
 import logging
 import threading
 import operator
+import os
 import re
 import sys
 import warnings
@@ -12,14 +12,14 @@ from collections import OrderedDict
 from functools import wraps, partial
 from types import MethodType
 
-from flask import url_for, request, current_app
+from flask import Flask, url_for, request, current_app, has_app_context
+from flask import has_request_context
 from flask import make_response as original_flask_make_response
 
 from flask.signals import got_request_exception
 
 from referencing import Registry
 
-from werkzeug.utils import cached_property
 from werkzeug.datastructures import Headers
 from werkzeug.exceptions import (
     HTTPException,
@@ -30,11 +30,17 @@ from werkzeug.exceptions import (
 )
 
 from . import apidoc
+from .marshalling import MaskCache, StreamedList
 from .mask import ParseError, MaskError
+from .model import ModelBase
 from .namespace import Namespace
+from .payload import request_payload
 from .postman import PostmanCollectionV1
 from .resource import Resource
-from .swagger import Swagger
+from .codec import codec_for
+from .suggestions import RE_RULES, invalidate_route_index, route_index  # noqa
+from .swagger import Swagger, SpecsDocument, is_hidden
+from .validation import SCHEMA_ID
 from .utils import (
     default_id,
     camel_to_dash,
@@ -48,8 +54,6 @@ from ._http import HTTPStatus
 endpoint_from_view_func = import_check_view_func()
 
 
-RE_RULES = re.compile("(<.*>)")
-
 # List headers that should never be handled by Flask-RESTX
 HEADERS_BLACKLIST = ("Content-Length",)
 
@@ -57,6 +61,9 @@ DEFAULT_REPRESENTATIONS = [("application/json", output_json)]
 
 log = logging.getLogger(__name__)
 
+#: Matches the files cached by ``RESTX_SPECS_CACHE_DIR`` (after their API prefix)
+RE_SPECS_CACHE = re.compile(r"^([0-9a-f]+)\.json(?:\.gz)?$")
+
 
 class Api(object):
     """
@@ -103,6 +110,8 @@ class Api(object):
         scheme regardless of how the application is deployed. This is necessary for some deployments behind a reverse
         proxy.
     :param str default_swagger_filename: The default swagger filename.
+    :param bool split_specs: Also serve the Swagger specifications of each namespace,
+        built on demand, and load them in Swagger UI instead of the whole specifications
     """
 
     def __init__(
@@ -134,6 +143,7 @@ class Api(object):
         format_checker=None,
         url_scheme=None,
         default_swagger_filename="swagger.json",
+        split_specs=False,
         **kwargs,
     ):
         self.version = version
@@ -163,11 +173,19 @@ class Api(object):
         )
         self._schema = None
         self._schema_lock = threading.Lock()
+        self._swagger = None
+        self._specs_document = None
+        self._namespace_schemas = {}
+        self._namespace_documents = {}
+        self._warmed_up = False
         self.models = {}
         self._refresolver = None
+        self._refresolver_lock = threading.Lock()
+        self._definitions = {}
         self.format_checker = format_checker
         self.namespaces = []
         self.default_swagger_filename = default_swagger_filename
+        self.split_specs = split_specs
 
         self.ns_paths = dict()
 
@@ -268,6 +286,16 @@ class Api(object):
         app.config.setdefault("RESTX_MASK_HEADER", "X-Fields")
         app.config.setdefault("RESTX_MASK_SWAGGER", True)
         app.config.setdefault("RESTX_INCLUDE_ALL_MODELS", False)
+        app.config.setdefault("RESTX_VALIDATION_ENGINE", "jsonschema")
+        app.config.setdefault("RESTX_SPECS_WARMUP", False)
+        app.config.setdefault("RESTX_SPECS_MAX_AGE", 0)
+        app.config.setdefault("RESTX_SPECS_CACHE_DIR", None)
+        app.config.setdefault("RESTX_ERROR_404_HELP_BUDGET", 0.005)
+        app.config.setdefault("RESTX_ERROR_404_HELP_CACHE_SIZE", 1024)
+        if "RESTX_MASK_CACHE_SIZE" in app.config:
+            conf = app.extensions.setdefault("restx", {})
+            if "mask_cache" not in conf:
+                conf["mask_cache"] = MaskCache(app.config["RESTX_MASK_CACHE_SIZE"])
 
         # check for deprecated config variable names
         if "ERROR_404_HELP" in app.config:
@@ -278,6 +306,10 @@ class Api(object):
                 DeprecationWarning,
             )
 
+        # Resources may be registered until the first request
+        if app.config["RESTX_SPECS_WARMUP"] and self._add_specs:
+            app.before_request(self._warmup_once)
+
     def __getattr__(self, name):
         try:
             return getattr(self.default_namespace, name)
@@ -314,6 +346,22 @@ class Api(object):
                 resource_class_args=(self,),
             )
             self.endpoints.add(endpoint)
+        if self._add_specs and self.split_specs:
+            stem = os.path.splitext(self.default_swagger_filename)[0]
+            for view, url, endpoint in (
+                # Not on "/{stem}/" which is usually the documentation path
+                (SpecsIndexView, "/{0}/index.json", "specs_index"),
+                (NamespaceSwaggerView, "/{0}/<path:namespace>.json", "specs_namespace"),
+            ):
+                self._register_view(
+                    app_or_blueprint,
+                    view,
+                    self.default_namespace,
+                    url.format(stem),
+                    endpoint=endpoint,
+                    resource_class_args=(self,),
+                )
+                self.endpoints.add(endpoint)
 
     def _register_doc(self, app_or_blueprint):
         if self._add_specs and self._doc:
@@ -327,6 +375,7 @@ class Api(object):
 
         kwargs["endpoint"] = endpoint
         self.endpoints.add(endpoint)
+        self._reset_specs()
 
         if self.app is not None:
             self._register_view(self.app, resource, namespace, *urls, **kwargs)
@@ -391,6 +440,12 @@ class Api(object):
             # Add the url to the application or blueprint
             app.add_url_rule(rule, view_func=resource_func, **kwargs)
 
+        # The 404 suggestions are computed from the application rules
+        if self.blueprint_setup:
+            invalidate_route_index(self.blueprint_setup.app)
+        elif isinstance(app, Flask):
+            invalidate_route_index(app)
+
     def output(self, resource):
         """
         Wraps a resource (as a flask view function),
@@ -433,6 +488,8 @@ class Api(object):
             resp.headers["Content-Type"] = mediatype
             return resp
         elif mediatype == "text/plain":
+            if isinstance(data, StreamedList):
+                data = data.marshal()
             resp = original_flask_make_response(str(data), *args, **kwargs)
             resp.headers["Content-Type"] = "text/plain"
             return resp
@@ -508,7 +565,7 @@ class Api(object):
             self.register_resource(ns, r.resource, *urls, **r.kwargs)
         # Register models
         for name, definition in ns.models.items():
-            self.models[name] = definition
+            self._register_model(name, definition)
         if not self.blueprint and self.app is not None:
             self._configure_namespace_logger(self.app, ns)
 
@@ -543,6 +600,34 @@ class Api(object):
             self.endpoint("specs"), _scheme=self.url_scheme, _external=external
         )
 
+    @property
+    def specs_urls(self):
+        """
+        The namespaces Swagger specifications urls (with ``split_specs``),
+        as Swagger UI ``urls`` (ie. ``{"name": "ns", "url": "/swagger/ns.json"}``).
+
+        Namespaces without documented resources are omitted.
+
+        :rtype: list
+        """
+        external = None if self.url_scheme is None else True
+        endpoint = self.endpoint("specs_namespace")
+        return [
+            {
+                "name": ns.name,
+                "url": url_for(
+                    endpoint,
+                    namespace=ns.name,
+                    _scheme=self.url_scheme,
+                    _external=external,
+                ),
+            }
+            for ns in self.namespaces
+            if not all(
+                is_hidden(r.resource, route_doc=r.route_doc) for r in ns.resources
+            )
+        ]
+
     @property
     def base_url(self):
         """
@@ -561,19 +646,24 @@ class Api(object):
         """
         return url_for(self.endpoint("root"), _external=False)
 
-    @cached_property
+    @property
     def __schema__(self):
         """
         The Swagger specifications/schema for this API
 
+        The specifications are merged from fragments cached by namespace and resource
+        (see :meth:`invalidate_specs`).
+
         :returns dict: the schema as a serializable dict
         """
+        if not self._schema and self._specs_document is not None:
+            self._schema = self._specs_document.schema
         if not self._schema:
             # Guard schema initialization to avoid concurrent construction on first access
             with self._schema_lock:
                 if not self._schema:
                     try:
-                        self._schema = Swagger(self).as_dict()
+                        self._schema = self._build_schema()
                     except Exception:
                         # Log the source exception for debugging purpose
                         # and return an error message
@@ -582,6 +672,163 @@ class Api(object):
                         return {"error": msg}
         return self._schema
 
+    def namespace_schema(self, namespace):
+        """
+        The Swagger specifications of a single namespace: its paths,
+        tags and definitions (built on first use).
+
+        :param Namespace namespace: the namespace
+        :returns dict: the schema as a serializable dict
+        """
+        schema = self._namespace_schemas.get(namespace)
+        if schema is None:
+            with self._schema_lock:
+                schema = self._namespace_schemas.get(namespace)
+                if schema is None:
+                    try:
+                        schema = self._build_schema([namespace])
+                    except Exception:
+                        msg = "Unable to render schema"
+                        log.exception(msg)
+                        return {"error": msg}
+                    self._namespace_schemas[namespace] = schema
+        return schema
+
+    def _build_schema(self, namespaces=None):
+        # The schema lock must be held
+        if self._swagger is None:
+            self._swagger = Swagger(self)
+        return self._swagger.as_dict(namespaces)
+
+    def invalidate_specs(self, namespace=None, resource=None, model=None):
+        """
+        Invalidate the Swagger specifications after modifying some documentation in place
+        (ie. a resource ``__apidoc__``, a model or the API metadata).
+
+        Only the cached fragments of the given namespace, resource and/or model
+        are regenerated (all of them without arguments), then merged again.
+        Added namespaces, resources and models are picked up without calling
+        this method, and registering an error handler regenerates every fragment.
+
+        :param Namespace namespace: a namespace whose resources documentation changed
+        :param Resource resource: a resource whose documentation changed
+        :param Model model: a model whose documentation changed
+        """
+        if isinstance(model, ModelBase):
+            # The model schema is cached until it changes
+            model._invalidate()
+        with self._schema_lock:
+            if self._swagger is not None:
+                self._swagger.invalidate(namespace, resource, model)
+            self._reset_specs()
+
+    def _reset_specs(self):
+        # Merge the (unchanged) fragments again on next access
+        self._schema = None
+        self._specs_document = None
+        self._namespace_schemas = {}
+        self._namespace_documents = {}
+
+    def specs_document(self, namespace=None):
+        """
+        The Swagger specifications encoded once, as served by the specifications endpoint
+
+        :param Namespace namespace: get the specifications of this namespace only
+        :rtype: SpecsDocument
+        :returns: the encoded specifications or ``None`` if they can't be rendered
+        """
+        if namespace is not None:
+            document = self._namespace_documents.get(namespace)
+            if document is None:
+                schema = self.namespace_schema(namespace)
+                if "error" in schema:
+                    return None
+                document = SpecsDocument(schema, codec_for(current_app))
+                self._namespace_documents[namespace] = document
+            return document
+        document = self._specs_document
+        if document is None:
+            codec = codec_for(current_app)
+            cache = current_app.config.get("RESTX_SPECS_CACHE_DIR")
+            if cache:
+                document = self._cached_specs_document(cache, codec)
+            else:
+                document = self._build_specs_document(codec)
+            if document is None:
+                return None
+            self._specs_document = document
+        return document
+
+    def _build_specs_document(self, codec):
+        schema = self.__schema__
+        if "error" in schema:
+            return None
+        return SpecsDocument(schema, codec)
+
+    def _cached_specs_document(self, cache, codec):
+        try:
+            fingerprint = Swagger(self).fingerprint(type(codec), codec.settings)
+        except ValueError:
+            log.warning("Unable to fingerprint the specifications", exc_info=True)
+            return self._build_specs_document(codec)
+        prefix = "swagger-{0}-".format(self.endpoint("specs"))
+        path = os.path.join(cache, "{0}{1}.json".format(prefix, fingerprint))
+        document = SpecsDocument.load(path, codec)
+        if document is None:
+            document = self._build_specs_document(codec)
+            if document is not None:
+                try:
+                    document.dump(path)
+                except OSError:
+                    log.warning("Unable to cache the specifications", exc_info=True)
+                else:
+                    self._prune_specs_cache(cache, prefix, fingerprint)
+        return document
+
+    def _prune_specs_cache(self, cache, prefix, fingerprint):
+        # Only keep the current specifications of this API
+        for filename in os.listdir(cache):
+            stale = filename.startswith(prefix) and RE_SPECS_CACHE.match(
+                filename[len(prefix) :]
+            )
+            if stale and stale.group(1) != fingerprint:
+                try:
+                    os.unlink(os.path.join(cache, filename))
+                except OSError:
+                    pass
+
+    def _warmup_once(self):
+        if not self._warmed_up:
+            self._warmed_up = True
+            self.warmup()
+
+    def warmup(self):
+        """
+        Build and encode the Swagger specifications (and their gzipped variant)
+        ahead of the first specifications request.
+
+        Must be called once all the resources are registered, within the application
+        context. Outside of a request, the specifications are built in a test request
+        context (the base path honors ``APPLICATION_ROOT``).
+
+        :rtype: SpecsDocument
+        :returns: the encoded specifications or ``None`` if they can't be rendered
+        """
+        if not has_app_context():
+            if self.app is None or self.blueprint:
+                raise RuntimeError(
+                    "The specifications warmup needs an application context"
+                )
+            with self.app.app_context():
+                return self.warmup()
+        if not has_request_context():
+            with current_app.test_request_context():
+                return self.warmup()
+        document = self.specs_document()
+        if document is not None:
+            document.gzipped
+        return document
+
     @property
     def _own_and_child_error_handlers(self):
         rv = OrderedDict()
@@ -597,6 +844,8 @@ class Api(object):
             # Register an error handler for a given exception
             def wrapper(func):
                 self.error_handlers[exception] = func
+                # Operations documenting the exception with ``:raises`` now reference it
+                self.invalidate_specs()
                 return func
 
             return wrapper
@@ -791,13 +1040,7 @@ class Api(object):
         return resp
 
     def _help_on_404(self, message=None):
-        rules = dict(
-            [
-                (RE_RULES.sub("", rule.rule), rule.rule)
-                for rule in current_app.url_map.iter_rules()
-            ]
-        )
-        close_matches = difflib.get_close_matches(request.path, rules.keys())
+        close_matches = route_index(current_app).suggest(request.path)
         if close_matches:
             # If we already have a message, add punctuation and continue it.
             message = "".join(
@@ -806,7 +1049,7 @@ class Api(object):
                     "You have requested this URI [",
                     request.path,
                     "] but did you mean ",
-                    " or ".join((rules[match] for match in close_matches)),
+                    " or ".join(close_matches),
                     " ?",
                 )
             )
@@ -825,50 +1068,50 @@ class Api(object):
     @property
     def payload(self):
         """Store the input payload in the current request context"""
-        return request.get_json()
+        return request_payload().json
 
     @property
     def refresolver(self):
-        if not self._refresolver:
-            # Create a registry that can resolve references within our schema
-            registry = Registry()
-            schema = self.__schema__
-
-            # If schema has definitions, register it
-            if "definitions" in schema:
-                schema_id = schema.get("$id", "http://localhost/schema.json")
-                registry = registry.with_resource(schema_id, schema)
-            else:
-                # If no definitions in schema, register all models individually
-                for name, model in self.models.items():
-                    model_schema = model.__schema__
-                    # Add $id to the model schema so it can be referenced
-                    if "$id" not in model_schema:
-                        model_schema = model_schema.copy()
-                        model_schema["$id"] = (
-                            f"http://localhost/schema.json#/definitions/{name}"
-                        )
-                    registry = registry.with_resource(
-                        f"http://localhost/schema.json#/definitions/{name}",
-                        model_schema,
-                    )
+        """
+        The registry resolving models references on payload validation
 
-                # Also register the root schema with definitions
-                if self.models:
-                    definitions = {}
+        It is built from the registered models only (without generating
+        the Swagger specifications) and kept up to date as models are registered.
+        """
+        if self._refresolver is None:
+            with self._refresolver_lock:
+                if self._refresolver is None:
+                    self._definitions = {}
+                    resources = []
                     for name, model in self.models.items():
-                        definitions[name] = model.__schema__
+                        resources.append(self._definition_resource(name, model))
+                    resources.append(self._definitions_resource())
+                    self._refresolver = Registry().with_resources(resources)
+        return self._refresolver
 
-                    schema_with_definitions = {
-                        "$id": "http://localhost/schema.json",
-                        "definitions": definitions,
-                    }
-                    registry = registry.with_resource(
-                        "http://localhost/schema.json", schema_with_definitions
-                    )
+    def _register_model(self, name, definition):
+        self.models[name] = definition
+        self._reset_specs()
+        if self._refresolver is not None:
+            with self._refresolver_lock:
+                self._refresolver = self._refresolver.with_resources(
+                    [
+                        self._definition_resource(name, definition),
+                        self._definitions_resource(),
+                    ]
+                )
 
-            self._refresolver = registry
-        return self._refresolver
+    def _definition_resource(self, name, model):
+        uri = "{0}#/definitions/{1}".format(SCHEMA_ID, name)
+        schema = model.__schema__
+        self._definitions[name] = schema
+        # Add $id to the model schema so it can be referenced
+        if "$id" not in schema:
+            schema = dict(schema, **{"$id": uri})
+        return uri, schema
+
+    def _definitions_resource(self):
+        return SCHEMA_ID, {"$id": SCHEMA_ID, "definitions": dict(self._definitions)}
 
     @staticmethod
     def _blueprint_setup_add_url_rule_patch(
@@ -999,7 +1242,19 @@ class SwaggerView(Resource):
     """Render the Swagger specifications as JSON"""
 
     def get(self):
-        schema = self.api.__schema__
+        return self.render()
+
+    def render(self, namespace=None):
+        # Custom JSON representations are given the specifications to encode
+        if self.api.representations.get("application/json") is output_json:
+            document = self.api.specs_document(namespace)
+            if document is not None:
+                max_age = current_app.config.get("RESTX_SPECS_MAX_AGE", 0)
+                return document.response(request, max_age)
+        if namespace is None:
+            schema = self.api.__schema__
+        else:
+            schema = self.api.namespace_schema(namespace)
         return (
             schema,
             HTTPStatus.INTERNAL_SERVER_ERROR if "error" in schema else HTTPStatus.OK,
@@ -1009,6 +1264,26 @@ class SwaggerView(Resource):
         return ["application/json"]
 
 
+class NamespaceSwaggerView(SwaggerView):
+    """Render the Swagger specifications of a namespace as JSON"""
+
+    def get(self, namespace):
+        for ns in self.api.namespaces:
+            if ns.name == namespace and ns.resources:
+                return self.render(ns)
+        self.api.abort(HTTPStatus.NOT_FOUND)
+
+
+class SpecsIndexView(Resource):
+    """List the namespaces Swagger specifications urls as a Swagger UI configuration"""
+
+    def get(self):
+        return {"urls": self.api.specs_urls}
+
+    def mediatypes(self):
+        return ["application/json"]
+
+
 def mask_parse_error_handler(error):
     """When a mask can't be parsed"""
     return {"message": "Mask parse error: {0}".format(error)}, HTTPStatus.BAD_REQUEST
@@ -32,4 +32,9 @@ def swagger_static(filename):
 
 def ui_for(api):
     """Render a SwaggerUI for a given API"""
-    return render_template("swagger-ui.html", title=api.title, specs_url=api.specs_url)
+    return render_template(
+        "swagger-ui.html",
+        title=api.title,
+        specs_url=api.specs_url,
+        specs_urls=api.specs_urls if api.split_specs else None,
+    )
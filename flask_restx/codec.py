@@ -0,0 +1,198 @@
+"""
+JSON codecs encoding responses (including the Swagger specifications)
+and decoding request payloads.
+"""
+
+import abc
+import datetime
+import decimal
+import json
+import uuid
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def default(obj):
+    """
+    Encode the non JSON native types commonly found in marshalled data
+
+    Dates and times are encoded in ISO 8601, decimals and UUIDs as strings.
+    """
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    raise TypeError(
+        "Object of type {0} is not JSON serializable".format(type(obj).__name__)
+    )
+
+
+class JSONCodec(abc.ABC):
+    """
+    A JSON codec encoding to ``bytes``.
+
+    Codecs must implement :meth:`dumps` and :meth:`loads`.
+
+    :param settings: codec specific encoding options (ie. ``RESTX_JSON``)
+    """
+
+    #: The codec name as used in the ``RESTX_JSON_CODEC`` setting
+    name = None
+
+    def __init__(self, **settings):
+        self.settings = settings
+
+    @abc.abstractmethod
+    def dumps(self, data, newline=False):
+        """
+        Encode some data
+
+        :param bool newline: end the output with a new line
+        :rtype: bytes
+        """
+
+    @abc.abstractmethod
+    def loads(self, data):
+        """
+        Decode a JSON document
+
+        :param bytes|str data: the JSON document
+        :raises ValueError: if the document is not valid JSON
+        """
+
+
+class StdlibCodec(JSONCodec):
+    """The :mod:`json` standard library codec"""
+
+    name = "json"
+
+    def __init__(self, **settings):
+        if "cls" not in settings:
+            settings.setdefault("default", default)
+        super(StdlibCodec, self).__init__(**settings)
+
+    def dumps(self, data, newline=False):
+        dumped = json.dumps(data, **self.settings)
+        if newline:
+            dumped += "\n"
+        return dumped.encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """The `ujson <https://github.com/ultrajson/ultrajson>`_ codec"""
+
+    name = "ujson"
+
+    def __init__(self, **settings):
+        settings.setdefault("default", default)
+        super(UjsonCodec, self).__init__(**settings)
+
+    def dumps(self, data, newline=False):
+        dumped = ujson.dumps(data, **self.settings)
+        if newline:
+            dumped += "\n"
+        return dumped.encode("utf-8")
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    The `orjson <https://github.com/ijl/orjson>`_ codec.
+
+    Only the ``indent`` (always 2 spaces), ``sort_keys`` and ``default`` settings
+    are supported, ``separators`` and ``ensure_ascii`` are ignored.
+    """
+
+    name = "orjson"
+
+    def __init__(self, **settings):
+        super(OrjsonCodec, self).__init__(**settings)
+        settings = dict(settings)
+        self.default = settings.pop("default", default)
+        self.option = orjson.OPT_NON_STR_KEYS
+        if settings.pop("indent", None):
+            self.option |= orjson.OPT_INDENT_2
+        if settings.pop("sort_keys", False):
+            self.option |= orjson.OPT_SORT_KEYS
+        settings.pop("separators", None)
+        settings.pop("ensure_ascii", None)
+        if settings:
+            raise ValueError(
+                "Unsupported orjson settings: {0}".format(", ".join(sorted(settings)))
+            )
+
+    def dumps(self, data, newline=False):
+        option = self.option | orjson.OPT_APPEND_NEWLINE if newline else self.option
+        return orjson.dumps(data, default=self.default, option=option)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+#: The available codecs by name
+CODECS = {
+    codec.name: codec
+    for codec, module in (
+        (StdlibCodec, json),
+        (UjsonCodec, ujson),
+        (OrjsonCodec, orjson),
+    )
+    if module is not None
+}
+
+
+def make_codec(codec=None, **settings):
+    """
+    Build a JSON codec
+
+    :param codec: a codec name, class or instance. Defaults to ``ujson``
+        if installed, ``json`` otherwise.
+    :param settings: the codec encoding options (ignored for codec instances)
+    :rtype: JSONCodec
+    :raises ValueError: if the codec is unknown or not installed
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec is None:
+        codec = "ujson" if "ujson" in CODECS else "json"
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError("Unknown or unavailable JSON codec: {0}".format(codec))
+        codec = CODECS[codec]
+    return codec(**settings)
+
+
+def codec_for(app):
+    """
+    Get the JSON codec of an application.
+
+    The codec is built once per application from the ``RESTX_JSON_CODEC``
+    and ``RESTX_JSON`` settings.
+
+    :rtype: JSONCodec
+    """
+    conf = app.extensions.setdefault("restx", {})
+    codec = conf.get("json_codec")
+    if codec is None:
+        settings = dict(app.config.get("RESTX_JSON", {}))
+        # If we're in debug mode, and the indent is not set, we set it to a
+        # reasonable value here.  Note that this won't override any existing value
+        # that was set.
+        if app.debug:
+            settings.setdefault("indent", 4)
+        codec = make_codec(app.config.get("RESTX_JSON_CODEC"), **settings)
+        conf["json_codec"] = codec
+    return codec
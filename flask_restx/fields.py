@@ -6,6 +6,7 @@ from calendar import timegm
 from datetime import date, datetime
 from decimal import Decimal, ROUND_HALF_EVEN
 from email.utils import formatdate
+from functools import lru_cache, partial
 
 from urllib.parse import urlparse, urlunparse
 
@@ -19,7 +20,7 @@ from .inputs import (
     boolean,
 )
 from .errors import RestError
-from .marshalling import marshal
+from .marshalling import marshal, _load
 from .utils import camel_to_dash, not_none
 
 __all__ = (
@@ -72,16 +73,140 @@ def get_value(key, obj, default=None):
     elif callable(key):
         return key(obj)
     else:
-        return _get_value_for_keys(key.split("."), obj, default)
+        return _get_string_accessor(key)(obj, default)
 
 
-def _get_value_for_keys(keys, obj, default):
-    if len(keys) == 1:
-        return _get_value_for_key(keys[0], obj, default)
-    else:
-        return _get_value_for_keys(
-            keys[1:], _get_value_for_key(keys[0], obj, default), default
-        )
+_MISSING = object()
+
+
+class Accessor(object):
+    """
+    A compiled getter for a single key.
+
+    The lookup strategy is chosen once per source type and reused,
+    see :func:`get_accessor`.
+
+    :param str key: the key or attribute name to pull
+    """
+
+    __slots__ = ("key", "getters")
+
+    def __init__(self, key):
+        self.key = key
+        self.getters = {}
+
+    def __call__(self, obj, default=None):
+        cls = type(obj)
+        try:
+            getter = self.getters[cls]
+        except KeyError:
+            getter = self.getters[cls] = _getter_for(cls, self.key)
+        return getter(obj, default)
+
+
+class AccessorPath(object):
+    """
+    A compiled getter for a dotted attribute path.
+
+    :param str path: the dotted path to pull (ie. ``people.0.name``)
+    """
+
+    __slots__ = ("path", "accessors")
+
+    def __init__(self, path):
+        self.path = path
+        self.accessors = tuple(get_accessor(key) for key in path.split("."))
+
+    def __call__(self, obj, default=None):
+        for accessor in self.accessors:
+            obj = accessor(obj, default)
+        return obj
+
+
+def get_accessor(key):
+    """
+    Get the compiled getter for a key, an attribute or a dotted path.
+
+    The returned callable has the ``(obj, default=None)`` signature
+    and behaves like :func:`get_value`.
+    String accessors are cached so their specializations are shared.
+
+    :param key: the key to pull (a string, an integer or a callable)
+    """
+    if isinstance(key, int):
+        return partial(_get_integer_key, key)
+    elif callable(key):
+        return partial(_get_callable_key, key)
+    return _get_string_accessor(key)
+
+
+@lru_cache(maxsize=4096)
+def _get_string_accessor(key):
+    if "." in key:
+        return AccessorPath(key)
+    return Accessor(key)
+
+
+def _get_integer_key(key, obj, default=None):
+    return _get_value_for_key(key, obj, default)
+
+
+def _get_callable_key(key, obj, default=None):
+    return key(obj)
+
+
+def _getter_for(cls, key):
+    """
+    Specialize :func:`_get_value_for_key` for a source type
+    """
+    if issubclass(cls, dict):
+        if (
+            cls.__getitem__ is dict.__getitem__
+            and cls.get is dict.get
+            and not hasattr(cls, "__missing__")
+        ):
+            # dict, OrderedDict, models...
+            def getter(obj, default):
+                value = obj.get(key, _MISSING)
+                return getattr(obj, key, default) if value is _MISSING else value
+
+            return getter
+
+    elif issubclass(cls, (list, tuple)):
+        if cls.__getitem__ in (list.__getitem__, tuple.__getitem__):
+            # lists, tuples and namedtuples can only be indexed by integers
+            try:
+                index = int(key)
+            except ValueError:
+                return partial(_getattr, key)
+
+            def getter(obj, default):
+                try:
+                    return obj[index]
+                except IndexError:
+                    return getattr(obj, key, default)
+
+            return getter
+
+    elif hasattr(cls, "_mapping") and hasattr(cls, "_fields"):
+        # SQLAlchemy rows
+        def getter(obj, default):
+            try:
+                return obj._mapping[key]
+            except (KeyError, TypeError):
+                return getattr(obj, key, default)
+
+        return getter
+
+    elif hasattr(cls, "strip") or not hasattr(cls, "__iter__"):
+        # plain objects, dataclasses, strings...
+        return partial(_getattr, key)
+
+    return partial(_get_value_for_key, key)
+
+
+def _getattr(key, obj, default):
+    return getattr(obj, key, default)
 
 
 def _get_value_for_key(key, obj, default):
@@ -98,6 +223,11 @@ def _get_value_for_key(key, obj, default):
     return getattr(obj, key, default)
 
 
+@lru_cache(maxsize=1024)
+def _wildcard_pattern(key):
+    return re.compile(fnmatch.translate(key), re.IGNORECASE)
+
+
 def to_marshallable_type(obj):
     """
     Helper for converting an object to a dictionary only if it is not
@@ -136,6 +266,8 @@ class Raw(object):
     :param bool nullable: Whether the field accepts null values in input
         validation. When True, the generated JSON Schema will allow null
         values for this field during request payload validation.
+    :param bool lazy: If ``True``, a callable value is called when marshalled,
+        so it is only evaluated if the field is selected by the mask.
     """
 
     #: The JSON/Swagger schema type
@@ -145,6 +277,8 @@ class Raw(object):
     #: An optional JSON/Swagger schema example
     __schema_example__ = None
 
+    lazy = False
+
     def __init__(
         self,
         default=None,
@@ -156,6 +290,7 @@ class Raw(object):
         example=None,
         mask=None,
         nullable=None,
+        lazy=False,
         **kwargs
     ):
         self.attribute = attribute
@@ -167,6 +302,7 @@ class Raw(object):
         self.example = example if example is not None else self.__schema_example__
         self.mask = mask
         self.nullable = nullable
+        self.lazy = lazy
 
     def format(self, value):
         """
@@ -196,7 +332,7 @@ class Raw(object):
         :raises MarshallingError: In case of formatting problem
         """
 
-        value = get_value(key if self.attribute is None else self.attribute, obj)
+        value = self._get(key, obj)
 
         if value is None:
             default = self._v("default")
@@ -216,6 +352,13 @@ class Raw(object):
         value = getattr(self, key)
         return value() if callable(value) else value
 
+    def _get(self, key, obj):
+        """Helper for pulling the field value from the object, evaluating lazy values"""
+        value = get_value(key if self.attribute is None else self.attribute, obj)
+        if self.lazy and callable(value):
+            return value()
+        return value
+
     @cached_property
     def __schema__(self):
         return not_none(self.schema())
@@ -243,6 +386,10 @@ class Nested(Raw):
     :param bool skip_none: Optional key will be used to eliminate inner fields
                            which value is None or the inner field's key not
                            exist in data
+    :param callable loader: An optional batch loader. The field value is then a key
+        and ``loader(keys)`` returns the matching objects (as a dict by key
+        or as a list in ``keys`` order). Keys are collected across the marshalled
+        objects so the loader is called once per list instead of once per object.
     :param kwargs: If ``default`` keyword argument is present, a nested
         dictionary will be marshaled as its value if nested dictionary is
         all-null keys (e.g. lets you return an empty JSON object instead of
@@ -251,13 +398,25 @@ class Nested(Raw):
 
     __schema_type__ = None
 
+    #: Whether a batch loader has been declared on any nested field
+    _batched = False
+
     def __init__(
-        self, model, allow_null=False, skip_none=False, as_list=False, **kwargs
+        self,
+        model,
+        allow_null=False,
+        skip_none=False,
+        as_list=False,
+        loader=None,
+        **kwargs
     ):
         self.model = model
         self.as_list = as_list
         self.allow_null = allow_null
         self.skip_none = skip_none
+        self.loader = loader
+        if loader is not None:
+            Nested._batched = True
         super(Nested, self).__init__(**kwargs)
 
     @property
@@ -265,7 +424,9 @@ class Nested(Raw):
         return getattr(self.model, "resolved", self.model)
 
     def output(self, key, obj, ordered=False, **kwargs):
-        value = get_value(key if self.attribute is None else self.attribute, obj)
+        value = self._get(key, obj)
+        if self.loader is not None and value is not None:
+            value = _load(self, value)
         if value is None:
             if self.allow_null:
                 return None
@@ -360,7 +521,7 @@ class List(Raw):
         ]
 
     def output(self, key, data, ordered=False, **kwargs):
-        value = get_value(key if self.attribute is None else self.attribute, data)
+        value = self._get(key, data)
         # we cannot really test for external dict behavior
         if is_indexable_but_not_string(value) and not isinstance(value, dict):
             return self.format(value)
@@ -753,7 +914,7 @@ class Polymorph(Nested):
 
     def output(self, key, obj, ordered=False, **kwargs):
         # Copied from upstream NestedField
-        value = get_value(key if self.attribute is None else self.attribute, obj)
+        value = self._get(key, obj)
         if value is None:
             if self.allow_null:
                 return None
@@ -810,16 +971,13 @@ class Wildcard(Raw):
     """
     Field for marshalling list of "unkown" fields.
 
+    The field name is a glob pattern (case insensitive) matched against
+    the object keys (or attributes). All matching keys are marshalled in a single pass.
+    The field is stateless and can be shared between threads.
+
     :param cls_or_instance: The field type the list will contain.
     """
 
-    exclude = set()
-    # cache the flat object
-    _flat = None
-    _obj = None
-    _cache = set()
-    _last = None
-
     def __init__(self, cls_or_instance, **kwargs):
         super(Wildcard, self).__init__(**kwargs)
         error_msg = "The type of the wildcard elements must be a subclass of fields.Raw"
@@ -834,67 +992,19 @@ class Wildcard(Raw):
 
     def _flatten(self, obj):
         if obj is None:
-            return None
-        if obj == self._obj and self._flat is not None:
-            return self._flat
+            return []
         if isinstance(obj, dict):
-            self._flat = [x for x in obj.items()]
-        else:
-
-            def __match_attributes(attribute):
-                attr_name, attr_obj = attribute
-                if inspect.isroutine(attr_obj) or (
-                    attr_name.startswith("__") and attr_name.endswith("__")
-                ):
-                    return False
-                return True
-
-            attributes = inspect.getmembers(obj)
-            self._flat = [x for x in attributes if __match_attributes(x)]
-
-        self._cache = set()
-        self._obj = obj
-        return self._flat
-
-    @property
-    def key(self):
-        return self._last
-
-    def reset(self):
-        self.exclude = set()
-        self._flat = None
-        self._obj = None
-        self._cache = set()
-        self._last = None
-
-    def output(self, key, obj, ordered=False):
-        value = None
-        reg = fnmatch.translate(key)
-
-        if self._flatten(obj):
-            while True:
-                try:
-                    # we are using pop() so that we don't
-                    # loop over the whole object every time dropping the
-                    # complexity to O(n)
-                    if ordered:
-                        # Get first element if respecting order
-                        objkey, val = self._flat.pop(0)
-                    else:
-                        # Previous default retained
-                        objkey, val = self._flat.pop()
-                    if (
-                        objkey not in self._cache
-                        and objkey not in self.exclude
-                        and re.match(reg, objkey, re.IGNORECASE)
-                    ):
-                        value = val
-                        self._cache.add(objkey)
-                        self._last = objkey
-                        break
-                except IndexError:
-                    break
+            return list(obj.items())
+        return [
+            (name, value)
+            for name, value in inspect.getmembers(obj)
+            if not (
+                inspect.isroutine(value)
+                or (name.startswith("__") and name.endswith("__"))
+            )
+        ]
 
+    def _format(self, value, ordered=False):
         if value is None:
             if self.default is not None:
                 return self.container.format(self.default)
@@ -909,6 +1019,33 @@ class Wildcard(Raw):
             )
         return self.container.format(value)
 
+    def output_items(self, key, obj, ordered=False, exclude=()):
+        """
+        Marshal all the keys of the object matching the field name.
+
+        :param str key: the field name used as a glob pattern
+        :param obj: the object to marshal
+        :param bool ordered: Wether or not to preserve the object order
+        :param exclude: the keys to ignore (ie. already marshalled by other fields)
+        :return: a list of ``(key, value)`` tuples, a single ``(key, default)`` tuple
+            if no key is matching
+        """
+        match = _wildcard_pattern(key).match
+        flat = self._flatten(obj)
+        if not ordered:
+            # Previous default retained: keys are consumed from the end
+            flat.reverse()
+        items = [
+            (objkey, self._format(value, ordered))
+            for objkey, value in flat
+            if objkey not in exclude and match(objkey)
+        ]
+        return items or [(key, self._format(None))]
+
+    def output(self, key, obj, ordered=False, **kwargs):
+        """Marshal the first key of the object matching the field name"""
+        return self.output_items(key, obj, ordered=ordered)[0][1]
+
     def schema(self):
         schema = super(Wildcard, self).schema()
         schema["type"] = "object"
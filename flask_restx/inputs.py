@@ -18,9 +18,16 @@ The last line allows you to document properly the type in the Swagger documentat
 
 import re
 import socket
+import threading
 
-from datetime import datetime, time, timedelta, timezone
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as _date, datetime, time, timedelta, timezone
+from decimal import Decimal
 from email.utils import parsedate_tz, mktime_tz
+from functools import lru_cache, wraps
+from time import monotonic
 from urllib.parse import urlparse
 
 import aniso8601
@@ -51,6 +58,50 @@ email_regex = re.compile(
 
 time_regex = re.compile(r"\d{2}:\d{2}")
 
+# Canonical ISO 8601 extended format (fast path)
+iso8601_regex = re.compile(
+    r"(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})"
+    r"(?:T(?P<hour>\d{2}):(?P<minute>\d{2})"
+    r"(?::(?P<second>\d{2})(?:\.(?P<fraction>\d{1,6}))?)?"
+    r"(?P<tz>Z|[+-]\d{2}:\d{2})?)?",
+    re.ASCII,
+)
+
+# Canonical RFC 822 format with a timezone (fast path)
+rfc822_regex = re.compile(
+    r"(?:[A-Z][a-z]{2}, )?(?P<day>\d{1,2}) (?P<month>[A-Z][a-z]{2}) (?P<year>\d{4}) "
+    r"(?P<hour>\d{2}):(?P<minute>\d{2}):(?P<second>\d{2}) "
+    r"(?P<tz>[+-]\d{4}|[A-Z]{1,3})",
+    re.ASCII,
+)
+
+RFC822_MONTHS = {
+    name: index
+    for index, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun")
+        + ("Jul", "Aug", "Sep", "Oct", "Nov", "Dec"),
+        1,
+    )
+}
+
+# Timezones names known by email.utils.parsedate_tz (as offsets in hours)
+RFC822_TIMEZONES = {
+    "UT": 0,
+    "UTC": 0,
+    "GMT": 0,
+    "Z": 0,
+    "AST": -4,
+    "ADT": -3,
+    "EST": -5,
+    "EDT": -4,
+    "CST": -6,
+    "CDT": -5,
+    "MST": -7,
+    "MDT": -6,
+    "PST": -8,
+    "PDT": -7,
+}
+
 
 def ipv4(value):
     """Validate an IPv4 address"""
@@ -93,6 +144,120 @@ def ip(value):
 ip.__schema__ = {"type": "string", "format": "ip"}
 
 
+class Resolver(object):
+    """
+    A caching DNS resolver used to check domains existence.
+
+    Both successful and failed resolutions are cached (with their own TTL)
+    in a bounded LRU cache.
+
+    Example::
+
+        resolver = inputs.Resolver(ttl=600, lookup=my_lookup)
+        parser.add_argument('email', type=inputs.email(check=True, resolver=resolver))
+
+    :param int ttl: How long (in seconds) an existing domain is cached
+    :param int negative_ttl: How long (in seconds) a missing domain is cached
+    :param int maxsize: The maximum number of cached domains
+    :param int workers: The maximum number of concurrent resolutions
+        performed by :meth:`resolve_many`
+    :param callable lookup: A function resolving a domain and raising
+        an :exc:`OSError` if it does not exist. Defaults to :func:`socket.getaddrinfo`
+    """
+
+    def __init__(self, ttl=300, negative_ttl=60, maxsize=1024, workers=8, lookup=None):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self.workers = workers
+        self.lookup = lookup or self.getaddrinfo
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def getaddrinfo(domain):
+        socket.getaddrinfo(domain, None)
+
+    def _cached(self, domain):
+        with self._lock:
+            entry = self._cache.get(domain)
+            if entry is None:
+                return None
+            if entry[0] < monotonic():
+                del self._cache[domain]
+                return None
+            self._cache.move_to_end(domain)
+            return entry[1]
+
+    def _store(self, domain, exists):
+        ttl = self.ttl if exists else self.negative_ttl
+        with self._lock:
+            self._cache[domain] = (monotonic() + ttl, exists)
+            self._cache.move_to_end(domain)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def resolve(self, domain):
+        """
+        Check a domain exists
+
+        :param str domain: the domain to resolve
+        :rtype: bool
+        """
+        exists = self._cached(domain)
+        if exists is None:
+            try:
+                self.lookup(domain)
+                exists = True
+            except OSError:
+                exists = False
+            self._store(domain, exists)
+        return exists
+
+    def resolve_many(self, domains):
+        """
+        Check many domains exist, resolving the uncached ones concurrently
+
+        :param domains: an iterable of domains
+        :return: the existence of each domain
+        :rtype: dict
+        """
+        results = {}
+        missing = []
+        for domain in domains:
+            if domain in results:
+                continue
+            exists = self._cached(domain)
+            results[domain] = exists
+            if exists is None:
+                missing.append(domain)
+        if len(missing) == 1 or self.workers <= 1:
+            for domain in missing:
+                results[domain] = self.resolve(domain)
+        elif missing:
+            workers = min(self.workers, len(missing))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for domain, exists in zip(missing, executor.map(self.resolve, missing)):
+                    results[domain] = exists
+        return results
+
+    def clear(self):
+        """Empty the cache"""
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+
+#: The resolver used by domain checks when none is given
+default_resolver = Resolver()
+
+
+def _resolver(resolver):
+    return default_resolver if resolver is None else resolver
+
+
 class URL(object):
     """
     Validate an URL.
@@ -114,6 +279,8 @@ class URL(object):
     :param list|tuple schemes: Restrict valid schemes to this list
     :param list|tuple domains: Restrict valid domains to this list
     :param list|tuple exclude: Exclude some domains
+    :param Resolver resolver: The resolver used to check domains
+        (defaults to :data:`default_resolver`)
     """
 
     def __init__(
@@ -126,6 +293,7 @@ class URL(object):
         schemes=None,
         domains=None,
         exclude=None,
+        resolver=None,
     ):
         self.check = check
         self.ip = ip
@@ -135,6 +303,7 @@ class URL(object):
         self.schemes = schemes
         self.domains = domains
         self.exclude = exclude
+        self.resolver = resolver
 
     def error(self, value, details=None):
         msg = "{0} is not a valid URL"
@@ -188,12 +357,27 @@ class URL(object):
             elif self.exclude and data["domain"] in self.exclude:
                 self.error(value, "Domain is not allowed")
             if self.check:
-                try:
-                    socket.getaddrinfo(data["domain"], None)
-                except socket.error:
+                if not _resolver(self.resolver).resolve(data["domain"]):
                     self.error(value, "Domain does not exists")
         return value
 
+    def many(self, values, argument="argument"):
+        """
+        Validate many URLs, resolving their domains concurrently if checked
+
+        :param list values: the URLs to validate
+        :param str argument: the argument name (unused)
+        :rtype: list
+        """
+        if self.check:
+            domains = []
+            for value in values:
+                match = netloc_regex.match(urlparse(value).netloc)
+                if match and match.group("domain"):
+                    domains.append(match.group("domain"))
+            _resolver(self.resolver).resolve_many(domains)
+        return [self(value) for value in values]
+
     @property
     def __schema__(self):
         return {
@@ -228,14 +412,25 @@ class email(object):
     :param bool local: Allow localhost (both string or ip) as domain
     :param list|tuple domains: Restrict valid domains to this list
     :param list|tuple exclude: Exclude some domains
+    :param Resolver resolver: The resolver used to check domains
+        (defaults to :data:`default_resolver`)
     """
 
-    def __init__(self, check=False, ip=False, local=False, domains=None, exclude=None):
+    def __init__(
+        self,
+        check=False,
+        ip=False,
+        local=False,
+        domains=None,
+        exclude=None,
+        resolver=None,
+    ):
         self.check = check
         self.ip = ip
         self.local = local
         self.domains = domains
         self.exclude = exclude
+        self.resolver = resolver
 
     def error(self, value, msg=None):
         msg = msg or "{0} is not a valid email"
@@ -254,9 +449,7 @@ class email(object):
             self.error(value)
         server = match.group("server")
         if self.check:
-            try:
-                socket.getaddrinfo(server, None)
-            except socket.error:
+            if not _resolver(self.resolver).resolve(server):
                 self.error(value)
         if self.domains and server not in self.domains:
             self.error(value, "{0} does not belong to the authorized domains")
@@ -270,6 +463,20 @@ class email(object):
             self.error(value)
         return value
 
+    def many(self, values, argument="argument"):
+        """
+        Validate many emails, resolving their domains concurrently if checked
+
+        :param list values: the emails to validate
+        :param str argument: the argument name (unused)
+        :rtype: list
+        """
+        if self.check:
+            matches = (email_regex.match(value) for value in values)
+            domains = [match.group("server") for match in matches if match]
+            _resolver(self.resolver).resolve_many(domains)
+        return [self(value) for value in values]
+
     @property
     def __schema__(self):
         return {
@@ -314,6 +521,75 @@ class regex(object):
         }
 
 
+def _parse_iso8601(value):
+    """
+    Parse the canonical ISO 8601 extended format without aniso8601.
+
+    :return: a date, a datetime or ``None`` if the value is not in the canonical format
+    :raises ValueError: if the value is out of range
+    """
+    match = iso8601_regex.fullmatch(value)
+    if not match:
+        return None
+    year, month, day, hour, minute, second, fraction, tz = match.groups()
+    if hour is None:
+        return _date(int(year), int(month), int(day))
+    if tz is None:
+        tzinfo = None
+    elif tz == "Z" or tz == "+00:00":
+        tzinfo = timezone.utc
+    elif tz == "-00:00":
+        # Rejected by ISO 8601, let aniso8601 report it
+        return None
+    else:
+        offset = timedelta(hours=int(tz[1:3]), minutes=int(tz[4:6]))
+        tzinfo = timezone(-offset if tz[0] == "-" else offset)
+    return datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        int(second or 0),
+        int(fraction.ljust(6, "0")) if fraction else 0,
+        tzinfo,
+    )
+
+
+def _parse_iso8601_or_none(value):
+    try:
+        return _parse_iso8601(value)
+    except (TypeError, ValueError):
+        # Out of range values (ie. 24:00) are left to aniso8601
+        return None
+
+
+def memoize(parser, maxsize=1024):
+    """
+    Cache the results of an input parser.
+
+    Useful for bulk inputs with many repeated values (ie. timestamps).
+    Only successful parsing results are cached, so the parser must return
+    immutable values.
+
+    Example::
+
+        parser.add_argument('since', type=inputs.memoize(inputs.datetime_from_iso8601))
+
+    :param parser: the input parser to cache
+    :param int maxsize: the maximum number of cached results
+    """
+    cached = lru_cache(maxsize=maxsize)(parser)
+
+    @wraps(parser)
+    def wrapper(value, *args):
+        return cached(value, *args)
+
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
 def _normalize_interval(start, end, value):
     """
     Normalize datetime intervals.
@@ -375,6 +651,16 @@ def _parse_interval(value):
     Do some nasty try/except voodoo to get some sort of datetime
     object(s) out of the string.
     """
+    parts = value.split("/")
+    if len(parts) <= 2:
+        # Canonical dates, datetimes and start/end intervals
+        parsed = [_parse_iso8601_or_none(part) for part in parts]
+        if None not in parsed:
+            if len(parsed) == 1:
+                return parsed[0], None
+            start, end = parsed
+            if type(start) is type(end) and _is_aware(start) == _is_aware(end):
+                return sorted(parsed)
     try:
         return sorted(aniso8601.parse_interval(value))
     except ValueError:
@@ -384,6 +670,10 @@ def _parse_interval(value):
             return aniso8601.parse_date(value), None
 
 
+def _is_aware(value):
+    return getattr(value, "tzinfo", None) is not None
+
+
 def iso8601interval(value, argument="argument"):
     """
     Parses ISO 8601-formatted datetime intervals into tuples of datetimes.
@@ -437,6 +727,12 @@ iso8601interval.__schema__ = {"type": "string", "format": "iso8601-interval"}
 
 def date(value):
     """Parse a valid looking date in the format YYYY-mm-dd"""
+    match = iso8601_regex.fullmatch(value) if isinstance(value, str) else None
+    if match and match.group("hour") is None:
+        try:
+            return datetime(*(int(part) for part in match.group(1, 2, 3)))
+        except ValueError:
+            pass
     date = datetime.strptime(value, "%Y-%m-%d")
     return date
 
@@ -451,6 +747,25 @@ def _get_integer(value):
         raise ValueError("{0} is not a valid integer".format(value))
 
 
+def _integers(values, low=None, high=None):
+    """
+    Convert many values to integers within some bounds in a single pass.
+
+    :return: the integers or ``None`` if any value is invalid or out of bounds,
+        to be reported by the single value converter
+    """
+    try:
+        integers = list(map(int, values))
+    except (TypeError, ValueError):
+        return None
+    if integers:
+        if low is not None and min(integers) < low:
+            return None
+        if high is not None and max(integers) > high:
+            return None
+    return integers
+
+
 def natural(value, argument="argument"):
     """Restrict input type to the natural numbers (0, 1, 2, 3...)"""
     value = _get_integer(value)
@@ -460,7 +775,16 @@ def natural(value, argument="argument"):
     return value
 
 
+def _naturals(values, argument="argument"):
+    """Convert many values to natural numbers at once (see :func:`bulk`)"""
+    integers = _integers(values, low=0)
+    if integers is None:
+        return [natural(value, argument) for value in values]
+    return integers
+
+
 natural.__schema__ = {"type": "integer", "minimum": 0}
+natural.many = _naturals
 
 
 def positive(value, argument="argument"):
@@ -472,7 +796,16 @@ def positive(value, argument="argument"):
     return value
 
 
+def _positives(values, argument="argument"):
+    """Convert many values to positive integers at once (see :func:`bulk`)"""
+    integers = _integers(values, low=1)
+    if integers is None:
+        return [positive(value, argument) for value in values]
+    return integers
+
+
 positive.__schema__ = {"type": "integer", "minimum": 0, "exclusiveMinimum": True}
+positive.many = _positives
 
 
 class int_range(object):
@@ -492,6 +825,19 @@ class int_range(object):
             )
         return value
 
+    def many(self, values, argument="argument"):
+        """
+        Convert many values at once (see :func:`bulk`)
+
+        :param list values: the values to convert
+        :param str argument: the argument name (unused, see ``argument`` in the constructor)
+        :rtype: list
+        """
+        integers = _integers(values, self.low, self.high)
+        if integers is None:
+            return [self(value) for value in values]
+        return integers
+
     @property
     def __schema__(self):
         return {
@@ -534,7 +880,118 @@ def boolean(value):
     raise ValueError("Invalid literal for boolean(): {0}".format(value))
 
 
+#: The lowercased strings accepted by :func:`boolean`
+BOOLEANS = {"": False, "true": True, "1": True, "on": True, "false": False, "0": False}
+
+
+def _booleans(values, argument="argument"):
+    """Convert many values to booleans at once (see :func:`bulk`)"""
+    try:
+        return [BOOLEANS[value.lower()] for value in values]
+    except (AttributeError, KeyError):
+        return [boolean(value) for value in values]
+
+
 boolean.__schema__ = {"type": "boolean"}
+boolean.many = _booleans
+
+
+def _natives(native):
+    def many(values, argument="argument"):
+        return list(map(native, values))
+
+    return many
+
+
+#: The bulk converters of the native types
+NATIVE_CONVERTERS = {
+    native: _natives(native) for native in (str, int, float, bool, Decimal)
+}
+
+
+def bulk(type):
+    """
+    Get the bulk converter of a type, converting a whole list of values at once.
+
+    Types provide a bulk converter with a ``many(values, argument="argument")``
+    method (or function attribute) returning the converted values
+    and raising the error of the first invalid value,
+    as converting the values one by one would.
+    Native types (:class:`int`, :class:`float`, :class:`str`...) are supported as well.
+
+    .. code-block:: python
+
+        def my_type(value):
+            return parse(value)
+
+        my_type.many = lambda values, argument='argument': parse_many(values)
+
+    :param type: the type to get the bulk converter of
+    :return: the bulk converter or ``None`` if the type has none
+    """
+    many = getattr(type, "many", None)
+    if callable(many):
+        return many
+    try:
+        return NATIVE_CONVERTERS.get(type)
+    except TypeError:  # Unhashable type
+        return None
+
+
+class packed(object):
+    """
+    Pack list values into a compact :class:`array.array` buffer.
+
+    Meant to be used with ``split`` or ``append`` arguments:
+
+    .. code-block:: python
+
+        parser.add_argument('ids', type=inputs.packed(inputs.natural, 'Q'), action='split')
+
+    :param type: the type of the values (with a bulk converter or not, see :func:`bulk`)
+    :param str typecode: the :mod:`array` type code of the buffer
+    """
+
+    def __init__(self, type=int, typecode="q"):
+        self.type = type
+        self.typecode = typecode
+        array(typecode)  # Fail early on unknown type codes
+
+    def __call__(self, value, argument="argument"):
+        return self.many([value], argument)[0]
+
+    def many(self, values, argument="argument"):
+        """
+        Convert many values into an :class:`array.array`
+
+        :param list values: the values to convert
+        :param str argument: the argument name used in error messages
+        :rtype: array.array
+        """
+        many = bulk(self.type)
+        if many is None:
+            converted = [self.type(value) for value in values]
+        else:
+            converted = many(values, argument)
+        try:
+            return array(self.typecode, converted)
+        except OverflowError:
+            for value in converted:
+                try:
+                    array(self.typecode, [value])
+                except OverflowError:
+                    msg = "Invalid {arg}: {value}. {arg} is out of the {typecode!r} array range"
+                    raise ValueError(
+                        msg.format(arg=argument, value=value, typecode=self.typecode)
+                    )
+            raise
+
+    @property
+    def __schema__(self):
+        schema = getattr(self.type, "__schema__", None)
+        if schema is not None:
+            return schema
+        return {"type": "number" if self.typecode in "fd" else "integer"}
 
 
 def datetime_from_rfc822(value):
@@ -551,6 +1008,32 @@ def datetime_from_rfc822(value):
     :raises ValueError: if value is an invalid date literal
 
     """
+    match = rfc822_regex.fullmatch(value) if isinstance(value, str) else None
+    if match and match.group("month") in RFC822_MONTHS:
+        day, month, year, hour, minute, second, tz = match.groups()
+        if tz in RFC822_TIMEZONES:
+            offset = RFC822_TIMEZONES[tz] * 3600
+        elif tz[0] in "+-" and tz != "-0000":
+            offset = int(tz[1:3]) * 3600 + int(tz[3:5]) * 60
+            offset = -offset if tz[0] == "-" else offset
+        else:
+            # Unknown timezones are local times, left to email.utils
+            offset = None
+        if offset is not None:
+            try:
+                dt = datetime(
+                    int(year),
+                    RFC822_MONTHS[month],
+                    int(day),
+                    int(hour),
+                    int(minute),
+                    int(second),
+                    tzinfo=timezone.utc,
+                )
+                return dt - timedelta(seconds=offset)
+            except (ValueError, OverflowError):
+                # Out of range values are normalized by email.utils
+                pass
     raw = value
     if not time_regex.search(value):
         value = " ".join((value, "00:00:00"))
@@ -579,6 +1062,15 @@ def datetime_from_iso8601(value):
     :raises ValueError: if value is an invalid date literal
 
     """
+    try:
+        parsed = _parse_iso8601(value)
+        if isinstance(parsed, datetime):
+            return parsed
+        if parsed is not None:
+            return datetime(parsed.year, parsed.month, parsed.day)
+    except (TypeError, ValueError):
+        # Out of range values (ie. 24:00) are left to aniso8601
+        pass
     try:
         try:
             return aniso8601.parse_datetime(value)
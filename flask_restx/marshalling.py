@@ -1,9 +1,15 @@
+import re
+import threading
+
 from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
+from itertools import islice
 
-from flask import request, current_app, has_app_context
+from flask import g, request, current_app, has_app_context
 
-from .mask import Mask, apply as apply_mask
+from .mask import Mask
 from .utils import unpack
 
 
@@ -13,7 +19,15 @@ def make(cls):
     return cls
 
 
-def marshal(data, fields, envelope=None, skip_none=False, mask=None, ordered=False):
+def marshal(
+    data,
+    fields,
+    envelope=None,
+    skip_none=False,
+    mask=None,
+    ordered=False,
+    compiled=False,
+):
     """Takes raw data (in the form of a dict, list, object) and a dict of
     fields to output and filters the data based on those fields.
 
@@ -26,6 +40,8 @@ def marshal(data, fields, envelope=None, skip_none=False, mask=None, ordered=Fal
                            which value is None or the field's key not
                            exist in data
     :param bool ordered: Wether or not to preserve order
+    :param bool compiled: Whether or not to use a compiled marshaller
+                          (see :func:`compile_marshaller`)
 
 
     >>> from flask_restx import fields, marshal
@@ -51,145 +67,703 @@ def marshal(data, fields, envelope=None, skip_none=False, mask=None, ordered=Fal
     OrderedDict([('a', 100)])
 
     """
-    out, has_wildcards = _marshal(data, fields, envelope, skip_none, mask, ordered)
-
-    if has_wildcards:
-        # ugly local import to avoid dependency loop
-        from .fields import Wildcard
-
-        items = []
-        keys = []
-        for dkey, val in fields.items():
-            key = dkey
-            if isinstance(val, dict):
-                value = marshal(data, val, skip_none=skip_none, ordered=ordered)
-            else:
-                field = make(val)
-                is_wildcard = isinstance(field, Wildcard)
-                # exclude already parsed keys from the wildcard
-                if is_wildcard:
-                    field.reset()
-                    if keys:
-                        field.exclude |= set(keys)
-                        keys = []
-                value = field.output(dkey, data, ordered=ordered)
-                if is_wildcard:
-
-                    def _append(k, v):
-                        if skip_none and (v is None or v == OrderedDict() or v == {}):
-                            return
-                        items.append((k, v))
-
-                    key = field.key or dkey
-                    _append(key, value)
-                    while True:
-                        value = field.output(dkey, data, ordered=ordered)
-                        if value is None or value == field.container.format(
-                            field.default
-                        ):
-                            break
-                        key = field.key
-                        _append(key, value)
-                    continue
-
-            keys.append(key)
-            if skip_none and (value is None or value == OrderedDict() or value == {}):
-                continue
-            items.append((key, value))
-
-        items = tuple(items)
+    # ugly local import to avoid dependency loop
+    from .fields import Nested, Wildcard
 
-        out = OrderedDict(items) if ordered else dict(items)
+    if Nested._batched and _batches.get() is None:
+        resolved = _resolve(fields, mask)
+        if _needs_batches(resolved):
+            with _batched(resolved, data):
+                return marshal(
+                    data, fields, envelope, skip_none, mask, ordered, compiled
+                )
 
+    if compiled:
+        if mask:
+            fields = _masks().get(fields, mask)
+        out = compiled_marshaller(fields, skip_none, ordered)(data)
         if envelope:
             out = OrderedDict([(envelope, out)]) if ordered else {envelope: out}
+        return out
 
+    fields = _resolve(fields, mask)
+
+    if isinstance(data, (list, tuple)):
+        out = [marshal(d, fields, skip_none=skip_none, ordered=ordered) for d in data]
+        if envelope:
+            out = OrderedDict([(envelope, out)]) if ordered else {envelope: out}
         return out
 
+    items = []
+    # keys marshalled since the last wildcard are excluded from the next one
+    keys = set()
+    for key, val in fields.items():
+        if isinstance(val, dict):
+            value = marshal(data, val, skip_none=skip_none, ordered=ordered)
+        else:
+            field = make(val)
+            if isinstance(field, Wildcard):
+                items.extend(
+                    field.output_items(key, data, ordered=ordered, exclude=keys)
+                )
+                keys = set()
+                continue
+            value = field.output(key, data, ordered=ordered)
+        keys.add(key)
+        items.append((key, value))
+
+    if skip_none:
+        items = [
+            (k, v) for k, v in items if v is not None and v != OrderedDict() and v != {}
+        ]
+
+    out = OrderedDict(items) if ordered else dict(items)
+
+    if envelope:
+        out = OrderedDict([(envelope, out)]) if ordered else {envelope: out}
+
     return out
 
 
-def _marshal(data, fields, envelope=None, skip_none=False, mask=None, ordered=False):
-    """Takes raw data (in the form of a dict, list, object) and a dict of
-    fields to output and filters the data based on those fields.
+def _resolve(fields, mask=None):
+    """Resolve the fields to marshal and apply the effective mask"""
+    mask = mask or getattr(fields, "__mask__", None)
+    if mask:
+        return _masks().get(fields, mask)
+    return getattr(fields, "resolved", fields)
 
-    :param data: the actual object(s) from which the fields are taken from
-    :param fields: a dict of whose keys will make up the final serialized
-                   response output
-    :param envelope: optional key that will be used to envelop the serialized
-                     response
-    :param bool skip_none: optional key will be used to eliminate fields
-                           which value is None or the field's key not
-                           exist in data
+
+class MaskedFields(dict):
+    """
+    Resolved fields with a mask applied, as cached by :class:`MaskCache`.
+
+    Compiled marshallers are cached on it like on a :class:`~flask_restx.Model`.
+    """
+
+    def __init__(self, fields, mask):
+        self.mask = Mask(mask, skip=True)
+        self._resolved = getattr(fields, "resolved", None)
+        if self._resolved is None:
+            self._items = list(fields.items())
+        super(MaskedFields, self).__init__(
+            self.mask.apply(fields if self._resolved is None else self._resolved)
+        )
+        self.source = fields
+        self.__marshallers__ = {}
+
+    def matches(self, fields):
+        """Whether the mask has been applied on these fields, as they are now"""
+        if self.source is not fields:
+            return False
+        if self._resolved is not None:
+            # models are resolved again once modified
+            return fields.resolved is self._resolved
+        return list(fields.items()) == self._items
+
+
+class MaskCache(object):
+    """
+    A bounded LRU cache of :class:`MaskedFields`.
+
+    Entries are keyed by the fields (or model) identity and the mask string
+    so a given mask is only parsed and applied once per model
+    (and once again after the model or the fields dict changed).
+
+    :param int maxsize: the maximum number of cached entries (``0`` disables the cache)
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fields, mask):
+        """
+        Get the resolved fields with the mask applied.
+
+        :param fields: a dict or a model of fields
+        :param str|Mask mask: the mask (parsed or not) to apply
+        :rtype: MaskedFields
+        :raises MaskError: when unable to apply the mask
+        """
+        key = (id(fields), mask if isinstance(mask, str) else str(mask))
+        with self._lock:
+            entry = self._entries.get(key)
+            # ids can be reused once the fields are garbage collected
+            if entry is not None and entry.matches(fields):
+                self._entries.move_to_end(key)
+                return entry
+        entry = MaskedFields(fields, mask)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+#: The default cache used by :func:`marshal` for masked fields,
+#: applications configuring ``RESTX_MASK_CACHE_SIZE`` get their own
+mask_cache = MaskCache()
+
+
+def _masks():
+    """The masked fields cache of the current application (or the default one)"""
+    if has_app_context():
+        cache = current_app.extensions.get("restx", {}).get("mask_cache")
+        if cache is not None:
+            return cache
+    return mask_cache
+
+
+def requested_fields():
+    """
+    Get the fields requested to the current :func:`marshal_with` decorated method.
+
+    The requested fields are given by the mask which will be applied
+    on the returned value (``X-Fields`` header, decorator or model mask)
+    so the method can avoid loading data which won't be marshalled.
+
+    >>> @api.marshal_with(person)
+    ... def get(self):
+    ...     requested = api.requested_fields()
+    ...     if requested is None or "address" in requested or "*" in requested:
+    ...         ...
+
+    :return: the parsed mask as a requested fields tree
+             or ``None`` if all fields are requested
+    :rtype: Mask
+    :raises MaskError: when the requested mask is invalid
+    """
+    requested = g.get("_restx_requested") if has_app_context() else None
+    if requested is None:
+        return None
+    fields, mask = requested
+    mask = mask or getattr(fields, "__mask__", None)
+    if not mask:
+        return None
+    return _masks().get(fields, mask).mask
+
+
+class StreamedList(object):
+    """
+    A lazily marshalled list of objects.
+
+    Objects are pulled from the (possibly infinite) iterable and marshalled
+    one by one while iterating, so the whole output never lives in memory.
+    The JSON representation streams it in chunks (see :func:`~flask_restx.representations.output_json`),
+    other representations can use :meth:`marshal` to get the full output.
+
+    Fields are resolved and the mask is applied on instanciation
+    so mask errors are raised before the response starts.
+
+    >>> from flask_restx import fields
+    >>> from flask_restx.marshalling import StreamedList
+    >>> stream = StreamedList(({'a': i} for i in range(3)), {'a': fields.Integer})
+    >>> list(stream)
+    [{'a': 0}, {'a': 1}, {'a': 2}]
+
+    :param data: an iterable of objects to marshal
+    :param fields: a dict or a model of fields
+    :param envelope: optional key that will be used to envelop the serialized list
+    :param bool skip_none: Whether or not to eliminate ``None`` values
+    :param mask: an optional mask to apply
     :param bool ordered: Wether or not to preserve order
+    :param bool compiled: Whether or not to use a compiled marshaller
+    :param int chunk_size: the number of objects per streamed chunk
+    """
 
+    def __init__(
+        self,
+        data,
+        fields,
+        envelope=None,
+        skip_none=False,
+        mask=None,
+        ordered=False,
+        compiled=False,
+        chunk_size=100,
+    ):
+        self.data = data
+        self.fields = _resolve(fields, mask)
+        self.envelope = envelope
+        self.ordered = ordered
+        self.chunk_size = chunk_size
+        self.batched = _needs_batches(self.fields)
+        if compiled:
+            if mask:
+                fields = _masks().get(fields, mask)
+            self.marshaller = compiled_marshaller(fields, skip_none, ordered)
+        else:
+            resolved = self.fields
+
+            def marshaller(obj):
+                return marshal(obj, resolved, skip_none=skip_none, ordered=ordered)
+
+            self.marshaller = marshaller
+
+    def __iter__(self):
+        marshaller = self.marshaller
+        if not self.batched:
+            for obj in self.data:
+                yield marshaller(obj)
+            return
+        # batch loaders are called once per chunk
+        data = iter(self.data)
+        chunk = list(islice(data, self.chunk_size))
+        while chunk:
+            with _batched(self.fields, chunk):
+                out = [marshaller(obj) for obj in chunk]
+            yield from out
+            chunk = list(islice(data, self.chunk_size))
+
+    def marshal(self):
+        """Consume the stream and return the full output (as :func:`marshal` would)"""
+        out = list(self)
+        if self.envelope:
+            out = (
+                OrderedDict([(self.envelope, out)])
+                if self.ordered
+                else {self.envelope: out}
+            )
+        return out
 
-    >>> from flask_restx import fields, marshal
-    >>> data = { 'a': 100, 'b': 'foo', 'c': None }
-    >>> mfields = { 'a': fields.Raw, 'c': fields.Raw, 'd': fields.Raw }
 
-    >>> marshal(data, mfields)
-    {'a': 100, 'c': None, 'd': None}
+#: The objects loaded by the batched fields for the data being marshalled
+_batches = ContextVar("flask_restx_batches", default=None)
 
-    >>> marshal(data, mfields, envelope='data')
-    {'data': {'a': 100, 'c': None, 'd': None}}
 
-    >>> marshal(data, mfields, skip_none=True)
-    {'a': 100}
+@contextmanager
+def _batched(fields, data):
+    """Call the batch loaders once for the data and expose their results while marshalling"""
+    batches = {}
+    _load_batches(fields, data if isinstance(data, (list, tuple)) else [data], batches)
+    token = _batches.set(batches)
+    try:
+        yield batches
+    finally:
+        _batches.reset(token)
 
-    >>> marshal(data, mfields, ordered=True)
-    OrderedDict([('a', 100), ('c', None), ('d', None)])
 
-    >>> marshal(data, mfields, envelope='data', ordered=True)
-    OrderedDict([('data', OrderedDict([('a', 100), ('c', None), ('d', None)]))])
+def _has_loaders(fields, seen=None):
+    """Whether some (possibly nested) fields have a batch loader"""
+    # ugly local import to avoid dependency loop
+    from .fields import Nested, List
+
+    if not Nested._batched:
+        return False
+    seen = set() if seen is None else seen
+    if id(fields) in seen:
+        return False
+    seen.add(id(fields))
+    for field in fields.values():
+        if isinstance(field, dict):
+            if _has_loaders(field, seen):
+                return True
+            continue
+        nested = field.container if isinstance(field, List) else field
+        if isinstance(nested, Nested) and (
+            nested.loader is not None or _has_loaders(nested.nested, seen)
+        ):
+            return True
+    return False
+
+
+def _needs_batches(fields):
+    """Whether some fields have batch loaders, cached on models"""
+    # ugly local import to avoid dependency loop
+    from .fields import Nested
 
-    >>> marshal(data, mfields, skip_none=True, ordered=True)
-    OrderedDict([('a', 100)])
+    # Shares the compiled marshallers cache (dropped when the model changes)
+    cache = getattr(fields, "__marshallers__", None)
+    if cache is not None and "loaders" in cache:
+        return cache["loaders"]
+    needed = _has_loaders(fields)
+    # Loaders may be declared later on
+    if cache is not None and Nested._batched:
+        cache["loaders"] = needed
+    return needed
+
+
+def _load_batches(fields, objects, batches):
+    """
+    Collect the keys of the batched :class:`~fields.Nested` fields across objects
+    and call each loader once.
 
+    Loaded (and nested) objects are walked recursively so nested batched fields
+    are loaded once for the whole tree.
     """
     # ugly local import to avoid dependency loop
-    from .fields import Wildcard
+    from .fields import Nested, List, Polymorph
+
+    for key, field in fields.items():
+        if isinstance(field, dict):
+            _load_batches(field, objects, batches)
+            continue
+        many = isinstance(field, List)
+        nested = field.container if many else field
+        if (
+            not isinstance(nested, Nested)
+            or isinstance(nested, Polymorph)
+            or field.lazy
+        ):
+            continue
+        if nested.loader is None and not _needs_batches(nested.nested):
+            continue
+        values = []
+        for obj in objects:
+            value = field._get(key, obj)
+            if value is None:
+                continue
+            elif isinstance(value, (list, tuple, set)) and (
+                many or nested.loader is None
+            ):
+                values.extend(value)
+            else:
+                values.append(value)
+        if nested.loader is not None:
+            results = batches.setdefault(id(nested), {})
+            keys = list(OrderedDict.fromkeys(k for k in values if k not in results))
+            if not keys:
+                continue
+            loaded = nested.loader(keys)
+            if not isinstance(loaded, dict):
+                loaded = dict(zip(keys, loaded))
+            values = [loaded.get(k) for k in keys]
+            results.update(zip(keys, values))
+        values = [value for value in values if value is not None]
+        if values and _needs_batches(nested.nested):
+            _load_batches(nested.nested, values, batches)
 
-    mask = mask or getattr(fields, "__mask__", None)
-    fields = getattr(fields, "resolved", fields)
+
+def _load(field, key):
+    """Get an object from a batched field loader, from the current batch if loaded"""
+    results = (_batches.get() or {}).get(id(field))
+    if results is not None and key in results:
+        return results[key]
+    loaded = field.loader([key])
+    if not isinstance(loaded, dict):
+        loaded = dict(zip([key], loaded))
+    return loaded.get(key)
+
+
+class _Deferred(object):
+    """Stand-in for a marshaller still being compiled (recursive models)"""
+
+    __slots__ = ("marshaller",)
+
+    def __init__(self):
+        self.marshaller = None
+
+    def __call__(self, data):
+        return self.marshaller(data)
+
+
+def compiled_marshaller(fields, skip_none=False, ordered=False):
+    """
+    Get the compiled marshaller for a given fields dict or model.
+
+    Marshallers are cached on :class:`~flask_restx.Model` instances,
+    plain dicts are compiled on every call.
+
+    :param fields: a dict or a model of fields to compile
+    :param bool skip_none: Whether or not to eliminate ``None`` values
+    :param bool ordered: Wether or not to preserve order
+    :return: a callable taking the data and returning the marshalled output
+    """
+    return _compiled(fields, skip_none, ordered, None, {})
+
+
+def compile_marshaller(fields, skip_none=False, ordered=False, mask=None):
+    """
+    Compile a dict or a model of fields into a specialized marshalling function.
+
+    The fields are resolved, made and inspected once: accessors
+    (see :func:`~fields.get_accessor`), defaults and formatters
+    of the common fields are inlined into generated Python code,
+    :class:`~fields.Nested`, :class:`~fields.List` and :class:`~fields.Polymorph`
+    fields are bound to their own compiled marshallers.
+    Any other field is called through its :meth:`~fields.Raw.output` method
+    so the output is identical to :func:`marshal`.
+
+    >>> from flask_restx import fields
+    >>> from flask_restx.marshalling import compile_marshaller
+    >>> marshaller = compile_marshaller({'a': fields.Raw, 'b': fields.Integer})
+    >>> marshaller({'a': 100, 'b': '42', 'c': None})
+    {'a': 100, 'b': 42}
+
+    :param fields: a dict or a model of fields to compile
+    :param bool skip_none: Whether or not to eliminate ``None`` values
+    :param bool ordered: Wether or not to preserve order
+    :param mask: an optional mask overriding the model one
+    :return: a callable taking the data and returning the marshalled output
+    """
+    return _compile(fields, skip_none, ordered, mask, {})
+
+
+def _compiled(fields, skip_none, ordered, mask, memo):
     if mask:
-        fields = apply_mask(fields, mask, skip=True)
+        return _compile(fields, skip_none, ordered, mask, memo)
+    cache = getattr(fields, "__marshallers__", None)
+    key = (skip_none, ordered)
+    if cache is not None and key in cache:
+        return cache[key]
+    marshaller = _compile(fields, skip_none, ordered, None, memo)
+    if cache is not None:
+        cache[key] = marshaller
+    return marshaller
 
-    if isinstance(data, (list, tuple)):
-        out = [marshal(d, fields, skip_none=skip_none, ordered=ordered) for d in data]
-        if envelope:
-            out = OrderedDict([(envelope, out)]) if ordered else {envelope: out}
-        return out, False
 
-    has_wildcards = {"present": False}
+def _compile(fields, skip_none, ordered, mask, memo):
+    # Resolving a recursive model copies its nested models at each level
+    origin = getattr(fields, "__origin__", fields)
+    memo_key = (id(origin), skip_none, ordered, id(mask))
+    if memo_key in memo:
+        return memo[memo_key]
+    deferred = memo[memo_key] = _Deferred()
+
+    marshaller = _generate(_resolve(fields, mask), skip_none, ordered, memo)
+
+    deferred.marshaller = marshaller
+    memo[memo_key] = marshaller
+    return marshaller
+
+
+def _generate(fields, skip_none, ordered, memo):
+    # ugly local import to avoid dependency loop
+    from .fields import (
+        Raw,
+        Nested,
+        List,
+        Polymorph,
+        Wildcard,
+        MarshallingError,
+        get_accessor,
+    )
+
+    namespace = {
+        "OrderedDict": OrderedDict,
+        "MarshallingError": MarshallingError,
+    }
+    body = []
+
+    def emit(*lines):
+        body.extend(lines)
+
+    # keys marshalled since the last wildcard are excluded from the next one
+    keys = set()
+    for idx, (key, val) in enumerate(fields.items()):
+        namespace["k%d" % idx] = key
+        if isinstance(val, dict):
+            namespace["m%d" % idx] = _compiled(val, skip_none, ordered, None, memo)
+            emit("    value = m{0}(obj)".format(idx))
+            _emit_store(emit, idx, skip_none)
+            keys.add(key)
+            continue
 
-    def __format_field(key, val):
         field = make(val)
         if isinstance(field, Wildcard):
-            has_wildcards["present"] = True
-        value = field.output(key, data, ordered=ordered)
-        return (key, value)
-
-    items = (
-        (
-            (k, marshal(data, v, skip_none=skip_none, ordered=ordered))
-            if isinstance(v, dict)
-            else __format_field(k, v)
-        )
-        for k, v in fields.items()
+            namespace["f%d" % idx] = field
+            namespace["x%d" % idx] = frozenset(keys)
+            keys = set()
+            emit(
+                "    items = f{0}.output_items(k{0}, obj, ordered, x{0})".format(idx),
+                "    for key, value in items:",
+            )
+            if skip_none:
+                emit(
+                    "        if value is None or value == OrderedDict() or value == {}:",
+                    "            continue",
+                )
+            emit("        out[key] = value")
+            continue
+
+        keys.add(key)
+        namespace["f%d" % idx] = field
+        accessor = get_accessor(key if field.attribute is None else field.attribute)
+        namespace["a%d" % idx] = _lazy(accessor) if field.lazy else accessor
+        cls = type(field)
+
+        if cls.output is Raw.output:
+            emit("    value = a{0}(obj)".format(idx))
+            _emit_default(emit, namespace, idx, field)
+            emit(
+                "    else:",
+                "        try:",
+                "            value = f{0}.format(value)".format(idx),
+                "        except MarshallingError as e:",
+                "            raise MarshallingError(",
+                '                \'Unable to marshal field "{0}" value "{1}": {2}\''
+                ".format(k%d, value, str(e))" % idx,
+                "            )",
+            )
+            if field.mask:
+                emit("        value = f{0}.mask.apply(value)".format(idx))
+        elif (cls is Nested or cls is Polymorph) and field.loader is None:
+            emit("    value = a{0}(obj)".format(idx))
+            indent = "        "
+            if field.allow_null:
+                emit("    if value is None:", "        pass", "    else:")
+            elif field.default is not None:
+                namespace["d%d" % idx] = field.default
+                emit("    if value is None:", "        value = d{0}".format(idx))
+                emit("    else:")
+            else:
+                indent = "    "
+            if cls is Nested:
+                namespace["m%d" % idx] = _compiled(
+                    field.model, field.skip_none, ordered, None, memo
+                )
+                emit(indent + "value = m{0}(value)".format(idx))
+            else:
+                namespace["p%d" % idx] = dict(
+                    (klass, _compiled(model.resolved, False, ordered, field.mask, memo))
+                    for klass, model in field.mapping.items()
+                )
+                emit(
+                    *(
+                        indent + line
+                        for line in (
+                            "marshaller = p{0}.get(type(value))".format(idx),
+                            "if marshaller is None:",
+                            "    raise ValueError(",
+                            "        'Unknown class: ' + value.__class__.__name__",
+                            "    )",
+                            "value = marshaller(value)",
+                        )
+                    )
+                )
+        elif cls is List and _list_items(field, memo):
+            namespace["i%d" % idx] = _list_items(field, memo)
+            emit(
+                "    value = a{0}(obj)".format(idx),
+                "    if value is None:",
+                "        value = f{0}._v('default')".format(idx),
+                "    elif isinstance(value, (list, tuple, set)):",
+                "        value = i{0}(value)".format(idx),
+                "    else:",
+                "        value = f{0}.output(k{0}, obj, ordered=ordered)".format(idx),
+            )
+        else:
+            emit("    value = f{0}.output(k{0}, obj, ordered=ordered)".format(idx))
+        _emit_store(emit, idx, skip_none)
+
+    name = "marshal_{0}".format(
+        re.sub(r"\W", "_", str(getattr(fields, "name", None) or "fields"))
+    )
+    source = "\n".join(
+        [
+            "def {0}(obj):".format(name),
+            "    if isinstance(obj, (list, tuple)):",
+            "        return [{0}(o) for o in obj]".format(name),
+            "    out = OrderedDict() if ordered else {}",
+        ]
+        + body
+        + ["    return out"]
     )
+    namespace["ordered"] = ordered
+    exec(compile(source, "<marshaller {0}>".format(name), "exec"), namespace)
+    marshaller = namespace[name]
+    marshaller.__source__ = source
+    return marshaller
 
-    if skip_none:
-        items = (
-            (k, v) for k, v in items if v is not None and v != OrderedDict() and v != {}
+
+def _lazy(accessor):
+    """Wrap an accessor to evaluate lazy (callable) values"""
+
+    def getter(obj, default=None):
+        value = accessor(obj, default)
+        return value() if callable(value) else value
+
+    return getter
+
+
+def _emit_default(emit, namespace, idx, field):
+    """Inline :meth:`fields.Raw.output` default handling"""
+    default = field.default
+    if callable(default) or default:
+        emit(
+            "    if value is None:",
+            "        value = f{0}._v('default')".format(idx),
+            "        if value:",
+            "            value = f{0}.format(value)".format(idx),
         )
+    else:
+        namespace["d%d" % idx] = default
+        emit("    if value is None:", "        value = d{0}".format(idx))
 
-    out = OrderedDict(items) if ordered else dict(items)
 
-    if envelope:
-        out = OrderedDict([(envelope, out)]) if ordered else {envelope: out}
+def _emit_store(emit, idx, skip_none):
+    if skip_none:
+        emit(
+            "    if value is not None and value != OrderedDict() and value != {}:",
+            "        out[k{0}] = value".format(idx),
+        )
+    else:
+        emit("    out[k{0}] = value".format(idx))
 
-    return out, has_wildcards["present"]
+
+def _list_items(field, memo):
+    """
+    Build a function marshalling the items of a :class:`fields.List`
+    or ``None`` if its container can't be specialized.
+    """
+    # ugly local import to avoid dependency loop
+    from .fields import Raw, Nested, MarshallingError
+
+    container = field.container
+    if container.attribute is not None or getattr(container, "loader", None):
+        return None
+
+    if type(container) is Nested:
+        # List does not propagate ordering to its items
+        marshaller = _compiled(container.model, container.skip_none, False, None, memo)
+        default = None if container.allow_null else container.default
+        marshal_none = not container.allow_null and container.default is None
+
+        def items(value):
+            return [
+                default if val is None and not marshal_none else marshaller(val)
+                for val in value
+            ]
+
+        return items
+
+    if type(container).output is not Raw.output:
+        return None
+
+    # Raw containers are treated as nested: dicts are not looked up into
+    dict_lookup = type(container) is not Raw
+    output = container.output
+    fmt = container.format
+
+    def item(idx, val):
+        if dict_lookup and isinstance(val, dict):
+            return output(idx, val)
+        if val is None:
+            value = container._v("default")
+            return fmt(value) if value else value
+        try:
+            data = fmt(val)
+        except MarshallingError as e:
+            msg = 'Unable to marshal field "{0}" value "{1}": {2}'.format(
+                idx, val, str(e)
+            )
+            raise MarshallingError(msg)
+        return container.mask.apply(data) if container.mask else data
+
+    def items(value):
+        return [item(idx, val) for idx, val in enumerate(value)]
+
+    return items
 
 
 class marshal_with(object):
@@ -226,46 +800,74 @@ class marshal_with(object):
     """
 
     def __init__(
-        self, fields, envelope=None, skip_none=False, mask=None, ordered=False
+        self,
+        fields,
+        envelope=None,
+        skip_none=False,
+        mask=None,
+        ordered=False,
+        compiled=False,
+        stream=False,
     ):
         """
         :param fields: a dict of whose keys will make up the final
                        serialized response output
         :param envelope: optional key that will be used to envelop the serialized
                          response
+        :param bool compiled: Whether or not to use a compiled marshaller
+        :param bool stream: Whether or not to lazily marshal the returned iterable
+                            as a :class:`StreamedList`
         """
         self.fields = fields
         self.envelope = envelope
         self.skip_none = skip_none
         self.ordered = ordered
         self.mask = Mask(mask, skip=True)
+        self.compiled = compiled
+        self.stream = stream
+
+    def marshal(self, data, mask):
+        if self.stream:
+            return StreamedList(
+                data,
+                self.fields,
+                self.envelope,
+                self.skip_none,
+                mask,
+                self.ordered,
+                self.compiled,
+            )
+        return marshal(
+            data,
+            self.fields,
+            self.envelope,
+            self.skip_none,
+            mask,
+            self.ordered,
+            self.compiled,
+        )
 
     def __call__(self, f):
         @wraps(f)
         def wrapper(*args, **kwargs):
-            resp = f(*args, **kwargs)
             mask = self.mask
             if has_app_context():
                 mask_header = current_app.config["RESTX_MASK_HEADER"]
                 mask = request.headers.get(mask_header) or mask
+                # exposed to the decorated method by requested_fields()
+                previous = g.get("_restx_requested")
+                g._restx_requested = (self.fields, mask)
+                try:
+                    resp = f(*args, **kwargs)
+                finally:
+                    g._restx_requested = previous
+            else:
+                resp = f(*args, **kwargs)
             if isinstance(resp, tuple):
                 data, code, headers = unpack(resp)
-                return (
-                    marshal(
-                        data,
-                        self.fields,
-                        self.envelope,
-                        self.skip_none,
-                        mask,
-                        self.ordered,
-                    ),
-                    code,
-                    headers,
-                )
+                return self.marshal(data, mask), code, headers
             else:
-                return marshal(
-                    resp, self.fields, self.envelope, self.skip_none, mask, self.ordered
-                )
+                return self.marshal(resp, mask)
 
         return wrapper
 
@@ -15,6 +15,7 @@ from jsonschema.validators import validator_for
 from jsonschema.exceptions import ValidationError
 
 from .utils import not_none
+from .validation import ENGINES, SCHEMA_ID, compile_validator
 from ._http import HTTPStatus
 
 RE_REQUIRED = re.compile(r"u?\'(?P<name>.*)\' is a required property", re.I | re.U)
@@ -35,6 +36,8 @@ class ModelBase(object):
     """
 
     def __init__(self, name, *args, **kwargs):
+        # validators cache, see :meth:`get_validator`
+        self.__validators__ = {}
         super(ModelBase, self).__init__(*args, **kwargs)
         self.__apidoc__ = {"name": name}
         self.name = name
@@ -65,6 +68,16 @@ class ModelBase(object):
 
     @property
     def __schema__(self):
+        """
+        The model JSON schema.
+
+        It is built once and cached until the model changes (see :meth:`_invalidate`).
+        The schema is shared by the specifications and the validators: it must not be modified.
+        """
+        cached = self.__dict__.get("__definition__")
+        # Parents are assigned after instanciation (see :meth:`inherit`)
+        if cached is not None and cached[0] is self.__parents__:
+            return cached[1]
         schema = self._schema
 
         if self.__parents__:
@@ -73,9 +86,9 @@ class ModelBase(object):
                 for parent in self.__parents__
             ]
 
-            return {"allOf": refs + [schema]}
-        else:
-            return schema
+            schema = {"allOf": refs + [schema]}
+        self.__definition__ = (self.__parents__, schema)
+        return schema
 
     @classmethod
     def inherit(cls, name, *parents):
@@ -88,37 +101,99 @@ class ModelBase(object):
         model.__parents__ = parents[:-1]
         return model
 
-    def validate(self, data, resolver=None, format_checker=None):
+    def validate(
+        self, data, resolver=None, format_checker=None, engine=None, collection=False
+    ):
+        """
+        Validate a payload against this model and abort with a 400 on failure.
+
+        The payload is walked once and errors are only collected
+        when the payload is invalid.
+
+        :param bool collection: validate a list of objects of this model
+            (error keys are prefixed by the item index)
+        """
+        validator = self.get_validator(resolver, format_checker, engine, collection)
+        if engine == "compiled":
+            errors = validator.errors(data)
+        else:
+            errors = (self.format_error(e) for e in validator.iter_errors(data))
+            first = next(errors, None)
+            errors = [first] + list(errors) if first is not None else None
+        if errors:
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                message="Input payload validation failed",
+                errors=dict(errors),
+            )
+
+    def get_validator(
+        self, resolver=None, format_checker=None, engine=None, collection=False
+    ):
+        """
+        Get the JSON schema validator for this model.
+
+        Validators are built once per resolver, format checker and engine
+        and cached on the model until it changes.
+
+        :param resolver: an optional ``referencing.Registry`` (or legacy ``RefResolver``)
+        :param format_checker: an optional ``jsonschema.FormatChecker``
+        :param str engine: the validation engine, ``jsonschema`` (default)
+            or ``compiled`` (see :class:`~flask_restx.validation.CompiledValidator`)
+        :param bool collection: get the validator for a list of objects of this model
+        """
+        engine = engine or "jsonschema"
+        if engine not in ENGINES:
+            raise ValueError("Unknown validation engine: {0}".format(engine))
+        key = (id(resolver), id(format_checker), engine, collection)
+        cached = self.__validators__.get(key)
+        # ids can be reused once the resolver or format checker are garbage collected
+        if cached and cached[0] is resolver and cached[1] is format_checker:
+            return cached[2]
+        schema = self.__schema__
+        if collection:
+            schema = {"type": "array", "items": schema}
+        if engine == "compiled":
+            validator = self._compile_validator(schema, resolver, format_checker)
+        else:
+            validator = self._build_validator(schema, resolver, format_checker)
+        self.__validators__[key] = (resolver, format_checker, validator)
+        return validator
+
+    def _compile_validator(self, schema, resolver=None, format_checker=None):
+        if resolver is not None and hasattr(resolver, "resolve"):
+            # Legacy RefResolvers can't provide the definitions to compile
+            raise ValueError("The compiled validation engine requires a Registry")
+        definitions = _definitions(resolver) if resolver is not None else {}
+        return compile_validator(schema, definitions, format_checker, registry=resolver)
+
+    def _build_validator(self, schema, resolver=None, format_checker=None):
         # For backward compatibility, resolver can be either a RefResolver or a Registry
         if resolver is not None and hasattr(resolver, "resolve"):
             # Old RefResolver - convert to registry
             registry = None
             validator = Draft4Validator(
-                self.__schema__, resolver=resolver, format_checker=format_checker
+                schema, resolver=resolver, format_checker=format_checker
             )
         else:
             # New Registry or None
             # If we have a registry, we need to create a schema that includes definitions
-            schema_to_validate = self.__schema__
+            schema_to_validate = schema
             if resolver is not None:
                 # Check if the schema has $ref that need to be resolved
                 import json
 
-                schema_str = json.dumps(self.__schema__)
+                schema_str = json.dumps(schema_to_validate)
                 if '"$ref"' in schema_str:
                     # Create a schema with inline definitions from the registry
-                    definitions = {}
-                    for uri in resolver:
-                        resource = resolver[uri]
-                        if isinstance(resource, dict) and "definitions" in resource:
-                            definitions.update(resource["definitions"])
+                    definitions = _definitions(resolver)
 
                     if definitions:
                         # Create a new schema that includes the definitions
                         schema_to_validate = {
-                            "$id": "http://localhost/schema.json",
+                            "$id": SCHEMA_ID,
                             "definitions": definitions,
-                            **self.__schema__,
+                            **schema,
                         }
 
             ValidatorClass = validator_for(schema_to_validate)
@@ -130,15 +205,14 @@ class ModelBase(object):
                 validator = ValidatorClass(
                     schema_to_validate, format_checker=format_checker
                 )
+        return validator
 
-        try:
-            validator.validate(data)
-        except ValidationError:
-            abort(
-                HTTPStatus.BAD_REQUEST,
-                message="Input payload validation failed",
-                errors=dict(self.format_error(e) for e in validator.iter_errors(data)),
-            )
+    def _invalidate(self):
+        """Drop what is cached from the model definition (schema and validators)"""
+        self.__dict__.pop("__definition__", None)
+        validators = self.__dict__.get("__validators__")
+        if validators:
+            validators.clear()
 
     def format_error(self, error):
         path = list(error.path)
@@ -156,6 +230,16 @@ class ModelBase(object):
     __str__ = __unicode__
 
 
+def _definitions(registry):
+    """Gather the schema definitions from a registry"""
+    definitions = {}
+    for uri in registry:
+        resource = registry[uri]
+        if isinstance(resource, dict) and "definitions" in resource:
+            definitions.update(resource["definitions"])
+    return definitions
+
+
 class RawModel(ModelBase):
     """
     A thin wrapper on ordered fields dict to store API doc metadata.
@@ -171,6 +255,8 @@ class RawModel(ModelBase):
     def __init__(self, name, *args, **kwargs):
         self.__mask__ = kwargs.pop("mask", None)
         self.__strict__ = kwargs.pop("strict", False)
+        # compiled marshallers cache, see :func:`~flask_restx.marshalling.compile_marshaller`
+        self.__marshallers__ = {}
         if self.__mask__ and not isinstance(self.__mask__, Mask):
             self.__mask__ = Mask(self.__mask__)
         super(RawModel, self).__init__(name, *args, **kwargs)
@@ -219,14 +305,25 @@ class RawModel(ModelBase):
             resolved.update(parent.resolved)
 
         # Handle discriminator
-        candidates = [f for f in resolved.values() if getattr(f, "discriminator", None)]
+        candidates = [
+            (name, field)
+            for name, field in resolved.items()
+            if getattr(field, "discriminator", None)
+        ]
         # Ensure the is only one discriminator
         if len(candidates) > 1:
             raise ValueError("There can only be one discriminator by schema")
         # Ensure discriminator always output the model name
         elif len(candidates) == 1:
-            candidates[0].default = self.name
-
+            name, field = candidates[0]
+            # The field may be shared with the parents resolved fields
+            field = copy.copy(field)
+            field.__dict__.pop("__schema__", None)
+            field.default = self.name
+            resolved[name] = field
+
+        # Resolved fields are already resolved: keep marshalling on the same fields
+        resolved.__dict__["resolved"] = resolved
         return resolved
 
     def extend(self, name, fields):
@@ -269,6 +366,47 @@ class RawModel(ModelBase):
             fields.update(copy.deepcopy(parent))
         return cls(name, fields)
 
+    def _invalidate(self):
+        """Drop what is cached from the model definition (including the marshallers)"""
+        super(RawModel, self)._invalidate()
+        self.__dict__.pop("resolved", None)
+        # A modified copy no longer marshals like its original
+        self.__dict__.pop("__origin__", None)
+        marshallers = self.__dict__.get("__marshallers__")
+        if marshallers:
+            marshallers.clear()
+
+    def __setitem__(self, key, value):
+        super(RawModel, self).__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        super(RawModel, self).__delitem__(key)
+        self._invalidate()
+
+    def update(self, *args, **kwargs):
+        super(RawModel, self).update(*args, **kwargs)
+        self._invalidate()
+
+    def pop(self, *args):
+        value = super(RawModel, self).pop(*args)
+        self._invalidate()
+        return value
+
+    def popitem(self, *args, **kwargs):
+        item = super(RawModel, self).popitem(*args, **kwargs)
+        self._invalidate()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super(RawModel, self).setdefault(key, default)
+        self._invalidate()
+        return value
+
+    def clear(self):
+        super(RawModel, self).clear()
+        self._invalidate()
+
     def __deepcopy__(self, memo):
         obj = self.__class__(
             self.name,
@@ -277,6 +415,8 @@ class RawModel(ModelBase):
             strict=self.__strict__,
         )
         obj.__parents__ = self.__parents__
+        # Copies (ie. nested in resolved fields) compile like the original model
+        obj.__origin__ = getattr(self, "__origin__", self)
         return obj
 
 
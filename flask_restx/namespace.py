@@ -3,13 +3,13 @@ import warnings
 import logging
 from collections import namedtuple, OrderedDict
 
-from flask import request
 from flask.views import http_method_funcs
 
 from ._http import HTTPStatus
 from .errors import abort
-from .marshalling import marshal, marshal_with
+from .marshalling import marshal, marshal_with, requested_fields
 from .model import Model, OrderedModel, SchemaModel
+from .payload import request_payload
 from .reqparse import RequestParser
 from .utils import merge
 
@@ -155,7 +155,7 @@ class Namespace(object):
     def add_model(self, name, definition):
         self.models[name] = definition
         for api in self.apis:
-            api.models[name] = definition
+            api._register_model(name, definition)
         return definition
 
     def model(self, name=None, model=None, mask=None, strict=False, **kwargs):
@@ -276,6 +276,10 @@ class Namespace(object):
         """A shortcut to the :func:`marshal` helper"""
         return marshal(*args, **kwargs)
 
+    def requested_fields(self):
+        """A shortcut to the :func:`~flask_restx.marshalling.requested_fields` helper"""
+        return requested_fields()
+
     def errorhandler(self, exception):
         """A decorator to register an error handler for a given exception"""
         if inspect.isclass(exception) and issubclass(exception, Exception):
@@ -350,7 +354,7 @@ class Namespace(object):
     @property
     def payload(self):
         """Store the input payload in the current request context"""
-        return request.get_json()
+        return request_payload().json
 
 
 def unshortcut_params_description(data):
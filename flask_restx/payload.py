@@ -0,0 +1,148 @@
+from flask import current_app, has_app_context, request as current_request
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+
+from .codec import codec_for
+
+#: The locations served by the decoded JSON body
+JSON_LOCATIONS = frozenset(("json", "get_json"))
+
+_missing = object()
+
+
+class RequestPayload(object):
+    """
+    The decoded input of a request.
+
+    The JSON body is decoded at most once and merged locations are built once,
+    then shared by the payload validation, :attr:`Api.payload <flask_restx.Api.payload>`
+    and the request parsers.
+
+    :param request: the request to decode
+    """
+
+    def __init__(self, request):
+        self.request = request
+        #: The number of times the JSON body has been decoded
+        self.decodes = 0
+        self._json = _missing
+        self._error = None
+        self._merged = {}
+        self._sources = {}
+
+    def get_json(self, silent=False):
+        """
+        Get the decoded JSON body
+
+        :param bool silent: return ``None`` instead of raising on an invalid body
+        :raises HTTPException: when the body can't be decoded (unless silent)
+        """
+        if self._json is _missing:
+            self.decodes += 1
+            try:
+                self._json = self._decode()
+            except HTTPException as error:
+                self._json, self._error = None, error
+        if self._error is not None and not silent:
+            raise self._error
+        return self._json
+
+    def _decode(self):
+        request = self.request
+        # Non JSON or non Flask requests are left to the request itself,
+        # as well as requests of applications without an explicit codec
+        # (decoded by the Flask JSON provider)
+        if (
+            not has_app_context()
+            or getattr(request, "is_json", False) is not True
+            or current_app.config.get("RESTX_JSON_CODEC") is None
+        ):
+            return request.get_json()
+        data = request.get_data(cache=True)
+        try:
+            return codec_for(current_app).loads(data)
+        except ValueError as error:
+            return request.on_json_loading_failed(error)
+
+    @property
+    def json(self):
+        """The decoded JSON body"""
+        return self.get_json()
+
+    @property
+    def args(self):
+        """The query string values"""
+        return self.location("args")
+
+    @property
+    def form(self):
+        """The form values"""
+        return self.location("form")
+
+    def location(self, location):
+        """
+        Get the values found in a single location
+
+        :param str location: a request attribute (``args``, ``headers``...) or ``json``
+        :return: the values or ``None`` if there is none
+        """
+        if location in JSON_LOCATIONS:
+            return self.get_json(silent=True)
+        value = getattr(self.request, location, None)
+        if callable(value):
+            value = value()
+        return value
+
+    def source(self, location):
+        """
+        Get the values of one or many locations, as :meth:`Argument.source
+        <flask_restx.reqparse.Argument.source>` does, once per request.
+
+        :param location: a single location or an iterable of locations
+        """
+        key = location if isinstance(location, str) else tuple(location)
+        values = self._sources.get(key)
+        if values is None:
+            if isinstance(location, str):
+                values = self.location(location)
+                if values is None:
+                    values = MultiDict()
+            else:
+                values = self.merged(key)
+            self._sources[key] = values
+        return values
+
+    def merged(self, locations):
+        """
+        Get the values found in many locations merged into a single :class:`MultiDict`.
+
+        The merged values are built once per request and shared: they must not be modified.
+
+        :param locations: an iterable of locations
+        :rtype: MultiDict
+        """
+        locations = tuple(locations)
+        values = self._merged.get(locations)
+        if values is None:
+            values = MultiDict()
+            for location in locations:
+                value = self.location(location)
+                if value is not None:
+                    values.update(value)
+            self._merged[locations] = values
+        return values
+
+
+def request_payload(request=None):
+    """
+    Get the decoded payload of a request (the current one by default).
+
+    :rtype: RequestPayload
+    """
+    if request is None:
+        request = current_request
+    payload = getattr(request, "_restx_payload", None)
+    if not isinstance(payload, RequestPayload):
+        payload = RequestPayload(request)
+        request._restx_payload = payload
+    return payload
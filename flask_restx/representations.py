@@ -1,26 +1,51 @@
-try:
-    from ujson import dumps
-except ImportError:
-    from json import dumps
+from flask import make_response, current_app, stream_with_context
 
-from flask import make_response, current_app
+from .codec import codec_for
+from .marshalling import StreamedList
 
 
 def output_json(data, code, headers=None):
     """Makes a Flask response with a JSON encoded body"""
 
-    settings = current_app.config.get("RESTX_JSON", {})
+    codec = codec_for(current_app)
 
-    # If we're in debug mode, and the indent is not set, we set it to a
-    # reasonable value here.  Note that this won't override any existing value
-    # that was set.
-    if current_app.debug:
-        settings.setdefault("indent", 4)
+    if isinstance(data, StreamedList):
+        body = stream_with_context(stream_json(data, codec))
+        resp = make_response(body, code)
+        resp.mimetype = "application/json"
+        resp.headers.extend(headers or {})
+        return resp
 
     # always end the json dumps with a new line
     # see https://github.com/mitsuhiko/flask/pull/1262
-    dumped = dumps(data, **settings) + "\n"
+    dumped = codec.dumps(data, newline=True)
 
     resp = make_response(dumped, code)
     resp.headers.extend(headers or {})
     return resp
+
+
+def stream_json(stream, codec):
+    """
+    Lazily encode a :class:`~flask_restx.marshalling.StreamedList` as a JSON array.
+
+    Items are encoded one by one and yielded by chunks of ``stream.chunk_size`` items.
+
+    :param JSONCodec codec: the codec encoding the items
+    """
+    if stream.envelope:
+        yield b"{" + codec.dumps(stream.envelope) + b": ["
+    else:
+        yield b"["
+    chunk = []
+    separator = b""
+    for item in stream:
+        chunk.append(codec.dumps(item))
+        if len(chunk) >= stream.chunk_size:
+            yield separator + b",".join(chunk)
+            separator = b","
+            chunk = []
+    if chunk:
+        yield separator + b",".join(chunk)
+    # always end the json dumps with a new line
+    yield b"]}\n" if stream.envelope else b"]\n"
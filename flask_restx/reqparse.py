@@ -1,18 +1,21 @@
+import copy
 import decimal
 
 try:
-    from collections.abc import Hashable
+    from collections.abc import Container, Hashable
 except ImportError:
-    from collections import Hashable
-from copy import deepcopy
+    from collections import Container, Hashable
+from functools import partial
 from flask import current_app, request
 
 from werkzeug.datastructures import MultiDict, FileStorage
 from werkzeug import exceptions
 
 from .errors import abort, SpecsError
+from .inputs import bulk
 from .marshalling import marshal
 from .model import Model
+from .payload import request_payload
 from ._http import HTTPStatus
 
 
@@ -63,6 +66,47 @@ PY_TYPES = {
 SPLIT_CHAR = ","
 
 
+def _lookup(choices):
+    """
+    Build the lookup of some choices
+
+    Lists, tuples and other plain iterables are copied once into a set
+    (a tuple for unhashable choices). Other containers (``range``, sets, dicts,
+    enums...) are used as is so their own membership test applies.
+    """
+    if isinstance(choices, (list, tuple)) or not isinstance(choices, Container):
+        if not hasattr(choices, "__iter__"):
+            return choices
+        choices = tuple(choices)
+        try:
+            return frozenset(choices)
+        except TypeError:
+            return choices
+    return choices
+
+
+def _folded(lookup):
+    """
+    Build the lookup of some choices lowercased (for case insensitive arguments)
+
+    The choices lookup is reused as is when there is nothing to lowercase.
+    """
+    if isinstance(lookup, range) or not hasattr(lookup, "__iter__"):
+        return lookup
+    folded = tuple(c.lower() if hasattr(c, "lower") else c for c in lookup)
+    if all(a is b for a, b in zip(folded, lookup)):
+        return lookup
+    return _lookup(folded)
+
+
+def _is_allowed(value, allowed):
+    try:
+        return value in allowed
+    except TypeError:
+        # Unhashable values (ie. split lists) can't match hashable choices
+        return False
+
+
 class Argument(object):
     """
     :param name: Either a name or a list of option strings, e.g. foo or -f, --foo.
@@ -80,6 +124,9 @@ class Argument(object):
         to source the arguments from (ex: headers, args, etc.), can be an
         iterator. The last item listed takes precedence in the result set.
     :param choices: A container of the allowable values for the argument.
+        Lists and tuples of hashable choices are looked up in sets (built once,
+        with their lowercased variants if needed), unhashable ones fall back to
+        a linear scan. Other containers (ie. ``range``) are used as is.
     :param help: A brief description of the argument, returned in the
         response when the argument is invalid. May optionally contain
         an "{error_msg}" interpolation token, which will be replaced with
@@ -92,6 +139,26 @@ class Argument(object):
     :param bool nullable: If enabled, allows null value in argument.
     """
 
+    __slots__ = (
+        "name",
+        "default",
+        "dest",
+        "required",
+        "ignore",
+        "location",
+        "type",
+        "_choices",
+        "_choices_set",
+        "_folded_choices",
+        "action",
+        "help",
+        "case_sensitive",
+        "operators",
+        "store_missing",
+        "trim",
+        "nullable",
+    )
+
     def __init__(
         self,
         name,
@@ -129,34 +196,30 @@ class Argument(object):
         self.trim = trim
         self.nullable = nullable
 
+    @property
+    def choices(self):
+        return self._choices
+
+    @choices.setter
+    def choices(self, choices):
+        self._choices = choices
+        self._choices_set = _lookup(choices)
+        self._folded_choices = None
+
+    def _allowed(self):
+        """The choices lookup matching the case sensitivity"""
+        if self.case_sensitive:
+            return self._choices_set
+        if self._folded_choices is None:
+            self._folded_choices = _folded(self._choices_set)
+        return self._folded_choices
+
     def source(self, request):
         """
         Pulls values off the request in the provided location
         :param request: The flask request object to parse arguments from
         """
-        if isinstance(self.location, str):
-            if self.location in {"json", "get_json"}:
-                value = request.get_json(silent=True)
-            else:
-                value = getattr(request, self.location, MultiDict())
-            if callable(value):
-                value = value()
-            if value is not None:
-                return value
-        else:
-            values = MultiDict()
-            for l in self.location:
-                if l in {"json", "get_json"}:
-                    value = request.get_json(silent=True)
-                else:
-                    value = getattr(request, l, None)
-                if callable(value):
-                    value = value()
-                if value is not None:
-                    values.update(value)
-            return values
-
-        return MultiDict()
+        return request_payload(request).source(self.location)
 
     def convert(self, value, op):
         # Don't cast None
@@ -184,6 +247,26 @@ class Argument(object):
             except TypeError:
                 return self.type(value)
 
+    def convert_many(self, values, op):
+        """
+        Convert many values at once with the bulk converter of the type
+        (see :func:`inputs.bulk <flask_restx.inputs.bulk>`),
+        one by one with :meth:`convert` if there is none.
+
+        :raises: the error of the first invalid value
+        """
+        many = None if type(self).convert is not Argument.convert else bulk(self.type)
+        if many is None or None in values:
+            return [self.convert(value, op) for value in values]
+        return many(values, self.name)
+
+    def _normalize(self, value):
+        if hasattr(value, "strip") and self.trim:
+            value = value.strip()
+        if hasattr(value, "lower") and not self.case_sensitive:
+            value = value.lower()
+        return value
+
     def handle_validation_error(self, error, bundle_errors):
         """
         Called when an error is raised while parsing. Aborts the request
@@ -213,76 +296,7 @@ class Argument(object):
             bundled
         """
         bundle_errors = current_app.config.get("BUNDLE_ERRORS", False) or bundle_errors
-        source = self.source(request)
-
-        results = []
-
-        # Sentinels
-        _not_found = False
-        _found = True
-
-        for operator in self.operators:
-            name = self.name + operator.replace("=", "", 1)
-            if name in source:
-                # Account for MultiDict and regular dict
-                if hasattr(source, "getlist"):
-                    values = source.getlist(name)
-                else:
-                    values = [source.get(name)]
-
-                for value in values:
-                    if hasattr(value, "strip") and self.trim:
-                        value = value.strip()
-                    if hasattr(value, "lower") and not self.case_sensitive:
-                        value = value.lower()
-
-                        if hasattr(self.choices, "__iter__"):
-                            self.choices = [choice.lower() for choice in self.choices]
-
-                    try:
-                        if self.action == "split":
-                            value = [
-                                self.convert(v, operator)
-                                for v in value.split(SPLIT_CHAR)
-                            ]
-                        else:
-                            value = self.convert(value, operator)
-                    except Exception as error:
-                        if self.ignore:
-                            continue
-                        return self.handle_validation_error(error, bundle_errors)
-
-                    if self.choices and value not in self.choices:
-                        msg = "The value '{0}' is not a valid choice for '{1}'.".format(
-                            value, name
-                        )
-                        return self.handle_validation_error(msg, bundle_errors)
-
-                    if name in request.unparsed_arguments:
-                        request.unparsed_arguments.pop(name)
-                    results.append(value)
-
-        if not results and self.required:
-            if isinstance(self.location, str):
-                location = _friendly_location.get(self.location, self.location)
-            else:
-                locations = [_friendly_location.get(loc, loc) for loc in self.location]
-                location = " or ".join(locations)
-            error_msg = "Missing required parameter in {0}".format(location)
-            return self.handle_validation_error(error_msg, bundle_errors)
-
-        if not results:
-            if callable(self.default):
-                return self.default(), _not_found
-            else:
-                return self.default, _not_found
-
-        if self.action == "append":
-            return results, _found
-
-        if self.action == "store" or len(results) == 1:
-            return results[0], _found
-        return results, _found
+        return _parse(CompiledArgument(self), request, bundle_errors)
 
     @property
     def __schema__(self):
@@ -313,6 +327,145 @@ class Argument(object):
         return param
 
 
+#: Types converting a value with a single positional parameter
+NATIVE_TYPES = (str, int, float, bool, decimal.Decimal)
+
+
+def _source(request, location):
+    return request_payload(request).source(location)
+
+
+def _parse(plan, request, bundle_errors):
+    """Parse the value(s) of an argument from the request with its parsing plan"""
+    source = plan.source(request)
+    getlist = getattr(source, "getlist", None)
+    results = []
+    for name, operator in plan.names:
+        if name not in source:
+            continue
+        values = getlist(name) if getlist else [source.get(name)]
+        converted = plan.action == "append" and len(values) > 1
+        if converted and not plan.ignore:
+            # Convert all the values at once
+            try:
+                values = plan.convert_many(
+                    [plan.argument._normalize(value) for value in values], operator
+                )
+            except Exception as error:
+                return plan.argument.handle_validation_error(error, bundle_errors)
+        else:
+            converted = False
+        for value in values:
+            if not converted:
+                if plan.trim and hasattr(value, "strip"):
+                    value = value.strip()
+                if plan.fold and hasattr(value, "lower"):
+                    value = value.lower()
+                try:
+                    if plan.split:
+                        value = plan.convert_many(value.split(SPLIT_CHAR), operator)
+                    else:
+                        value = plan.convert(value, operator)
+                except Exception as error:
+                    if plan.ignore:
+                        continue
+                    return plan.argument.handle_validation_error(error, bundle_errors)
+
+            if plan.choices is not None and not _is_allowed(value, plan.choices):
+                msg = "The value '{0}' is not a valid choice for '{1}'.".format(
+                    value, name
+                )
+                return plan.argument.handle_validation_error(msg, bundle_errors)
+
+            request.unparsed_arguments.pop(name, None)
+            results.append(value)
+
+    if not results:
+        if plan.required:
+            return plan.argument.handle_validation_error(plan.missing, bundle_errors)
+        if callable(plan.default):
+            return plan.default(), False
+        return plan.default, False
+
+    if plan.action == "append":
+        return results, True
+    if plan.action == "store" or len(results) == 1:
+        return results[0], True
+    return results, True
+
+
+class CompiledArgument(object):
+    """
+    A parsing plan for an :class:`Argument`, built by :meth:`RequestParser.compile`.
+
+    Operator names, converter and case-folded choices are computed once
+    instead of on every parsed request.
+
+    :param Argument argument: the compiled argument
+    """
+
+    def __init__(self, argument):
+        self.argument = argument
+        self.name = argument.name
+        self.dest = argument.dest
+        self.store_missing = argument.store_missing
+        self.default = argument.default
+        self.required = argument.required
+        self.location = argument.location
+        self.names = [
+            (argument.name + operator.replace("=", "", 1), operator)
+            for operator in argument.operators
+        ]
+        self.trim = argument.trim
+        self.fold = not argument.case_sensitive
+        self.split = argument.action == "split"
+        self.ignore = argument.ignore
+        self.action = argument.action
+        self.choices = argument._allowed() if argument.choices else None
+        self.convert = self._converter(argument)
+        self.convert_many = argument.convert_many
+        if type(argument).parse is not Argument.parse:
+            self.parse = argument.parse
+        if type(argument).source is Argument.source:
+            self.source = partial(_source, location=self.location)
+        else:
+            self.source = argument.source
+
+    @property
+    def missing(self):
+        """The missing required argument error message"""
+        if isinstance(self.location, str):
+            location = _friendly_location.get(self.location, self.location)
+        else:
+            locations = [_friendly_location.get(loc, loc) for loc in self.location]
+            location = " or ".join(locations)
+        return "Missing required parameter in {0}".format(location)
+
+    @staticmethod
+    def _converter(argument):
+        if type(argument).convert is not Argument.convert:
+            return argument.convert
+        if argument.type not in NATIVE_TYPES:
+            return argument.convert
+        native, nullable = argument.type, argument.nullable
+
+        def convert(value, op):
+            # Don't cast None
+            if value is None:
+                if not nullable:
+                    raise ValueError("Must not be null!")
+                return None
+            return native(value)
+
+        return convert
+
+    def parse(self, request, bundle_errors=False):
+        """
+        Parses argument value(s) from the request, as :meth:`Argument.parse` does.
+        """
+        return _parse(self, request, bundle_errors)
+
+
 class RequestParser(object):
     """
     Enables adding and parsing of multiple arguments in the context of a single request.
@@ -343,6 +496,7 @@ class RequestParser(object):
         self.result_class = result_class
         self.trim = trim
         self.bundle_errors = bundle_errors
+        self._compiled = None
 
     def add_argument(self, *args, **kwargs):
         """
@@ -366,6 +520,33 @@ class RequestParser(object):
 
         return self
 
+    def compile(self):
+        """
+        Compile the arguments into a parsing plan used by :meth:`parse_args`.
+
+        The plan is updated when arguments are added, replaced or removed
+        (including through :attr:`args`), but not when an argument is modified in place.
+        Arguments overriding :meth:`Argument.parse` are parsed by themselves.
+
+        :return: the parser itself
+        """
+        self._compiled = [CompiledArgument(arg) for arg in self.args]
+        return self
+
+    def _plan(self):
+        """The compiled plan matching the arguments (the arguments if not compiled)"""
+        compiled, args = self._compiled, self.args
+        if compiled is None:
+            return args
+        if len(compiled) != len(args) or any(
+            c.argument is not arg for c, arg in zip(compiled, args)
+        ):
+            # Only compile the added or replaced arguments
+            plans = dict((id(c.argument), c) for c in compiled)
+            compiled = [plans.get(id(arg)) or CompiledArgument(arg) for arg in args]
+            self._compiled = compiled
+        return compiled
+
     def parse_args(self, req=None, strict=False):
         """
         Parse all arguments from the provided request and return the results as a ParseResult
@@ -375,7 +556,7 @@ class RequestParser(object):
         :rtype: ParseResult
         """
         if req is None:
-            req = request
+            req = request._get_current_object()
 
         result = self.result_class()
 
@@ -384,9 +565,13 @@ class RequestParser(object):
         req.unparsed_arguments = (
             dict(self.argument_class("").source(req)) if strict else {}
         )
+        args = self._plan()
+        bundle_errors = self.bundle_errors
+        if args and not bundle_errors:
+            bundle_errors = current_app.config.get("BUNDLE_ERRORS", False)
         errors = {}
-        for arg in self.args:
-            value, found = arg.parse(req, self.bundle_errors)
+        for arg in args:
+            value, found = arg.parse(req, bundle_errors)
             if isinstance(value, ValueError):
                 errors.update(found)
                 found = None
@@ -405,17 +590,27 @@ class RequestParser(object):
         return result
 
     def copy(self):
-        """Creates a copy of this RequestParser with the same set of arguments"""
+        """
+        Creates a copy of this RequestParser with the same set of arguments
+
+        Arguments are copied shallowly (their type, choices and default are shared)
+        so modifying an argument of a parser does not affect the other one:
+        copying is cheap but still proportional to the number of arguments.
+        A compiled parser copy is compiled as well, on its first parsing.
+        """
         parser_copy = self.__class__(self.argument_class, self.result_class)
-        parser_copy.args = deepcopy(self.args)
+        parser_copy.args = [copy.copy(arg) for arg in self.args]
         parser_copy.trim = self.trim
         parser_copy.bundle_errors = self.bundle_errors
+        if self._compiled is not None:
+            # Compiled on first parsing, once its arguments are replaced or removed
+            parser_copy._compiled = []
         return parser_copy
 
     def replace_argument(self, name, *args, **kwargs):
         """Replace the argument matching the given name with a new version."""
         new_arg = self.argument_class(name, *args, **kwargs)
-        for index, arg in enumerate(self.args[:]):
+        for index, arg in enumerate(self.args):
             if new_arg.name == arg.name:
                 del self.args[index]
                 self.args.append(new_arg)
@@ -424,7 +619,7 @@ class RequestParser(object):
 
     def remove_argument(self, name):
         """Remove the argument matching the given name."""
-        for index, arg in enumerate(self.args[:]):
+        for index, arg in enumerate(self.args):
             if name == arg.name:
                 del self.args[index]
                 break
@@ -1,8 +1,9 @@
-from flask import request
+from flask import current_app, request
 from flask.views import MethodView
 
 
 from .model import ModelBase
+from .payload import request_payload
 
 from .utils import unpack, BaseResponse
 
@@ -61,13 +62,13 @@ class Resource(MethodView):
         expected, True if a collection of objects of a resource is expected.
         """
         # TODO: proper content negotiation
-        data = request.get_json()
-        if collection:
-            data = data if isinstance(data, list) else [data]
-            for obj in data:
-                expect.validate(obj, self.api.refresolver, self.api.format_checker)
-        else:
-            expect.validate(data, self.api.refresolver, self.api.format_checker)
+        data = request_payload().json
+        engine = current_app.config.get("RESTX_VALIDATION_ENGINE")
+        # A collection payload is validated at once (as an array) if it is a list
+        collection = collection and isinstance(data, list)
+        expect.validate(
+            data, self.api.refresolver, self.api.format_checker, engine, collection
+        )
 
     def validate_payload(self, func):
         """Perform a payload validation on expected model if necessary"""
@@ -0,0 +1,173 @@
+"""
+"Did you mean" suggestions for the URLs not found.
+"""
+
+import heapq
+import re
+import threading
+
+from collections import Counter, OrderedDict, defaultdict
+from difflib import SequenceMatcher
+from time import perf_counter
+
+#: Strips the converters (variable parts) from a URL rule
+RE_RULES = re.compile("(<.*>)")
+
+
+def _grams(text, size=3):
+    """The case insensitive n-grams of a text, padded at both ends"""
+    text = "\0{0}\0".format(text.lower())
+    return set(text[i : i + size] for i in range(max(len(text) - size + 1, 1)))
+
+
+class RouteIndex(object):
+    """
+    An index of URL rules suggesting the closest ones to a path.
+
+    Suggestions match :func:`difflib.get_close_matches` over the rules
+    (without their converters), but a path is only compared with the rules
+    sharing the most trigrams with it, within a time budget.
+    Recent suggestions (including the lack of) are cached in a bounded LRU cache.
+
+    :param rules: the URL rules (:class:`~werkzeug.routing.Rule` or strings)
+    :param int n: the maximum number of suggestions
+    :param float cutoff: the minimum similarity (between 0 and 1) of a suggestion
+    :param int candidates: the maximum number of rules compared with a path
+    :param float budget: the maximum time (in seconds) spent on a path
+    :param int maxsize: the maximum number of cached paths
+    """
+
+    def __init__(
+        self, rules, n=3, cutoff=0.6, candidates=32, budget=0.005, maxsize=1024
+    ):
+        self.n = n
+        self.cutoff = cutoff
+        self.candidates = candidates
+        self.budget = budget
+        self.maxsize = maxsize
+        #: The rules by their form without converters
+        self.rules = {}
+        for rule in rules:
+            rule = getattr(rule, "rule", rule)
+            self.rules[RE_RULES.sub("", rule)] = rule
+        self._keys = list(self.rules)
+        self._sizes = []
+        self._postings = defaultdict(list)
+        for idx, key in enumerate(self._keys):
+            grams = _grams(key)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(idx)
+        # A longer path can't be similar enough to any rule
+        longest = max((len(key) for key in self._keys), default=0)
+        self._max_length = longest * (2.0 / cutoff - 1) if cutoff > 0 else None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def suggest(self, path):
+        """
+        Get the rules closest to a path, best first.
+
+        :param str path: the requested path
+        :rtype: list
+        """
+        with self._lock:
+            suggestions = self._cache.get(path)
+            if suggestions is not None:
+                self._cache.move_to_end(path)
+                return list(suggestions)
+        suggestions = tuple(self._suggest(path))
+        with self._lock:
+            self._cache[path] = suggestions
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return list(suggestions)
+
+    def _suggest(self, path):
+        if not self._keys:
+            return []
+        if self._max_length is not None and len(path) > self._max_length:
+            return []
+        deadline = perf_counter() + self.budget
+        grams = _grams(path)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._postings.get(gram, ()))
+            if perf_counter() > deadline:
+                break
+        # Rank the rules by their trigrams similarity (Dice coefficient)
+        size, sizes = len(grams), self._sizes
+        candidates = heapq.nlargest(
+            self.candidates,
+            counts,
+            key=lambda idx: counts[idx] / (size + sizes[idx]),
+        )
+        matcher = SequenceMatcher()
+        matcher.set_seq2(path)
+        matches = []
+        for idx in candidates:
+            key = self._keys[idx]
+            matcher.set_seq1(key)
+            if (
+                matcher.real_quick_ratio() >= self.cutoff
+                and matcher.quick_ratio() >= self.cutoff
+            ):
+                ratio = matcher.ratio()
+                if ratio >= self.cutoff:
+                    matches.append((ratio, key))
+            if perf_counter() > deadline:
+                break
+        return [self.rules[key] for _, key in heapq.nlargest(self.n, matches)]
+
+    def clear(self):
+        """Remove all cached suggestions"""
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+
+def route_index(app):
+    """
+    Get the :class:`RouteIndex` of an application rules.
+
+    The index is built once per application (on first use), with the
+    ``RESTX_ERROR_404_HELP_BUDGET`` and ``RESTX_ERROR_404_HELP_CACHE_SIZE`` settings,
+    and rebuilt once some rules are added to the application
+    (by an :class:`~flask_restx.Api`, ``app.add_url_rule()``, blueprints or extensions).
+
+    :rtype: RouteIndex
+    """
+    conf = app.extensions.setdefault("restx", {})
+    index = conf.get("route_index")
+    if index is None:
+        _watch(app)
+        index = RouteIndex(
+            app.url_map.iter_rules(),
+            budget=app.config.get("RESTX_ERROR_404_HELP_BUDGET", 0.005),
+            maxsize=app.config.get("RESTX_ERROR_404_HELP_CACHE_SIZE", 1024),
+        )
+        conf["route_index"] = index
+    return index
+
+
+def invalidate_route_index(app):
+    """Drop the :class:`RouteIndex` of an application, once its rules changed"""
+    app.extensions.get("restx", {}).pop("route_index", None)
+
+
+def _watch(app):
+    """Invalidate the application route index whenever a rule is added"""
+    url_map = app.url_map
+    if getattr(url_map.add, "__restx_app__", None) is app:
+        return
+    add = url_map.add
+
+    def watched_add(rulefactory):
+        add(rulefactory)
+        invalidate_route_index(app)
+
+    watched_add.__restx_app__ = app
+    url_map.add = watched_add
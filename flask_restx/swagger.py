@@ -1,16 +1,23 @@
 # -*- coding: utf-8 -*-
+import gzip
+import hashlib
 import itertools
+import mmap
+import os
 import re
+import tempfile
 
-from inspect import isclass, getdoc
-from collections import OrderedDict
+from functools import partial
+from inspect import isclass, iscode, getdoc
+from collections import OrderedDict, namedtuple
 
 from collections.abc import Hashable
 
-from flask import current_app
+from flask import current_app, make_response
 
 from . import fields
-from .model import Model, ModelBase, OrderedModel
+from .__about__ import __version__
+from .model import Model, ModelBase, OrderedModel, SchemaModel
 from .reqparse import RequestParser
 from .utils import merge, not_none, not_none_sorted
 from ._http import HTTPStatus
@@ -224,6 +231,172 @@ def build_request_body_parameters_schema(body_params):
     }
 
 
+#: The settings affecting the specifications
+FINGERPRINTED_SETTINGS = (
+    "RESTX_INCLUDE_ALL_MODELS",
+    "RESTX_MASK_SWAGGER",
+    "RESTX_MASK_HEADER",
+)
+
+#: The API attributes documented by the specifications
+FINGERPRINTED_API_ATTRIBUTES = (
+    "title",
+    "version",
+    "description",
+    "terms_url",
+    "contact",
+    "contact_email",
+    "contact_url",
+    "license",
+    "license_url",
+    "authorizations",
+    "security",
+    "tags",
+    "default_id",
+)
+
+#: The types fingerprinted by their representation
+PRIMITIVE_TYPES = (type(None), bool, int, float, str, bytes)
+
+#: The private attributes documenting objects
+DOCUMENTED_ATTRIBUTES = frozenset(
+    ("__apidoc__", "__parents__", "__mask__", "__strict__")
+)
+
+#: The class attributes documenting their instances (ie. custom fields)
+SCHEMA_ATTRIBUTES = ("__schema_type__", "__schema_format__", "__schema_example__")
+
+#: Matches the representations including a memory address (not stable across processes)
+RE_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+class Fingerprint(object):
+    """
+    A SHA-256 fingerprint of documented values, stable across processes.
+
+    Containers are fingerprinted recursively, objects by their type (and its schema
+    attributes) and public attributes (``None`` ones being ignored), classes
+    by their qualified name, docstring, schema attributes and ``__apidoc__``,
+    functions by their qualified name, docstring, code and ``__apidoc__``
+    (partials by their function and arguments).
+    Shared objects (and cycles) are fingerprinted once, then referenced.
+
+    :raises ValueError: when a value has no stable representation
+    """
+
+    def __init__(self):
+        self.tokens = []
+        # Keep the seen objects alive so their ids can't be reused
+        self.seen = {}
+
+    def hexdigest(self):
+        return hashlib.sha256("\0".join(self.tokens).encode("utf-8")).hexdigest()
+
+    def add(self, *values):
+        for value in values:
+            self._add(value)
+
+    def _add(self, value):
+        token = self.tokens.append
+        if isinstance(value, PRIMITIVE_TYPES):
+            return token(repr(value))
+        if isclass(value) or (callable(value) and hasattr(value, "__qualname__")):
+            token(getattr(value, "__module__", None) or "")
+            token(value.__qualname__)
+            token(repr(getattr(value, "__doc__", None)))
+            if isclass(value):
+                self._add_schema_attributes(value)
+            else:
+                code = getattr(value, "__code__", None)
+                if code is not None:
+                    self._add_code(code)
+            return self._add(getattr(value, "__apidoc__", None))
+        seen = self.seen.get(id(value))
+        if seen is not None:
+            return token("<ref {0}>".format(seen[0]))
+        self.seen[id(value)] = len(self.seen), value
+        token(type(value).__qualname__)
+        self._add_schema_attributes(type(value))
+        if isinstance(value, RequestParser):
+            return self._add(value.__schema__)
+        if isinstance(value, partial):
+            return self.add(value.func, value.args, value.keywords)
+        if isinstance(value, SchemaModel):
+            return self.add(value.name, value.__schema__)
+        if isinstance(value, (list, tuple)):
+            token(str(len(value)))
+            for item in value:
+                if type(item) in PRIMITIVE_TYPES:
+                    token(repr(item))
+                else:
+                    self._add(item)
+            return
+        if isinstance(value, (set, frozenset)):
+            token(str(len(value)))
+            for item in sorted(value, key=repr):
+                self._add(item)
+            return
+        if isinstance(value, dict):
+            token(str(len(value)))
+            for key, item in value.items():
+                self._add(key)
+                if type(item) in PRIMITIVE_TYPES:
+                    token(repr(item))
+                else:
+                    self._add(item)
+        attributes = getattr(value, "__dict__", None)
+        if attributes is None:
+            attributes = _slots(value)
+        if attributes is not None:
+            for name in sorted(attributes):
+                item = attributes[name]
+                if item is None or (
+                    name[0] == "_" and name not in DOCUMENTED_ATTRIBUTES
+                ):
+                    continue
+                token(name)
+                if type(item) in PRIMITIVE_TYPES:
+                    token(repr(item))
+                else:
+                    self._add(item)
+        elif not isinstance(value, dict):
+            representation = repr(value)
+            if RE_ADDRESS.search(representation):
+                raise ValueError("Unable to fingerprint {0}".format(representation))
+            token(representation)
+
+    def _add_schema_attributes(self, cls):
+        for name in SCHEMA_ATTRIBUTES:
+            item = getattr(cls, name, None)
+            if item is not None:
+                self.tokens.append(name)
+                self._add(item)
+
+    def _add_code(self, code):
+        self.tokens.append(code.co_code.hex())
+        self.tokens.append(" ".join(code.co_names))
+        for const in code.co_consts:
+            if iscode(const):
+                self._add_code(const)
+            else:
+                self._add(const)
+
+
+def _slots(value):
+    """The slots values of an object or ``None`` if its class has no slots"""
+    names = []
+    for cls in type(value).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        names.extend((slots,) if isinstance(slots, str) else slots)
+    if not names:
+        return None
+    return dict((name, getattr(value, name, None)) for name in names)
+
+
+#: A resource route serialization: its paths and the models they use
+Fragment = namedtuple("Fragment", "ns route paths models")
+
+
 class Swagger(object):
     """
     A Swagger documentation wrapper for an API instance.
@@ -232,14 +405,19 @@ class Swagger(object):
     def __init__(self, api):
         self.api = api
         self._registered_models = {}
+        # Cached resource routes serialization by route id
+        self._fragments = {}
 
-    def as_dict(self):
+    def as_dict(self, namespaces=None):
         """
         Output the specification as a serializable ``dict``.
 
+        :param list namespaces: only document these namespaces (all of them by default)
         :returns: the full Swagger specification in a serializable format
         :rtype: dict
         """
+        if namespaces is None:
+            namespaces = self.api.namespaces
         basepath = self.api.base_path
         if len(basepath) > 1 and basepath.endswith("/"):
             basepath = basepath[:-1]
@@ -263,19 +441,21 @@ class Swagger(object):
                 infos["license"]["url"] = _v(self.api.license_url)
 
         paths = {}
-        tags = self.extract_tags(self.api)
+        tags = self.extract_tags(self.api, namespaces)
 
         # register errors
+        self._registered_models = {}
         responses = self.register_errors()
 
-        for ns in self.api.namespaces:
-            for resource, urls, route_doc, kwargs in ns.resources:
-                for url in self.api.ns_urls(ns, urls):
-                    path = extract_path(url)
-                    serialized = self.serialize_resource(
-                        ns, resource, url, route_doc=route_doc, **kwargs
-                    )
-                    paths[path] = serialized
+        models = {}
+        for ns in namespaces:
+            for route in ns.resources:
+                fragment = self.serialize_route(ns, route)
+                paths.update(fragment.paths)
+                models.update(fragment.models)
+        # models may have changed since their fragment registered them
+        for model in models:
+            self.register_model(model)
 
         # register all models if required
         if current_app.config["RESTX_INCLUDE_ALL_MODELS"]:
@@ -313,7 +493,94 @@ class Swagger(object):
             hostname = ".".join((self.api.blueprint.subdomain, hostname))
         return hostname
 
-    def extract_tags(self, api):
+    def fingerprint(self, *extra):
+        """
+        Fingerprint everything documented by the specifications: namespaces, resources,
+        models, ``__apidoc__`` metadata and settings.
+
+        The fingerprint is stable across processes. It must be computed in a request context.
+
+        :param extra: some extra values to fingerprint
+        :rtype: str
+        :raises ValueError: when some documented value can't be fingerprinted
+        """
+        api = self.api
+        config = current_app.config
+        fingerprint = Fingerprint()
+        fingerprint.add(
+            __version__,
+            extra,
+            api.base_path,
+            config.get("SERVER_NAME"),
+            [config.get(key) for key in FINGERPRINTED_SETTINGS],
+            sorted(current_app.url_map.converters),
+            [getattr(api, attr) for attr in FINGERPRINTED_API_ATTRIBUTES],
+            list(api.representations),
+            api.models,
+            api.error_handlers,
+        )
+        for ns in api.namespaces:
+            fingerprint.add(
+                ns.name,
+                ns.description,
+                ns.path,
+                ns.authorizations,
+                ns.models,
+                ns.error_handlers,
+            )
+            for resource, urls, route_doc, kwargs in ns.resources:
+                fingerprint.add(
+                    resource,
+                    api.ns_urls(ns, urls),
+                    route_doc,
+                    kwargs.get("methods"),
+                    [
+                        getattr(resource, method.lower(), None)
+                        for method in sorted(resource.methods or [])
+                    ],
+                )
+        return fingerprint.hexdigest()
+
+    def serialize_route(self, ns, route):
+        """
+        Serialize a resource route into a paths fragment, cached until invalidated.
+
+        :param Namespace ns: the route namespace
+        :param ResourceRoute route: the route to serialize
+        :rtype: Fragment
+        """
+        cached = self._fragments.get(id(route))
+        if cached is not None and cached.route is route:
+            return cached
+        registered, self._registered_models = self._registered_models, {}
+        try:
+            paths = {}
+            for url in self.api.ns_urls(ns, route.urls):
+                paths[extract_path(url)] = self.serialize_resource(
+                    ns, route.resource, url, route_doc=route.route_doc, **route.kwargs
+                )
+            fragment = Fragment(ns, route, paths, self._registered_models)
+        finally:
+            self._registered_models = registered
+        self._fragments[id(route)] = fragment
+        return fragment
+
+    def invalidate(self, namespace=None, resource=None, model=None):
+        """
+        Drop the cached fragments of a namespace, a resource and/or using a model
+        (all of them without arguments).
+        """
+        name = model.name if isinstance(model, ModelBase) else model
+        for key, fragment in list(self._fragments.items()):
+            if namespace is not None and fragment.ns is not namespace:
+                continue
+            if resource is not None and fragment.route.resource is not resource:
+                continue
+            if name is not None and name not in fragment.models:
+                continue
+            del self._fragments[key]
+
+    def extract_tags(self, api, namespaces=None):
         tags = []
         by_name = {}
         for tag in api.tags:
@@ -327,7 +594,7 @@ class Swagger(object):
                 raise ValueError("Unsupported tag format for {0}".format(tag))
             tags.append(tag)
             by_name[tag["name"]] = tag
-        for ns in api.namespaces:
+        for ns in api.namespaces if namespaces is None else namespaces:
             # hide namespaces without any Resources
             if not ns.resources:
                 continue
@@ -743,3 +1010,119 @@ class Swagger(object):
             )
         else:
             return None
+
+
+class SpecsDocument(object):
+    """
+    The Swagger specifications encoded once, ready to be served.
+
+    The encoded document is identified by a strong ETag
+    and its gzipped variant is compressed once, on first use.
+
+    :param dict schema: the Swagger specifications
+    :param JSONCodec codec: the codec encoding the specifications
+    """
+
+    def __init__(self, schema, codec, body=None, gzipped=None):
+        self._schema = schema
+        self.codec = codec
+        self.body = codec.dumps(schema, newline=True) if body is None else body
+        self.etag = hashlib.sha256(self.body).hexdigest()
+        self._gzipped = gzipped
+
+    @property
+    def schema(self):
+        """The Swagger specifications (decoded on first use for loaded documents)"""
+        if self._schema is None:
+            self._schema = self.codec.loads(bytes(self.body))
+        return self._schema
+
+    @property
+    def gzipped(self):
+        """The gzipped encoded document"""
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+        return self._gzipped
+
+    @classmethod
+    def load(cls, path, codec):
+        """
+        Load a document written by :meth:`dump`, memory-mapping its files.
+
+        :param str path: the document file path
+        :param JSONCodec codec: the codec decoding the specifications
+        :returns: the document or ``None`` if there is none (or an incomplete one)
+        """
+        try:
+            gzipped = _map(path + ".gz")
+            body = _map(path)
+        except (OSError, ValueError):
+            return None
+        return cls(None, codec, body, gzipped)
+
+    def dump(self, path):
+        """
+        Write the document and its gzipped variant (as ``<path>.gz``).
+
+        Files are written atomically, the document file last.
+
+        :param str path: the document file path
+        """
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        for target, data in ((path + ".gz", self.gzipped), (path, self.body)):
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".swagger-")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    out.write(data)
+                os.chmod(tmp, 0o644)
+                os.replace(tmp, target)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+    def response(self, request, max_age=0):
+        """
+        Serve the document, gzipped if accepted by the client.
+
+        Requests with a matching ``If-None-Match`` header get an empty
+        ``304 Not Modified`` response.
+
+        :param request: the request to respond to
+        :param int max_age: the ``Cache-Control`` max age in seconds
+        """
+        if "gzip" in request.accept_encodings:
+            response = _make_response(self.gzipped)
+            response.content_encoding = "gzip"
+            response.set_etag(self.etag + "-gzip")
+        else:
+            response = _make_response(self.body)
+            response.set_etag(self.etag)
+        response.mimetype = "application/json"
+        response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        return response.make_conditional(request)
+
+
+#: The size of the chunks served from memory-mapped documents
+CHUNK_SIZE = 64 * 1024
+
+
+def _map(path):
+    with open(path, "rb") as document:
+        return mmap.mmap(document.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _chunks(data):
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield data[start : start + CHUNK_SIZE]
+
+
+def _make_response(data):
+    if isinstance(data, bytes):
+        return make_response(data)
+    # Stream memory-mapped documents without copying them whole
+    response = current_app.response_class(_chunks(data), direct_passthrough=True)
+    response.content_length = len(data)
+    return response
@@ -0,0 +1,453 @@
+"""
+Ahead-of-time compiled payload validators.
+
+A JSON schema (as produced by models) is compiled into specialized Python
+functions, reporting errors with the same keys and messages as
+:meth:`~flask_restx.model.ModelBase.format_error` on ``jsonschema`` errors.
+Keywords which are not compiled are delegated to ``jsonschema``.
+"""
+
+import re
+
+from numbers import Number
+
+from jsonschema.exceptions import FormatError
+from jsonschema.validators import validator_for
+
+#: The validation engines usable with ``RESTX_VALIDATION_ENGINE``
+ENGINES = ("jsonschema", "compiled")
+
+#: The keywords compiled to Python code, other validation keywords are delegated
+COMPILED_KEYWORDS = frozenset(
+    (
+        "$ref",
+        "additionalProperties",
+        "allOf",
+        "anyOf",
+        "enum",
+        "exclusiveMaximum",
+        "exclusiveMinimum",
+        "format",
+        "items",
+        "maxItems",
+        "maxLength",
+        "maximum",
+        "minItems",
+        "minLength",
+        "minimum",
+        "pattern",
+        "properties",
+        "required",
+        "type",
+    )
+)
+
+RE_DEFINITION_REF = re.compile(r"^#/definitions/(?P<name>[^/]+)$")
+
+SCHEMA_ID = "http://localhost/schema.json"
+
+TYPE_CHECKS = {
+    "object": "isinstance({0}, dict)",
+    "array": "isinstance({0}, list)",
+    "string": "isinstance({0}, str)",
+    "boolean": "isinstance({0}, bool)",
+    "null": "{0} is None",
+    "number": "_is_number({0})",
+    "integer": "_is_integer({0})",
+}
+
+
+def _is_number(value):
+    return isinstance(value, Number) and not isinstance(value, bool)
+
+
+def _is_integer(value):
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or isinstance(value, float) and value.is_integer()
+
+
+def _key(path, name):
+    return "{0}.{1}".format(path, name) if path else str(name)
+
+
+def _any_valid(data, path, validators):
+    for validator in validators:
+        errors = []
+        validator(data, path, errors)
+        if not errors:
+            return True
+    return False
+
+
+def _extras_msg(extras):
+    verb = "was" if len(extras) == 1 else "were"
+    return ", ".join(repr(extra) for extra in extras), verb
+
+
+def _error_key(path, error):
+    # ugly local import to avoid dependency loop
+    from .model import RE_REQUIRED
+
+    parts = list(error.path)
+    if error.validator == "required":
+        parts.append(RE_REQUIRED.match(error.message).group("name"))
+    key = ".".join(str(p) for p in parts)
+    if path and key:
+        return "{0}.{1}".format(path, key)
+    return path or key
+
+
+class CompiledValidator(object):
+    """
+    A payload validator compiled from a JSON schema.
+
+    >>> validator = CompiledValidator({'type': 'object', 'required': ['name']})
+    >>> validator.errors({})
+    [('name', "'name' is a required property")]
+
+    :param dict schema: the JSON schema to compile
+    :param dict definitions: the definitions ``$ref`` can point to (by name)
+    :param format_checker: an optional ``jsonschema.FormatChecker``
+    :param registry: an optional ``referencing.Registry`` for delegated keywords
+    """
+
+    def __init__(self, schema, definitions=None, format_checker=None, registry=None):
+        self.schema = schema
+        self.definitions = definitions or {}
+        self.format_checker = format_checker
+        self.registry = registry
+        compiler = _Compiler(self)
+        self._validate = compiler.compile(schema)
+        self.__source__ = compiler.source
+
+    def errors(self, data):
+        """
+        Validate the data.
+
+        :return: the ``(key, message)`` errors in ``jsonschema`` order
+        :rtype: list
+        """
+        errors = []
+        self._validate(data, "", errors)
+        return errors
+
+    def is_valid(self, data):
+        return not self.errors(data)
+
+
+class _Compiler(object):
+    def __init__(self, validator):
+        self.validator = validator
+        self.validator_class = validator_for(validator.schema)
+        self.namespace = {
+            "_is_number": _is_number,
+            "_is_integer": _is_integer,
+            "_key": _key,
+            "_any_valid": _any_valid,
+            "_extras_msg": _extras_msg,
+            "_error_key": _error_key,
+            "FormatError": FormatError,
+            "format_checker": validator.format_checker,
+        }
+        self.sources = []
+        self.refs = {}
+        self.count = 0
+
+    @property
+    def source(self):
+        return "\n\n".join(self.sources)
+
+    def compile(self, schema):
+        name = self.function(schema)
+        exec(compile(self.source, "<validator>", "exec"), self.namespace)
+        return self.namespace[name]
+
+    def constant(self, value):
+        name = "c{0}".format(len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def ref(self, name):
+        if name not in self.refs:
+            # registered before compiling to handle recursive definitions
+            self.refs[name] = self.name()
+            self.function(self.validator.definitions[name], self.refs[name])
+        return self.refs[name]
+
+    def name(self):
+        self.count += 1
+        return "v{0}".format(self.count)
+
+    def function(self, schema, name=None):
+        name = name or self.name()
+        if self.compilable(schema):
+            body = []
+            for keyword, value in schema.items():
+                emit = getattr(self, "emit_" + keyword.lstrip("$"), None)
+                if emit is not None and keyword in COMPILED_KEYWORDS:
+                    emit(body, value, schema)
+        else:
+            body = self.delegate(schema)
+        lines = ["def {0}(data, path, errors):".format(name)]
+        lines.extend("    " + line for line in body or ["pass"])
+        self.sources.append("\n".join(lines))
+        return name
+
+    def compilable(self, schema):
+        if not isinstance(schema, dict):
+            return False
+        for keyword, value in schema.items():
+            if keyword not in self.validator_class.VALIDATORS:
+                continue  # annotations and unknown keywords are ignored
+            if keyword not in COMPILED_KEYWORDS:
+                return False
+            if keyword == "$ref":
+                match = RE_DEFINITION_REF.match(value)
+                if not match or match.group("name") not in self.validator.definitions:
+                    return False
+            elif keyword == "enum":
+                if not all(isinstance(v, str) for v in value):
+                    return False
+            elif keyword in ("items", "additionalProperties"):
+                if not isinstance(value, (dict, bool)):
+                    return False
+            elif keyword == "pattern":
+                try:
+                    re.compile(value)
+                except re.error:
+                    return False
+        return True
+
+    def delegate(self, schema):
+        """Delegate a (sub)schema validation to ``jsonschema``"""
+        validator = self.validator
+        if validator.definitions and isinstance(schema, dict):
+            schema = dict(
+                schema, **{"$id": SCHEMA_ID, "definitions": validator.definitions}
+            )
+        kwargs = {"format_checker": validator.format_checker}
+        if validator.registry is not None:
+            kwargs["registry"] = validator.registry
+        fallback = self.constant(self.validator_class(schema, **kwargs))
+        return [
+            "for error in {0}.iter_errors(data):".format(fallback),
+            "    errors.append((_error_key(path, error), error.message))",
+        ]
+
+    def emit_type(self, body, types, schema):
+        types = types if isinstance(types, list) else [types]
+        checks = [TYPE_CHECKS.get(t) for t in types]
+        if None in checks:
+            # Unknown types are rejected by jsonschema
+            body.extend(self.delegate({"type": types}))
+            return
+        message = " is not of type " + ", ".join(repr(t) for t in types)
+        body.extend(
+            [
+                "if not ({0}):".format(" or ".join(c.format("data") for c in checks)),
+                "    errors.append((path, repr(data) + {0!r}))".format(message),
+            ]
+        )
+
+    def emit_required(self, body, required, schema):
+        if not required:
+            return
+        body.append("if isinstance(data, dict):")
+        for name in required:
+            body.extend(
+                [
+                    "    if {0!r} not in data:".format(name),
+                    "        errors.append((_key(path, {0!r}), {1!r}))".format(
+                        name, "{0!r} is a required property".format(name)
+                    ),
+                ]
+            )
+
+    def emit_properties(self, body, properties, schema):
+        lines = []
+        for name, subschema in properties.items():
+            if not self.validates(subschema):
+                continue
+            function = self.function(subschema)
+            lines.extend(
+                [
+                    "    if {0!r} in data:".format(name),
+                    "        {0}(data[{1!r}], _key(path, {1!r}), errors)".format(
+                        function, name
+                    ),
+                ]
+            )
+        if lines:
+            body.append("if isinstance(data, dict):")
+            body.extend(lines)
+
+    def emit_additionalProperties(self, body, additional, schema):
+        if additional is True or "patternProperties" in schema:
+            # patternProperties is not compiled so the whole schema is delegated
+            return
+        known = self.constant(frozenset(schema.get("properties", {})))
+        body.extend(
+            [
+                "if isinstance(data, dict):",
+                "    extras = [k for k in data if k not in {0}]".format(known),
+            ]
+        )
+        if additional is False:
+            body.extend(
+                [
+                    "    if extras:",
+                    "        errors.append((path, "
+                    "'Additional properties are not allowed (%s %s unexpected)'"
+                    " % _extras_msg(sorted(set(extras), key=str))))",
+                ]
+            )
+        elif self.validates(additional):
+            function = self.function(additional)
+            body.extend(
+                [
+                    "    for k in extras:",
+                    "        {0}(data[k], _key(path, k), errors)".format(function),
+                ]
+            )
+
+    def emit_items(self, body, items, schema):
+        if items is True or "prefixItems" in schema:
+            return
+        if items is False:
+            body.extend(self.delegate({"items": False}))
+            return
+        if not self.validates(items):
+            return
+        function = self.function(items)
+        body.extend(
+            [
+                "if isinstance(data, list):",
+                "    for i, item in enumerate(data):",
+                "        {0}(item, _key(path, i), errors)".format(function),
+            ]
+        )
+
+    def emit_size(self, body, check, op, limit, message):
+        message = " " + message
+        body.extend(
+            [
+                "if {0} and len(data) {1} {2!r}:".format(check, op, limit),
+                "    errors.append((path, repr(data) + {0!r}))".format(message),
+            ]
+        )
+
+    def emit_minItems(self, body, limit, schema):
+        message = "should be non-empty" if limit == 1 else "is too short"
+        self.emit_size(body, "isinstance(data, list)", "<", limit, message)
+
+    def emit_maxItems(self, body, limit, schema):
+        message = "is expected to be empty" if limit == 0 else "is too long"
+        self.emit_size(body, "isinstance(data, list)", ">", limit, message)
+
+    def emit_minLength(self, body, limit, schema):
+        message = "should be non-empty" if limit == 1 else "is too short"
+        self.emit_size(body, "isinstance(data, str)", "<", limit, message)
+
+    def emit_maxLength(self, body, limit, schema):
+        message = "is expected to be empty" if limit == 0 else "is too long"
+        self.emit_size(body, "isinstance(data, str)", ">", limit, message)
+
+    def emit_bound(self, body, op, bound, message):
+        name = self.constant(bound)
+        body.extend(
+            [
+                "if _is_number(data) and data {0} {1}:".format(op, name),
+                "    errors.append((path, repr(data) + {0!r}))".format(
+                    message.format(bound)
+                ),
+            ]
+        )
+
+    def emit_minimum(self, body, minimum, schema):
+        self.emit_bound(body, "<", minimum, " is less than the minimum of {0!r}")
+
+    def emit_maximum(self, body, maximum, schema):
+        self.emit_bound(body, ">", maximum, " is greater than the maximum of {0!r}")
+
+    def emit_exclusiveMinimum(self, body, minimum, schema):
+        self.emit_bound(
+            body, "<=", minimum, " is less than or equal to the minimum of {0!r}"
+        )
+
+    def emit_exclusiveMaximum(self, body, maximum, schema):
+        self.emit_bound(
+            body, ">=", maximum, " is greater than or equal to the maximum of {0!r}"
+        )
+
+    def emit_pattern(self, body, pattern, schema):
+        regex = self.constant(re.compile(pattern))
+        body.extend(
+            [
+                "if isinstance(data, str) and not {0}.search(data):".format(regex),
+                "    errors.append((path, repr(data) + {0!r}))".format(
+                    " does not match {0!r}".format(pattern)
+                ),
+            ]
+        )
+
+    def emit_enum(self, body, enum, schema):
+        values = self.constant(frozenset(enum))
+        body.extend(
+            [
+                "if not (isinstance(data, str) and data in {0}):".format(values),
+                "    errors.append((path, repr(data) + {0!r}))".format(
+                    " is not one of {0!r}".format(enum)
+                ),
+            ]
+        )
+
+    def emit_format(self, body, format, schema):
+        if self.validator.format_checker is None:
+            return
+        body.extend(
+            [
+                "try:",
+                "    format_checker.check(data, {0!r})".format(format),
+                "except FormatError as error:",
+                "    errors.append((path, error.message))",
+            ]
+        )
+
+    def emit_ref(self, body, ref, schema):
+        name = RE_DEFINITION_REF.match(ref).group("name")
+        body.append("{0}(data, path, errors)".format(self.ref(name)))
+
+    def emit_allOf(self, body, schemas, schema):
+        for subschema in schemas:
+            if self.validates(subschema):
+                body.append("{0}(data, path, errors)".format(self.function(subschema)))
+
+    def emit_anyOf(self, body, schemas, schema):
+        functions = [self.function(subschema) for subschema in schemas]
+        body.extend(
+            [
+                "if not _any_valid(data, path, ({0},)):".format(", ".join(functions)),
+                "    errors.append((path, repr(data) + {0!r}))".format(
+                    " is not valid under any of the given schemas"
+                ),
+            ]
+        )
+
+    def validates(self, schema):
+        """Whether a schema has some validation keywords"""
+        if not isinstance(schema, dict):
+            return schema is not True
+        return any(k in self.validator_class.VALIDATORS for k in schema)
+
+
+def compile_validator(schema, definitions=None, format_checker=None, registry=None):
+    """
+    Compile a JSON schema into a :class:`CompiledValidator`.
+
+    :param dict schema: the JSON schema to compile
+    :param dict definitions: the definitions ``$ref`` can point to (by name)
+    :param format_checker: an optional ``jsonschema.FormatChecker``
+    :param registry: an optional ``referencing.Registry`` for delegated keywords
+    """
+    return CompiledValidator(schema, definitions, format_checker, registry)
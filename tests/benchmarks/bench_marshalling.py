@@ -2,7 +2,7 @@ import pytest
 
 from faker import Faker
 
-from flask_restx import marshal, fields
+from flask_restx import marshal, fields, Model
 
 fake = Faker()
 
@@ -15,6 +15,18 @@ family_fields = {
 }
 
 
+person_model = Model("Person", person_fields)
+
+family_model = Model(
+    "Family",
+    {
+        "father": fields.Nested(person_model),
+        "mother": fields.Nested(person_model),
+        "children": fields.List(fields.Nested(person_model)),
+    },
+)
+
+
 def person():
     return {"name": fake.name(), "age": fake.pyint()}
 
@@ -31,6 +43,14 @@ def marshal_nested():
     return marshal(family(), family_fields)
 
 
+def marshal_simple_compiled():
+    return marshal(person(), person_model, compiled=True)
+
+
+def marshal_nested_compiled():
+    return marshal(family(), family_model, compiled=True)
+
+
 def marshal_simple_with_mask(app):
     with app.test_request_context("/", headers={"X-Fields": "name"}):
         return marshal(person(), person_fields)
@@ -49,6 +69,12 @@ class MarshallingBenchmark(object):
     def bench_marshal_nested(self, benchmark):
         benchmark(marshal_nested)
 
+    def bench_marshal_simple_compiled(self, benchmark):
+        benchmark(marshal_simple_compiled)
+
+    def bench_marshal_nested_compiled(self, benchmark):
+        benchmark(marshal_nested_compiled)
+
     def bench_marshal_simple_with_mask(self, app, benchmark):
         benchmark(marshal_simple_with_mask, app)
 
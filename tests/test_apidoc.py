@@ -147,3 +147,23 @@ class APIDocTest(object):
 
         response = client.get(url_for("root"))
         assert response.status_code == 404
+
+    def test_apidoc_split_specs(self, app, client):
+        api = restx.Api(app, split_specs=True)
+
+        @api.route("/test/")
+        class Test(restx.Resource):
+            def get(self):
+                return {}
+
+        response = client.get(url_for("doc"))
+        assert response.status_code == 200
+        assert b'"url": "/swagger/default.json"' in response.data
+        assert b'url: "/swagger.json"' not in response.data
+
+    def test_apidoc_split_specs_on_specs_path(self, app, client):
+        restx.Api(app, doc="/swagger/", split_specs=True)
+        response = client.get("/swagger/")
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/html")
+        assert client.get_json("/swagger/index.json") == {"urls": []}
@@ -0,0 +1,203 @@
+import json
+
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+import flask_restx as restx
+
+from flask_restx.codec import (
+    CODECS,
+    JSONCodec,
+    OrjsonCodec,
+    StdlibCodec,
+    codec_for,
+    make_codec,
+)
+
+UID = UUID("12345678-1234-5678-1234-567812345678")
+
+NATIVE = {
+    "datetime": datetime(2011, 1, 1, 12, 30, 15, 123000, tzinfo=timezone.utc),
+    "naive": datetime(2011, 1, 1, 12, 30),
+    "date": date(2011, 1, 1),
+    "time": time(12, 30),
+    "decimal": Decimal("3.14159265358979323846"),
+    "uuid": UID,
+}
+
+ENCODED = {
+    "datetime": "2011-01-01T12:30:15.123000+00:00",
+    "naive": "2011-01-01T12:30:00",
+    "date": "2011-01-01",
+    "time": "12:30:00",
+    "decimal": "3.14159265358979323846",
+    "uuid": "12345678-1234-5678-1234-567812345678",
+}
+
+
+@pytest.fixture(params=sorted(CODECS))
+def codec(request):
+    return make_codec(request.param)
+
+
+class CodecTest(object):
+    def test_dumps_bytes(self, codec):
+        assert json.loads(codec.dumps({"key": "value"})) == {"key": "value"}
+        assert isinstance(codec.dumps({}), bytes)
+        assert codec.dumps({}, newline=True).endswith(b"}\n")
+
+    def test_dumps_native_types(self, codec):
+        assert json.loads(codec.dumps(NATIVE)) == ENCODED
+
+    def test_dumps_unknown_type(self, codec):
+        with pytest.raises(TypeError):
+            codec.dumps({"key": object()})
+
+    def test_dumps_non_str_keys(self, codec):
+        assert json.loads(codec.dumps({1: "one"})) == {"1": "one"}
+
+    def test_loads(self, codec):
+        assert codec.loads(b'{"key": ["value", 1]}') == {"key": ["value", 1]}
+        assert codec.loads('{"key": null}') == {"key": None}
+        with pytest.raises(ValueError):
+            codec.loads(b"{")
+
+    def test_sort_keys(self, codec):
+        codec = make_codec(codec.name, sort_keys=True)
+        assert codec.dumps({"b": 1, "a": 2}).replace(b" ", b"") == b'{"a":2,"b":1}'
+
+
+class MakeCodecTest(object):
+    def test_default(self):
+        expected = "ujson" if "ujson" in CODECS else "json"
+        assert make_codec().name == expected
+
+    def test_by_name(self):
+        assert isinstance(make_codec("json", indent=2), StdlibCodec)
+        assert make_codec("json", indent=2).settings["indent"] == 2
+
+    def test_by_class_or_instance(self):
+        codec = StdlibCodec()
+        assert make_codec(codec) is codec
+        assert isinstance(make_codec(StdlibCodec), StdlibCodec)
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            make_codec("unknown")
+
+    def test_custom_encoder_class(self):
+        class Encoder(json.JSONEncoder):
+            def default(self, obj):
+                return "custom"
+
+        codec = make_codec("json", cls=Encoder)
+        assert codec.dumps({"key": UID}) == b'{"key": "custom"}'
+
+    @pytest.mark.skipif("orjson" not in CODECS, reason="orjson is not installed")
+    def test_orjson_settings(self):
+        codec = make_codec("orjson", indent=4, separators=(",", ":"))
+        assert isinstance(codec, OrjsonCodec)
+        assert codec.dumps({"a": 1}) == b'{\n  "a": 1\n}'
+        with pytest.raises(ValueError):
+            make_codec("orjson", cls=json.JSONEncoder)
+
+
+class CodecForTest(object):
+    def test_built_once(self, app):
+        app.config["RESTX_JSON"] = {"sort_keys": True}
+        codec = codec_for(app)
+        assert codec_for(app) is codec
+        assert codec.settings["sort_keys"] is True
+
+    def test_debug_indent(self, app):
+        app.debug = True
+        app.config["RESTX_JSON"] = {"sort_keys": True}
+        assert codec_for(app).settings["indent"] == 4
+        assert app.config["RESTX_JSON"] == {"sort_keys": True}
+
+    def test_configured_codec(self, app):
+        codec = StdlibCodec()
+        app.config["RESTX_JSON_CODEC"] = codec
+        assert codec_for(app) is codec
+
+
+class CodecApiTest(object):
+    @pytest.fixture(params=sorted(CODECS))
+    def api(self, app, request):
+        app.config["RESTX_JSON_CODEC"] = request.param
+        return restx.Api(app)
+
+    def test_response(self, api, client):
+        @api.route("/native/")
+        class Native(restx.Resource):
+            def get(self):
+                return NATIVE
+
+        response = client.get("/native/")
+        assert response.status_code == 200
+        assert response.content_type == "application/json"
+        assert response.data.endswith(b"}\n")
+        assert json.loads(response.data) == ENCODED
+
+    def test_request(self, api, client, mocker):
+        loads = mocker.spy(type(codec_for(api.app)), "loads")
+
+        @api.route("/echo/")
+        class Echo(restx.Resource):
+            def post(self):
+                return api.payload
+
+        assert client.post_json("/echo/", {"key": ["value"]}) == {"key": ["value"]}
+        assert loads.call_count == 1
+
+        response = client.post(
+            "/echo/", data="{", headers={"content-type": "application/json"}
+        )
+        assert response.status_code == 400
+
+    def test_specs(self, api, client):
+        assert client.get_specs()["swagger"] == "2.0"
+
+
+class CustomCodecTest(object):
+    def test_incomplete_codec(self):
+        class Codec(JSONCodec):
+            def dumps(self, data, newline=False):
+                return b"{}"
+
+        with pytest.raises(TypeError):
+            Codec()
+
+    def test_default_request_decoding(self, app, client, mocker):
+        loads = mocker.spy(app.json, "loads")
+        api = restx.Api(app)
+
+        @api.route("/echo/")
+        class Echo(restx.Resource):
+            def post(self):
+                return api.payload
+
+        assert client.post_json("/echo/", {"key": ["value"]}) == {"key": ["value"]}
+        assert loads.call_count == 1
+
+    def test_custom_codec(self, app, client):
+        class Codec(JSONCodec):
+            def dumps(self, data, newline=False):
+                return b'{"custom": true}\n'
+
+            def loads(self, data):
+                return {"custom": True}
+
+        app.config["RESTX_JSON_CODEC"] = Codec
+        api = restx.Api(app)
+
+        @api.route("/custom/")
+        class Custom(restx.Resource):
+            def post(self):
+                assert api.payload == {"custom": True}
+                return {}
+
+        assert client.post_json("/custom/", {}) == {"custom": True}
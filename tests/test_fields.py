@@ -3,7 +3,8 @@ try:
 except ImportError:
     from backports import zoneinfo
 
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict, namedtuple
+from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from decimal import Decimal
 from functools import partial
@@ -11,7 +12,7 @@ from functools import partial
 import pytest
 
 from flask import Blueprint
-from flask_restx import fields, Api
+from flask_restx import fields, marshal, Api
 
 
 class FieldTestCase(object):
@@ -163,6 +164,20 @@ class RawFieldTest(BaseFieldTestMixin, FieldTestCase):
         field = fields.Raw(attribute=p)
         assert field.output("foo", obj) == "42-whatever"
 
+    def test_lazy(self):
+        field = fields.Raw(lazy=True)
+        assert field.output("foo", {"foo": lambda: 42}) == 42
+        assert field.output("foo", {"foo": 42}) == 42
+
+    def test_not_lazy(self):
+        value = lambda: 42  # noqa
+        field = fields.Raw()
+        assert field.output("foo", {"foo": value}) is value
+
+    def test_lazy_nested(self):
+        field = fields.Nested({"name": fields.String}, lazy=True)
+        assert field.output("foo", {"foo": lambda: {"name": "bar"}}) == {"name": "bar"}
+
     def test_attribute_not_found(self):
         field = fields.Raw()
         assert field.output("foo", {"bar": 42}) is None
@@ -1171,6 +1186,52 @@ class WildcardFieldTest(BaseFieldTestMixin, FieldTestCase):
         assert expected1 == result1
         assert result2 == result1
 
+    def test_wildcard_does_not_stop_on_none(self, api):
+        wild = fields.Wildcard(fields.String)
+        model = api.model("WildcardNone", {"*": wild})
+
+        data = OrderedDict([("a", "1"), ("b", None), ("c", "3")])
+
+        assert api.marshal(data, model) == {"a": "1", "b": None, "c": "3"}
+        assert api.marshal(data, model, skip_none=True) == {"a": "1", "c": "3"}
+
+    def test_wildcard_output_items(self):
+        wild = fields.Wildcard(fields.Integer)
+        data = OrderedDict([("a1", "1"), ("b1", "2"), ("A2", "3"), ("a3", "4")])
+
+        assert wild.output_items("a*", data, ordered=True) == [
+            ("a1", 1),
+            ("A2", 3),
+            ("a3", 4),
+        ]
+        assert wild.output_items("a*", data, ordered=True, exclude={"a1"}) == [
+            ("A2", 3),
+            ("a3", 4),
+        ]
+        assert wild.output_items("z*", data) == [("z*", None)]
+        assert wild.output("a*", data, ordered=True) == 1
+
+    def test_wildcard_is_stateless(self):
+        wild = fields.Wildcard(fields.String)
+        model = {"*": wild}
+        data1 = {"a": 1, "b": 2}
+        data2 = {"c": 3}
+
+        assert marshal(data1, model) == {"a": "1", "b": "2"}
+        assert marshal(data2, model) == {"c": "3"}
+        assert marshal(data1, model) == {"a": "1", "b": "2"}
+        assert not hasattr(wild, "_flat")
+
+    def test_wildcard_many_keys(self):
+        wild = fields.Wildcard(fields.Integer)
+        model = OrderedDict([("id", fields.String), ("*", wild)])
+        data = OrderedDict(("key{0}".format(i), i) for i in range(500))
+        data["id"] = 42
+
+        expected = OrderedDict([("id", "42")])
+        expected.update(("key{0}".format(i), i) for i in range(500))
+        assert marshal(data, model, ordered=True) == expected
+
 
 class ClassNameFieldTest(StringTestMixin, BaseFieldTestMixin, FieldTestCase):
     field_class = fields.ClassName
@@ -1594,3 +1655,72 @@ class FieldsHelpersTest(object):
 
     def test_get_value_int_indexable_nested_tuple(self):
         assert fields.get_value("bar.0.val", {"bar": [{"val": 42}]}) == 42
+
+    def test_get_value_dict_missing_key_fallback_on_attribute(self):
+        assert fields.get_value("foo", {"bar": 42}) is None
+        assert fields.get_value("foo", {"bar": 42}, default=1) == 1
+        assert fields.get_value("keys", {"bar": 42}) is not None
+
+    def test_get_value_defaultdict(self):
+        data = defaultdict(lambda: 42)
+        assert fields.get_value("foo", data) == 42
+
+    def test_get_value_namedtuple(self):
+        Point = namedtuple("Point", "x y")
+        assert fields.get_value("y", Point(1, 2)) == 2
+        assert fields.get_value("1", Point(1, 2)) == 2
+        assert fields.get_value("z", Point(1, 2)) is None
+
+    def test_get_value_dataclass(self):
+        @dataclass
+        class Point(object):
+            x: int
+            y: int
+
+        assert fields.get_value("y", Point(1, 2)) == 2
+        assert fields.get_value("z", Point(1, 2), default=3) == 3
+
+    def test_get_value_row(self):
+        class Row(object):
+            _fields = ("x", "y")
+
+            def __init__(self, *values):
+                self._data = values
+
+            def __iter__(self):
+                return iter(self._data)
+
+            def __getitem__(self, index):
+                return self._data[index]
+
+            @property
+            def _mapping(self):
+                return dict(zip(self._fields, self._data))
+
+        assert fields.get_value("y", Row(1, 2)) == 2
+        assert fields.get_value("z", Row(1, 2)) is None
+
+    def test_get_value_mixed_source_types(self):
+        class Foo(object):
+            foo = 42
+
+        for _ in range(2):
+            assert fields.get_value("foo", {"foo": 43}) == 43
+            assert fields.get_value("foo", Foo()) == 42
+            assert fields.get_value("0", ["bar"]) == "bar"
+            assert fields.get_value("foo", "bar") is None
+
+    def test_get_accessor_is_cached(self):
+        assert fields.get_accessor("foo") is fields.get_accessor("foo")
+        assert fields.get_accessor("foo.bar") is fields.get_accessor("foo.bar")
+
+    def test_get_accessor_specialized_once_per_type(self):
+        accessor = fields.get_accessor("specialized")
+        accessor({"specialized": 1})
+        getter = accessor.getters[dict]
+        assert accessor({"specialized": 2}) == 2
+        assert accessor.getters[dict] is getter
+
+    def test_get_accessor_callable(self):
+        accessor = fields.get_accessor(lambda o: o["foo"] * 2)
+        assert accessor({"foo": 21}) == 42
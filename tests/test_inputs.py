@@ -1,7 +1,14 @@
 import re
+import socket
+import threading
+
+from array import array
+
+import aniso8601
 import pytest
 
 from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
 
 from flask_restx import inputs
 
@@ -604,6 +611,121 @@ class IPv6Test(object):
         assert inputs.ipv6.__schema__ == {"type": "string", "format": "ipv6"}
 
 
+class FakeLookup(object):
+    def __init__(self, *domains):
+        self.domains = domains
+        self.calls = []
+        self.threads = set()
+
+    def __call__(self, domain):
+        self.calls.append(domain)
+        self.threads.add(threading.current_thread())
+        if domain not in self.domains:
+            raise socket.gaierror("Unknown domain")
+
+
+class ResolverTest(object):
+    def test_resolve(self):
+        lookup = FakeLookup("example.com")
+        resolver = inputs.Resolver(lookup=lookup)
+        assert resolver.resolve("example.com")
+        assert not resolver.resolve("unknown.test")
+        assert resolver.resolve("example.com")
+        assert not resolver.resolve("unknown.test")
+        assert lookup.calls == ["example.com", "unknown.test"]
+        assert len(resolver) == 2
+
+    def test_expiration(self):
+        lookup = FakeLookup("example.com")
+        resolver = inputs.Resolver(ttl=60, negative_ttl=-1, lookup=lookup)
+        for _ in range(2):
+            resolver.resolve("example.com")
+            resolver.resolve("unknown.test")
+        assert lookup.calls == ["example.com", "unknown.test", "unknown.test"]
+
+    def test_maxsize(self):
+        lookup = FakeLookup()
+        resolver = inputs.Resolver(maxsize=2, lookup=lookup)
+        for domain in ("a.test", "b.test", "a.test", "c.test", "a.test", "b.test"):
+            resolver.resolve(domain)
+        assert lookup.calls == ["a.test", "b.test", "c.test", "b.test"]
+        assert len(resolver) == 2
+
+    def test_clear(self):
+        lookup = FakeLookup()
+        resolver = inputs.Resolver(lookup=lookup)
+        resolver.resolve("a.test")
+        resolver.clear()
+        resolver.resolve("a.test")
+        assert lookup.calls == ["a.test", "a.test"]
+
+    def test_resolve_many(self):
+        lookup = FakeLookup("a.test", "b.test", "c.test")
+        resolver = inputs.Resolver(workers=4, lookup=lookup)
+        resolver.resolve("a.test")
+        lookup.calls, lookup.threads = [], set()
+        domains = ["a.test", "b.test", "c.test", "d.test", "b.test"]
+        assert resolver.resolve_many(domains) == {
+            "a.test": True,
+            "b.test": True,
+            "c.test": True,
+            "d.test": False,
+        }
+        assert sorted(lookup.calls) == ["b.test", "c.test", "d.test"]
+        assert threading.current_thread() not in lookup.threads
+
+    def test_default_lookup(self, mocker):
+        getaddrinfo = mocker.patch("socket.getaddrinfo", side_effect=socket.gaierror)
+        assert not inputs.Resolver().resolve("unknown.test")
+        getaddrinfo.assert_called_once_with("unknown.test", None)
+
+
+class CheckWithResolverTest(object):
+    @pytest.fixture
+    def resolver(self):
+        return inputs.Resolver(lookup=FakeLookup("example.com"))
+
+    def test_email(self, resolver):
+        email = inputs.email(check=True, resolver=resolver)
+        assert email("me@example.com") == "me@example.com"
+        with pytest.raises(ValueError):
+            email("me@unknown.test")
+
+    def test_url(self, resolver):
+        url = inputs.URL(check=True, resolver=resolver)
+        assert url("http://example.com/") == "http://example.com/"
+        with pytest.raises(ValueError) as cm:
+            url("http://unknown.test/")
+        assert "Domain does not exists" in str(cm.value)
+
+    def test_default_resolver(self, mocker, resolver):
+        mocker.patch.object(inputs, "default_resolver", resolver)
+        assert inputs.email(check=True)("me@example.com") == "me@example.com"
+
+    def test_email_many(self, resolver, mocker):
+        resolve_many = mocker.spy(resolver, "resolve_many")
+        email = inputs.email(check=True, resolver=resolver)
+        values = ["a@example.com", "b@example.com"]
+        assert email.many(values) == values
+        resolve_many.assert_called_once_with(["example.com", "example.com"])
+        assert resolver.lookup.calls == ["example.com"]
+        with pytest.raises(ValueError):
+            email.many(["a@example.com", "b@unknown.test"])
+
+    def test_url_many(self, resolver):
+        url = inputs.URL(check=True, resolver=resolver)
+        values = ["http://example.com/a", "http://example.com/b"]
+        assert url.many(values) == values
+        assert resolver.lookup.calls == ["example.com"]
+        with pytest.raises(ValueError):
+            url.many(["http://example.com/a", "http://unknown.test/"])
+
+    def test_many_without_check(self, resolver):
+        email = inputs.email(resolver=resolver)
+        assert email.many(["me@unknown.test"]) == ["me@unknown.test"]
+        assert resolver.lookup.calls == []
+
+
 class EmailTest(object):
     def assert_bad_email(self, validator, value, msg=None):
         msg = msg or "{0} is not a valid email"
@@ -985,6 +1107,79 @@ class IntRangeTest(object):
         }
 
 
+class BulkTest(object):
+    @pytest.mark.parametrize(
+        "type,values",
+        [
+            (int, ["1", "-2", "3"]),
+            (float, ["1.5", "2"]),
+            (inputs.natural, ["0", "1", "2"]),
+            (inputs.positive, ["1", "2"]),
+            (inputs.int_range(1, 5), ["1", "5"]),
+            (inputs.boolean, ["true", "False", "0", "on", "", True]),
+        ],
+    )
+    def test_same_as_one_by_one(self, type, values):
+        assert inputs.bulk(type)(values, "ids") == [type(v) for v in values]
+
+    @pytest.mark.parametrize(
+        "type,values",
+        [
+            (int, ["1", "x", "y"]),
+            (inputs.natural, ["1", "-1", "x"]),
+            (inputs.natural, ["1", "x", "-1"]),
+            (inputs.positive, ["1", "0"]),
+            (inputs.int_range(1, 5), ["1", "6", "0"]),
+            (inputs.boolean, ["true", "maybe", "nope"]),
+            (inputs.boolean, ["true", None]),
+        ],
+    )
+    def test_first_error(self, type, values):
+        with pytest.raises(ValueError) as bulk_error:
+            inputs.bulk(type)(values)
+        with pytest.raises(ValueError) as single_error:
+            [type(v) for v in values]
+        assert str(bulk_error.value) == str(single_error.value)
+
+    def test_argument_name(self):
+        with pytest.raises(ValueError) as cm:
+            inputs.natural.many(["1", "-1"], "ids")
+        assert str(cm.value) == "Invalid ids: -1. ids must be a non-negative integer"
+
+    def test_empty(self):
+        assert inputs.natural.many([]) == []
+        assert inputs.boolean.many([]) == []
+
+    def test_no_bulk_converter(self):
+        assert inputs.bulk(inputs.date) is None
+        assert inputs.bulk({}) is None
+
+    def test_packed(self):
+        packed = inputs.packed(inputs.natural, "Q")
+        values = packed.many(["1", "2", "3"], "ids")
+        assert isinstance(values, array)
+        assert values.typecode == "Q"
+        assert list(values) == [1, 2, 3]
+        assert packed("4") == 4
+        assert list(inputs.packed(float, "d").many(["1.5"])) == [1.5]
+        assert list(inputs.packed(lambda v: len(v), "b").many(["ab"])) == [2]
+
+    def test_packed_errors(self):
+        with pytest.raises(ValueError) as cm:
+            inputs.packed(inputs.natural, "Q").many(["1", "-1"], "ids")
+        assert str(cm.value) == "Invalid ids: -1. ids must be a non-negative integer"
+        with pytest.raises(ValueError) as cm:
+            inputs.packed(int, "b").many(["1", "1000"], "ids")
+        assert "1000" in str(cm.value)
+        with pytest.raises(ValueError):
+            inputs.packed(int, "x")
+
+    def test_packed_schema(self):
+        assert inputs.packed(inputs.natural).__schema__ == inputs.natural.__schema__
+        assert inputs.packed(int).__schema__ == {"type": "integer"}
+        assert inputs.packed(float, "d").__schema__ == {"type": "number"}
+
+
 interval_test_values = [
     (
         # Full precision with explicit UTC.
@@ -1163,3 +1358,90 @@ class IsoIntervalTest(object):
             "type": "string",
             "format": "iso8601-interval",
         }
+
+
+class DatetimeFastPathTest(object):
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "2011-01-01T23:59",
+            "2011-01-01T23:59:59",
+            "2011-01-01T23:59:59.5",
+            "2011-01-01T23:59:59.123456Z",
+            "2011-01-01T23:59:59+02:00",
+            "2011-01-01T23:59:59-05:30",
+            "2012-02-29T00:00:00Z",
+        ],
+    )
+    def test_iso8601_same_as_aniso8601(self, value):
+        expected = aniso8601.parse_datetime(value)
+        parsed = inputs.datetime_from_iso8601(value)
+        assert parsed == expected
+        assert parsed.utcoffset() == expected.utcoffset()
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            # Out of range values and non canonical forms are left to aniso8601
+            ("2011-01-01T24:00:00", datetime(2011, 1, 1)),
+            ("20110101T235959", datetime(2011, 1, 1, 23, 59, 59)),
+            ("2011-W01-1", datetime(2011, 1, 3)),
+        ],
+    )
+    def test_iso8601_fallback(self, value, expected):
+        assert inputs.datetime_from_iso8601(value) == expected
+
+    @pytest.mark.parametrize(
+        "value",
+        ["2011-02-30", "2011-01-01T23:59:59-00:00", "2011-01-01T23:60"],
+    )
+    def test_iso8601_invalid(self, value):
+        with pytest.raises(ValueError):
+            inputs.datetime_from_iso8601(value)
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "Wed, 02 Oct 2002 08:00:00 EST",
+            "Wed, 02 Oct 2002 08:00:00 GMT",
+            "2 Oct 2002 08:00:00 +0530",
+            "Wed, 02 Oct 2002 08:00:00 -0330",
+        ],
+    )
+    def test_rfc822_same_as_email_utils(self, value):
+        parsed = inputs.datetime_from_rfc822(value)
+        assert parsed == parsedate_to_datetime(value)
+        assert parsed.tzinfo is timezone.utc
+
+    def test_rfc822_out_of_range_fallback(self):
+        # email.utils normalizes out of range days
+        assert inputs.datetime_from_rfc822(
+            "Mon, 31 Feb 2011 00:00:00 +0000"
+        ) == datetime(2011, 3, 3, tzinfo=timezone.utc)
+
+
+class MemoizeTest(object):
+    def test_memoize(self):
+        parse = inputs.memoize(inputs.datetime_from_iso8601, maxsize=2)
+        assert parse("2011-01-01") == datetime(2011, 1, 1)
+        assert parse("2011-01-01") == datetime(2011, 1, 1)
+        assert parse.cache_info().hits == 1
+        assert parse.__schema__ == inputs.datetime_from_iso8601.__schema__
+
+    def test_memoize_with_arguments(self):
+        parse = inputs.memoize(inputs.iso8601interval)
+        expected = inputs.iso8601interval("2013-01-01")
+        assert parse("2013-01-01", "since") == expected
+        with pytest.raises(ValueError) as cm:
+            parse("blah", "since")
+        assert "Invalid since" in str(cm.value)
+
+    def test_memoize_reqparse(self, app):
+        from flask_restx.reqparse import RequestParser
+
+        parser = RequestParser()
+        parser.add_argument(
+            "since", type=inputs.memoize(inputs.date_from_iso8601), location="args"
+        )
+        with app.test_request_context("/?since=2011-01-01"):
+            assert parser.parse_args() == {"since": date(2011, 1, 1)}
@@ -1,6 +1,25 @@
+import json
+
 import pytest
 
-from flask_restx import marshal, marshal_with, marshal_with_field, fields, Api, Resource
+from flask_restx import (
+    mask,
+    marshal,
+    marshal_with,
+    marshal_with_field,
+    fields,
+    Api,
+    Model,
+    Resource,
+)
+from flask_restx.marshalling import (
+    MaskCache,
+    StreamedList,
+    compile_marshaller,
+    compiled_marshaller,
+    mask_cache,
+    requested_fields,
+)
 
 from collections import OrderedDict
 
@@ -535,3 +554,606 @@ class MarshallingTest(object):
         resp = client.get("/api")
         assert resp.status_code == 200
         assert resp.data.decode("utf-8") == '{"foo": 3.0}\n'
+
+
+class CompiledMarshallingTest(object):
+    def assert_same(self, data, model, **kwargs):
+        expected = marshal(data, model, **kwargs)
+        output = marshal(data, model, compiled=True, **kwargs)
+        assert output == expected
+        assert type(output) is type(expected)
+        return output
+
+    def test_compile_marshaller(self):
+        marshaller = compile_marshaller({"a": fields.Raw, "b": fields.Integer})
+        assert marshaller({"a": 100, "b": "42", "c": None}) == {"a": 100, "b": 42}
+        assert marshaller([{"a": 1}, {"b": 2}]) == [
+            {"a": 1, "b": None},
+            {"a": None, "b": 2},
+        ]
+
+    def test_compiled_simple_fields(self):
+        model = OrderedDict(
+            [
+                ("name", fields.String(attribute="private.name")),
+                ("age", fields.Integer(default=0)),
+                ("score", fields.Float(default=lambda: 1.5)),
+                ("active", fields.Boolean),
+                ("created", fields.DateTime),
+                ("upper", fields.String(attribute=lambda o: o["private"]["name"])),
+            ]
+        )
+        data = {"private": {"name": "john"}, "active": 1, "created": "2011-01-01"}
+        self.assert_same(data, model)
+        self.assert_same(data, model, ordered=True)
+        self.assert_same(data, model, skip_none=True)
+        self.assert_same([data, data], model, envelope="items")
+
+    def test_compiled_nested_and_lists(self):
+        person = Model("Person", {"name": fields.String, "age": fields.Integer})
+        family = Model(
+            "Family",
+            {
+                "father": fields.Nested(person),
+                "mother": fields.Nested(person, allow_null=True),
+                "guardian": fields.Nested(person, default={}),
+                "children": fields.List(fields.Nested(person, skip_none=True)),
+                "tags": fields.List(fields.String),
+                "raw": fields.List(fields.Raw),
+                "address": {"city": fields.String, "zip": fields.String},
+            },
+        )
+        data = {
+            "father": {"name": "John", "age": "42"},
+            "children": [{"name": "Jack"}, None, {"name": "Jill", "age": 12}],
+            "tags": ("a", 1, None),
+            "raw": [{"x": 1}, None],
+            "city": "Paris",
+        }
+        self.assert_same(data, family)
+        self.assert_same(data, family, ordered=True)
+        self.assert_same(data, family, skip_none=True)
+
+    def test_compiled_recursive_fields(self):
+        node = {"name": fields.String}
+        node["children"] = fields.List(fields.Nested(node))
+        data = {"name": "root", "children": [{"name": "leaf", "children": []}]}
+        assert self.assert_same(data, node) == data
+
+    def test_compiled_recursive_model(self):
+        node = Model("Node", {"name": fields.String})
+        node["children"] = fields.List(fields.Nested(node))
+        node["parent"] = fields.Nested(node, allow_null=True)
+        data = {"name": "root", "children": [{"name": "leaf", "children": []}]}
+        assert self.assert_same(data, node) == {
+            "name": "root",
+            "children": [{"name": "leaf", "children": [], "parent": None}],
+            "parent": None,
+        }
+
+    def test_compiled_mutually_recursive_models(self):
+        person = Model("Person", {"name": fields.String})
+        team = Model("Team", {"name": fields.String})
+        person["team"] = fields.Nested(team, allow_null=True)
+        team["members"] = fields.List(fields.Nested(person))
+        data = {
+            "name": "alice",
+            "team": {"name": "core", "members": [{"name": "bob", "team": None}]},
+        }
+        assert self.assert_same(data, person) == data
+
+    def test_compiled_polymorph(self):
+        parent = Model("Person", {"name": fields.String})
+        child1 = parent.inherit("Child1", {"extra1": fields.String})
+        child2 = parent.inherit("Child2", {"extra2": fields.String})
+
+        class Child1(object):
+            name = "child1"
+            extra1 = "extra1"
+
+        class Child2(object):
+            name = "child2"
+            extra2 = "extra2"
+
+        thing = Model(
+            "Thing", {"owner": fields.Polymorph({Child1: child1, Child2: child2})}
+        )
+
+        assert self.assert_same({"owner": Child1()}, thing) == {
+            "owner": {"name": "child1", "extra1": "extra1"}
+        }
+        self.assert_same({"owner": Child2()}, thing)
+        self.assert_same({"owner": None}, thing)
+
+    def test_compiled_wildcard(self):
+        model = OrderedDict(
+            [
+                ("foo", fields.Raw),
+                ("*", fields.Wildcard(fields.String)),
+                ("bar", fields.Raw),
+            ]
+        )
+        data = OrderedDict([("foo", 1), ("a", "toto"), ("b", None), ("bar", 2)])
+        self.assert_same(data, model)
+        self.assert_same(data, model, ordered=True)
+        self.assert_same(data, model, skip_none=True)
+
+    def test_compiled_model_mask(self):
+        model = Model(
+            "Person", {"name": fields.String, "age": fields.Integer}, mask="name"
+        )
+        assert self.assert_same({"name": "John", "age": 42}, model) == {"name": "John"}
+
+    def test_compiled_marshallers_are_cached_on_model(self):
+        model = Model("Person", {"name": fields.String})
+        marshaller = compiled_marshaller(model)
+        assert compiled_marshaller(model) is marshaller
+        assert compiled_marshaller(model, ordered=True) is not marshaller
+
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_marshal_after_model_change(self, compiled):
+        model = Model("Person", {"name": fields.String})
+        data = {"name": "John", "age": 42}
+        assert marshal(data, model, compiled=compiled) == {"name": "John"}
+
+        model["age"] = fields.Integer
+        assert marshal(data, model, compiled=compiled) == {"name": "John", "age": 42}
+        del model["name"]
+        assert marshal(data, model, compiled=compiled) == {"age": 42}
+
+    def test_compiled_formatting_error(self):
+        model = {"age": fields.Integer}
+        with pytest.raises(fields.MarshallingError) as excinfo:
+            marshal({"age": "old"}, model, compiled=True)
+        assert 'Unable to marshal field "age" value "old"' in str(excinfo.value)
+
+    def test_compiled_marshal_decorator(self):
+        model = Model("Foo", {"foo": fields.Raw})
+
+        @marshal_with(model, envelope="hey", compiled=True)
+        def try_me():
+            return [OrderedDict([("foo", "bar"), ("bat", "baz")])], 200, {"X-test": 1}
+
+        assert try_me() == ({"hey": [{"foo": "bar"}]}, 200, {"X-test": 1})
+
+    def test_compiled_marshal_decorator_with_mask_header(self, app):
+        model = Model("Foo", {"foo": fields.Raw, "bar": fields.Raw})
+
+        @marshal_with(model, compiled=True)
+        def try_me():
+            return {"foo": 1, "bar": 2}
+
+        with app.test_request_context("/", headers={"X-Fields": "foo"}):
+            app.config["RESTX_MASK_HEADER"] = "X-Fields"
+            assert try_me() == {"foo": 1}
+
+
+class StreamedMarshallingTest(object):
+    def test_streamed_list_is_lazy(self):
+        consumed = []
+
+        def generate():
+            for i in range(3):
+                consumed.append(i)
+                yield {"a": i, "b": "ignored"}
+
+        stream = StreamedList(generate(), {"a": fields.Integer})
+        assert consumed == []
+        items = iter(stream)
+        assert next(items) == {"a": 0}
+        assert consumed == [0]
+        assert list(items) == [{"a": 1}, {"a": 2}]
+
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_streamed_list_marshal(self, compiled):
+        model = Model("Foo", {"a": fields.Integer, "b": fields.String})
+        data = [{"a": 1, "b": "x"}, {"a": 2}]
+        stream = StreamedList(
+            iter(data), model, envelope="data", mask="a", compiled=compiled
+        )
+        assert stream.marshal() == {"data": [{"a": 1}, {"a": 2}]}
+
+    def test_streamed_list_mask_error_is_eager(self):
+        with pytest.raises(mask.ParseError):
+            StreamedList(iter([]), {"a": fields.Integer}, mask="{a")
+
+    @pytest.mark.parametrize("envelope", [None, "items"])
+    def test_marshal_list_with_stream(self, app, client, envelope):
+        api = Api(app)
+        model = api.model("Foo", {"id": fields.Integer, "name": fields.String})
+
+        @api.route("/foos")
+        class Foos(Resource):
+            @api.marshal_list_with(model, envelope=envelope, stream=True)
+            def get(self):
+                return (
+                    ({"id": i, "name": str(i)} for i in range(250)),
+                    200,
+                    {"X-Test": "1"},
+                )
+
+        expected = [{"id": i, "name": str(i)} for i in range(250)]
+        if envelope:
+            expected = {envelope: expected}
+
+        resp = client.get("/foos")
+        assert resp.status_code == 200
+        assert resp.is_streamed
+        assert resp.content_type == "application/json"
+        assert resp.headers["X-Test"] == "1"
+        assert resp.data.endswith(b"\n")
+        assert json.loads(resp.data) == expected
+
+    def test_marshal_list_with_stream_empty(self, app, client):
+        api = Api(app)
+        model = api.model("Foo", {"id": fields.Integer})
+
+        @api.route("/foos")
+        class Foos(Resource):
+            @api.marshal_list_with(model, stream=True)
+            def get(self):
+                return iter([])
+
+        resp = client.get("/foos")
+        assert resp.status_code == 200
+        assert json.loads(resp.data) == []
+
+    def test_marshal_list_with_stream_and_mask_header(self, app, client):
+        api = Api(app)
+        model = api.model("Foo", {"id": fields.Integer, "name": fields.String})
+
+        @api.route("/foos")
+        class Foos(Resource):
+            @api.marshal_list_with(model, stream=True, compiled=True)
+            def get(self):
+                return ({"id": i, "name": str(i)} for i in range(3))
+
+        resp = client.get("/foos", headers={"X-Fields": "name"})
+        assert json.loads(resp.data) == [{"name": "0"}, {"name": "1"}, {"name": "2"}]
+
+        resp = client.get("/foos", headers={"X-Fields": "{name"})
+        assert resp.status_code == 400
+
+
+class MaskCacheTest(object):
+    def test_masked_fields_are_cached(self):
+        cache = MaskCache()
+        model = Model("Person", {"name": fields.String, "age": fields.Integer})
+        masked = cache.get(model, "name")
+        assert masked == {"name": model.resolved["name"]}
+        assert cache.get(model, "name") is masked
+        assert cache.get(model, mask.Mask("name")) is not masked
+        assert cache.get(model, "age") is not masked
+        assert len(cache) == 3
+
+    def test_cache_is_bounded(self):
+        cache = MaskCache(maxsize=2)
+        model = {"name": fields.String, "age": fields.Integer}
+        first = cache.get(model, "name")
+        cache.get(model, "age")
+        assert cache.get(model, "name") is first
+        cache.get(model, "name,age")
+        assert len(cache) == 2
+        # "age" was the least recently used
+        assert cache.get(model, "name") is first
+
+    def test_cache_disabled(self):
+        cache = MaskCache(maxsize=0)
+        model = {"name": fields.String}
+        assert cache.get(model, "name") is not cache.get(model, "name")
+        assert len(cache) == 0
+
+    def test_cache_invalid_mask(self):
+        cache = MaskCache()
+        with pytest.raises(mask.ParseError):
+            cache.get({"name": fields.String}, "{name")
+        assert len(cache) == 0
+
+    def test_marshal_uses_cache(self):
+        model = Model("Person", {"name": fields.String, "age": fields.Integer})
+        data = {"name": "John", "age": 42}
+        mask_cache.clear()
+        assert marshal(data, model, mask="name") == {"name": "John"}
+        assert marshal(data, model, mask="name", compiled=True) == {"name": "John"}
+        assert len(mask_cache) == 1
+        masked = mask_cache.get(model, "name")
+        assert compiled_marshaller(masked) is compiled_marshaller(masked)
+        mask_cache.clear()
+
+    def test_cache_model_changed(self):
+        cache = MaskCache()
+        model = Model("Person", {"name": fields.String})
+        masked = cache.get(model, "name,age")
+        assert list(masked) == ["name"]
+        model["age"] = fields.Integer
+        masked = cache.get(model, "name,age")
+        assert sorted(masked) == ["age", "name"]
+        assert cache.get(model, "name,age") is masked
+
+    def test_cache_fields_changed(self):
+        cache = MaskCache()
+        person = {"name": fields.String, "age": fields.String}
+        assert cache.get(person, "name,age")["age"] is fields.String
+        person["age"] = fields.Integer
+        masked = cache.get(person, "name,age")
+        assert masked["age"] is fields.Integer
+        assert cache.get(person, "name,age") is masked
+
+    def test_marshal_model_changed(self):
+        model = Model("Person", {"name": fields.String})
+        data = {"name": "John", "age": "42"}
+        assert marshal(data, model, mask="name,age") == {"name": "John"}
+        model["age"] = fields.Integer
+        expected = {"name": "John", "age": 42}
+        assert marshal(data, model, mask="name,age") == expected
+        assert marshal(data, model, mask="name,age", compiled=True) == expected
+
+    def test_cache_size_from_config(self, app):
+        app.config["RESTX_MASK_CACHE_SIZE"] = 16
+        Api(app)
+        assert mask_cache.maxsize == 128
+        model = Model("Person", {"name": fields.String})
+        with app.app_context():
+            marshal({"name": "John"}, model, mask="name")
+            cache = app.extensions["restx"]["mask_cache"]
+        assert cache.maxsize == 16
+        assert len(cache) == 1
+
+
+class RequestedFieldsTest(object):
+    model = Model(
+        "Person",
+        {
+            "name": fields.String,
+            "age": fields.Integer,
+            "address": fields.Nested({"street": fields.String, "city": fields.String}),
+        },
+    )
+
+    def test_requested_fields_from_header(self, app):
+        requested = None
+
+        @marshal_with(self.model)
+        def get():
+            nonlocal requested
+            requested = requested_fields()
+            return {}
+
+        with app.test_request_context("/", headers={"X-Fields": "name,address{city}"}):
+            app.config["RESTX_MASK_HEADER"] = "X-Fields"
+            get()
+            assert requested == mask.Mask("name,address{city}")
+            assert "age" not in requested
+            assert "city" in requested["address"]
+            assert requested_fields() is None
+
+    def test_requested_fields_from_decorator_mask(self, app):
+        requested = None
+
+        @marshal_with(self.model, mask="age")
+        def get():
+            nonlocal requested
+            requested = requested_fields()
+            return {"age": 42}
+
+        with app.test_request_context("/"):
+            app.config["RESTX_MASK_HEADER"] = "X-Fields"
+            assert get() == {"age": 42}
+            assert list(requested) == ["age"]
+
+    def test_requested_fields_without_mask(self, app):
+        @marshal_with(self.model)
+        def get():
+            return {"name": "all" if requested_fields() is None else "some"}
+
+        with app.test_request_context("/"):
+            app.config["RESTX_MASK_HEADER"] = "X-Fields"
+            assert get()["name"] == "all"
+
+    def test_requested_fields_outside_marshal_with(self, app):
+        assert requested_fields() is None
+        with app.test_request_context("/"):
+            assert requested_fields() is None
+
+    def test_requested_fields_through_namespace(self, app, client):
+        api = Api(app)
+        model = api.model("Person", {"name": fields.String, "age": fields.Integer})
+
+        @api.route("/person")
+        class Person(Resource):
+            @api.marshal_with(model)
+            def get(self):
+                requested = api.requested_fields()
+                return {"name": ",".join(requested) if requested else "*", "age": 42}
+
+        assert client.get_json("/person") == {"name": "*", "age": 42}
+        assert client.get_json("/person", headers={"X-Fields": "name"}) == {
+            "name": "name"
+        }
+        resp = client.get("/person", headers={"X-Fields": "{name"})
+        assert resp.status_code == 400
+
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_lazy_fields_are_evaluated_only_if_requested(self, compiled):
+        model = Model(
+            "Stats",
+            {
+                "name": fields.String,
+                "count": fields.Integer(lazy=True),
+                "items": fields.List(fields.Integer, lazy=True),
+                "owner": fields.Nested({"name": fields.String}, lazy=True),
+            },
+        )
+        calls = []
+
+        def lazy(value):
+            def evaluate():
+                calls.append(value)
+                return value
+
+            return evaluate
+
+        data = {
+            "name": "foo",
+            "count": lazy(3),
+            "items": lazy([1, 2]),
+            "owner": lazy({"name": "bar"}),
+        }
+        assert marshal(data, model, mask="name", compiled=compiled) == {"name": "foo"}
+        assert calls == []
+        assert marshal(data, model, compiled=compiled) == {
+            "name": "foo",
+            "count": 3,
+            "items": [1, 2],
+            "owner": {"name": "bar"},
+        }
+        assert len(calls) == 3
+
+
+class BatchLoaderTest(object):
+    def make_loader(self, objects, as_list=False):
+        calls = []
+
+        def loader(keys):
+            calls.append(list(keys))
+            if as_list:
+                return [objects.get(key) for key in keys]
+            return dict((key, objects[key]) for key in keys if key in objects)
+
+        return loader, calls
+
+    @pytest.mark.parametrize("compiled", [False, True])
+    @pytest.mark.parametrize("as_list", [False, True])
+    def test_nested_loader_is_called_once(self, compiled, as_list):
+        loader, calls = self.make_loader(
+            {1: {"name": "John"}, 2: {"name": "Jane"}}, as_list
+        )
+        model = Model(
+            "Post",
+            {
+                "title": fields.String,
+                "author": fields.Nested(
+                    {"name": fields.String},
+                    attribute="author_id",
+                    allow_null=True,
+                    loader=loader,
+                ),
+            },
+        )
+        data = [
+            {"title": "a", "author_id": 1},
+            {"title": "b", "author_id": 2},
+            {"title": "c", "author_id": 1},
+            {"title": "d", "author_id": 3},
+            {"title": "e", "author_id": None},
+        ]
+        assert marshal(data, model, compiled=compiled) == [
+            {"title": "a", "author": {"name": "John"}},
+            {"title": "b", "author": {"name": "Jane"}},
+            {"title": "c", "author": {"name": "John"}},
+            {"title": "d", "author": None},
+            {"title": "e", "author": None},
+        ]
+        assert calls == [[1, 2, 3]]
+
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_list_loader_is_called_once(self, compiled):
+        loader, calls = self.make_loader({"a": {"name": "A"}, "b": {"name": "B"}})
+        model = Model(
+            "Post",
+            {
+                "tags": fields.List(
+                    fields.Nested({"name": fields.String}, loader=loader),
+                    attribute="tag_ids",
+                ),
+            },
+        )
+        data = [{"tag_ids": ["a", "b"]}, {"tag_ids": ["b"]}, {"tag_ids": []}]
+        assert marshal(data, model, compiled=compiled) == [
+            {"tags": [{"name": "A"}, {"name": "B"}]},
+            {"tags": [{"name": "B"}]},
+            {"tags": []},
+        ]
+        assert calls == [["a", "b"]]
+
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_nested_loaders_are_batched_across_levels(self, compiled):
+        load_companies, company_calls = self.make_loader(
+            {10: {"name": "ACME"}, 20: {"name": "Initech"}}
+        )
+        load_authors, author_calls = self.make_loader(
+            {
+                1: {"name": "John", "company_id": 10},
+                2: {"name": "Jane", "company_id": 20},
+            }
+        )
+        company = Model("Company", {"name": fields.String})
+        author = Model(
+            "Author",
+            {
+                "name": fields.String,
+                "company": fields.Nested(
+                    company, attribute="company_id", loader=load_companies
+                ),
+            },
+        )
+        post = Model(
+            "Post",
+            {
+                "author": fields.Nested(
+                    author, attribute="author_id", loader=load_authors
+                )
+            },
+        )
+        blog = Model("Blog", {"posts": fields.List(fields.Nested(post))})
+        data = {"posts": [{"author_id": 1}, {"author_id": 2}, {"author_id": 1}]}
+        output = marshal(data, blog, compiled=compiled)
+        assert [p["author"]["company"]["name"] for p in output["posts"]] == [
+            "ACME",
+            "Initech",
+            "ACME",
+        ]
+        assert author_calls == [[1, 2]]
+        assert company_calls == [[10, 20]]
+
+    def test_loader_without_batch(self):
+        loader, calls = self.make_loader({1: {"name": "John"}})
+        field = fields.Nested({"name": fields.String}, loader=loader)
+        assert field.output("author", {"author": 1}) == {"name": "John"}
+        assert calls == [[1]]
+
+    def test_loader_with_streamed_list(self):
+        loader, calls = self.make_loader(dict((i, {"name": str(i)}) for i in range(5)))
+        model = Model(
+            "Post",
+            {"author": fields.Nested({"name": fields.String}, loader=loader)},
+        )
+        stream = StreamedList(
+            ({"author": i} for i in range(5)), model, chunk_size=2, compiled=True
+        )
+        assert [item["author"]["name"] for item in stream] == ["0", "1", "2", "3", "4"]
+        assert calls == [[0, 1], [2, 3], [4]]
+
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_no_batch_pass_without_loaders(self, compiled):
+        loader, calls = self.make_loader({})
+        fields.Nested({"name": fields.String}, loader=loader)
+        reads = []
+
+        class Post(object):
+            def __init__(self, author):
+                self._author = author
+
+            @property
+            def author(self):
+                reads.append(self._author)
+                return {"name": self._author}
+
+        model = Model(
+            "Post",
+            {"author": fields.Nested(Model("Author", {"name": fields.String}))},
+        )
+        data = [Post("a"), Post("b"), Post("c")]
+        out = marshal(data, model, compiled=compiled)
+        assert [item["author"]["name"] for item in out] == ["a", "b", "c"]
+        assert reads == ["a", "b", "c"]
@@ -615,6 +615,102 @@ class ModelTest(object):
         with pytest.raises(BadRequest):
             model.validate(data, format_checker=FormatChecker())
 
+    def test_validator_is_cached(self):
+        from jsonschema import FormatChecker
+
+        model = Model("MyModel", {"name": fields.String})
+        checker = FormatChecker()
+
+        validator = model.get_validator()
+        assert model.get_validator() is validator
+        assert model.get_validator(format_checker=checker) is not validator
+        assert model.get_validator(format_checker=checker) is model.get_validator(
+            format_checker=checker
+        )
+
+    @pytest.mark.parametrize(
+        "mutate",
+        [
+            lambda m: m.__setitem__("age", fields.Integer(required=True)),
+            lambda m: m.update({"age": fields.Integer(required=True)}),
+            lambda m: m.setdefault("age", fields.Integer(required=True)),
+        ],
+    )
+    def test_validator_is_invalidated_on_change(self, mutate):
+        from werkzeug.exceptions import BadRequest
+
+        model = Model("MyModel", {"name": fields.String})
+        validator = model.get_validator()
+        model.validate({"name": "foo"})
+
+        mutate(model)
+        assert model.get_validator() is not validator
+        with pytest.raises(BadRequest):
+            model.validate({"name": "foo"})
+
+    def test_validate_walks_payload_once(self, mocker):
+        from werkzeug.exceptions import BadRequest
+
+        model = Model("MyModel", {"name": fields.String(required=True)})
+        validator = model.get_validator()
+        iter_errors = mocker.spy(type(validator), "iter_errors")
+        validate = mocker.spy(type(validator), "validate")
+
+        model.validate({"name": "foo"})
+        with pytest.raises(BadRequest):
+            model.validate({})
+        assert iter_errors.call_count == 2
+        assert not validate.called
+
+    def test_validate_collection(self):
+        from werkzeug.exceptions import BadRequest
+
+        model = Model("MyModel", {"name": fields.String(required=True)})
+        assert model.get_validator(collection=True) is not model.get_validator()
+        model.validate([{"name": "foo"}, {"name": "bar"}], collection=True)
+        with pytest.raises(BadRequest) as excinfo:
+            model.validate([{"name": "foo"}, {}], collection=True)
+        assert excinfo.value.data["errors"] == {
+            "1.name": "'name' is a required property"
+        }
+
+    def test_validator_is_invalidated_on_removal(self):
+        model = OrderedModel("MyModel", {"name": fields.String(required=True)})
+        validator = model.get_validator()
+        del model["name"]
+        assert model.get_validator() is not validator
+        model.validate({})
+
+    def test_schema_is_cached(self):
+        model = Model("MyModel", {"name": fields.String, "age": fields.Integer})
+        schema = model.__schema__
+        assert model.__schema__ is schema
+        assert model.get_validator().schema is schema
+
+    @pytest.mark.parametrize(
+        "mutate",
+        [
+            lambda m: m.__setitem__("age", fields.Integer(required=True)),
+            lambda m: m.update({"age": fields.Integer(required=True)}),
+            lambda m: m.pop("name"),
+            lambda m: m.clear(),
+        ],
+    )
+    def test_schema_is_invalidated_on_change(self, mutate):
+        model = OrderedModel("MyModel", {"name": fields.String(required=True)})
+        schema = model.__schema__
+        mutate(model)
+        assert model.__schema__ is not schema
+        assert model.__schema__ != schema
+
+    def test_inherited_schema_is_cached(self):
+        parent = Model("Parent", {"name": fields.String})
+        child = parent.inherit("Child", {"age": fields.Integer})
+        schema = child.__schema__
+        assert schema["allOf"][0] == {"$ref": "#/definitions/Parent"}
+        assert child.__schema__ is schema
+        assert parent.__schema__ is not schema
+
 
 class ModelSchemaTestCase(object):
     def test_model_schema(self):
@@ -1,5 +1,11 @@
+import pytest
+
+from werkzeug.exceptions import BadRequest
+
 import flask_restx as restx
 
+from flask_restx.payload import request_payload
+
 
 class PayloadTest(object):
     def assert_errors(self, client, url, data, *errors):
@@ -338,8 +344,56 @@ class PayloadTest(object):
             client,
             "/validation/",
             [{"username": "alice"}, {"username": 123}],
-            "username",
+            "1.username",
+        )
+
+        # Every invalid item is reported, indexed by its position
+        out = client.post_json(
+            "/validation/", [{"username": 1}, {}, {"username": 3}], status=400
         )
+        assert out["errors"] == {
+            "0.username": "1 is not of type 'string'",
+            "2.username": "3 is not of type 'string'",
+        }
+
+    def test_validation_does_not_generate_specs(self, app, client, mocker):
+        api = restx.Api(app, validate=True, doc=False)
+        as_dict = mocker.patch("flask_restx.api.Swagger.as_dict")
+
+        address = api.model("Address", {"city": restx.fields.String(required=True)})
+        person = api.model("Person", {"address": restx.fields.Nested(address)})
+
+        @api.route("/validation/")
+        class Persons(restx.Resource):
+            @api.expect(person)
+            def post(self):
+                return {}
+
+        self.assert_errors(client, "/validation/", {"address": {}}, "address.city")
+        assert not as_dict.called
+
+    def test_validation_registry_is_updated(self, app, client):
+        api = restx.Api(app, validate=True)
+        ns = restx.Namespace("ns")
+
+        api.model("Person", {"name": restx.fields.String(required=True)})
+        registry = api.refresolver
+
+        address = ns.model("Address", {"city": restx.fields.String(required=True)})
+        team = ns.model("Team", {"address": restx.fields.Nested(address)})
+
+        @ns.route("/team/")
+        class Teams(restx.Resource):
+            @ns.expect(team)
+            def post(self):
+                return {}
+
+        api.add_namespace(ns)
+        assert api.refresolver is not registry
+        self.assert_errors(client, "/ns/team/", {"address": {}}, "address.city")
+
+        api.model("Other", {"name": restx.fields.String})
+        assert "Other" in api.refresolver["http://localhost/schema.json"]["definitions"]
 
     def test_validation_with_propagate(self, app, client):
         app.config["PROPAGATE_EXCEPTIONS"] = True
@@ -375,3 +429,55 @@ class PayloadTest(object):
         )
 
         assert response.status_code == 200
+
+
+class RequestPayloadTest(object):
+    def test_decoded_once(self, app, client):
+        api = restx.Api(app, validate=True)
+        model = api.model("Person", {"name": restx.fields.String(required=True)})
+        parser = api.parser()
+        parser.add_argument("name", location="json")
+        parser.add_argument("age", type=int, location=("json", "args"))
+        parser.add_argument("city", location=("json", "args"))
+
+        @api.route("/payload/")
+        class Payload(restx.Resource):
+            @api.expect(model)
+            def post(self):
+                args = parser.parse_args()
+                payload = request_payload()
+                assert payload.merged(("json", "args"))["age"] == 42
+                return {
+                    "name": api.payload["name"],
+                    "args": args,
+                    "decodes": payload.decodes,
+                }
+
+        out = client.post_json("/payload/?city=Paris", {"name": "John", "age": 42})
+        assert out == {
+            "name": "John",
+            "args": {"name": "John", "age": 42, "city": "Paris"},
+            "decodes": 1,
+        }
+
+    def test_merged_is_shared(self, app):
+        with app.test_request_context("/?a=1", json={"b": 2}):
+            payload = request_payload()
+            assert request_payload() is payload
+            merged = payload.merged(["json", "args"])
+            assert merged is payload.merged(("json", "args"))
+            assert merged.to_dict() == {"a": "1", "b": 2}
+            assert payload.args.to_dict() == {"a": "1"}
+            assert payload.json == {"b": 2}
+            assert payload.decodes == 1
+
+    def test_invalid_json(self, app):
+        with app.test_request_context(
+            "/", data="{", headers={"content-type": "application/json"}
+        ):
+            payload = request_payload()
+            assert payload.get_json(silent=True) is None
+            with pytest.raises(BadRequest):
+                payload.json
+            assert payload.location("json") is None
+            assert payload.decodes == 1
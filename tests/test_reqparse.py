@@ -1,3 +1,5 @@
+from array import array
+
 import decimal
 import json
 import io
@@ -427,6 +429,75 @@ class ReqParseTest(object):
         args = parser.parse_args(req)
         assert "bat" == args.get("foo")
 
+    def test_parse_choices_insensitive_does_not_mutate(self, app):
+        req = Request.from_values("/bubble?foo=BAT")
+
+        parser = RequestParser()
+        parser.add_argument("foo", choices=["BAT", "Ball"], case_sensitive=False),
+
+        assert parser.parse_args(req) == {"foo": "bat"}
+        assert parser.args[0].choices == ["BAT", "Ball"]
+        assert parser.__schema__[0]["enum"] == ["BAT", "Ball"]
+
+    def test_parse_choices_updated(self, app):
+        req = Request.from_values("/bubble?foo=bat")
+
+        parser = RequestParser()
+        parser.add_argument("foo", choices=["ball"]),
+        parser.args[0].choices = ["bat"]
+
+        assert parser.parse_args(req) == {"foo": "bat"}
+
+    def test_parse_choices_unhashable(self, app):
+        req = Request.from_values(
+            "/bubble",
+            data=json.dumps({"foo": [1, 2]}),
+            content_type="application/json",
+        )
+
+        parser = RequestParser()
+        parser.add_argument("foo", type=list, choices=[[1, 2], [3]], location="json")
+        assert parser.parse_args(req) == {"foo": [1, 2]}
+
+        parser = RequestParser()
+        parser.add_argument("foo", type=list, choices=[[3]], location="json")
+        with pytest.raises(BadRequest):
+            parser.parse_args(req)
+
+    @pytest.mark.parametrize("compiled", [False, True])
+    def test_parse_choices_range(self, app, compiled):
+        parser = RequestParser()
+        parser.add_argument("foo", type=int, choices=range(10**9))
+        assert parser.args[0]._allowed() is parser.args[0].choices
+        if compiled:
+            parser.compile()
+
+        req = Request.from_values("/bubble?foo=42")
+        assert parser.parse_args(req) == {"foo": 42}
+
+        req = Request.from_values("/bubble?foo=-1")
+        with pytest.raises(BadRequest):
+            parser.parse_args(req)
+
+    def test_parse_choices_container(self, app):
+        class Even(object):
+            def __contains__(self, value):
+                return value % 2 == 0
+
+        even = Even()
+        parser = RequestParser()
+        parser.add_argument("foo", type=int, choices=even, case_sensitive=False)
+        assert parser.args[0]._allowed() is even
+        assert parser.parse_args(Request.from_values("/bubble?foo=4")) == {"foo": 4}
+        with pytest.raises(BadRequest):
+            parser.parse_args(Request.from_values("/bubble?foo=3"))
+
+    def test_parse_choices_insensitive_set(self, app):
+        parser = RequestParser()
+        parser.add_argument("foo", choices={"BAT", "ball"}, case_sensitive=False)
+        req = Request.from_values("/bubble?foo=Bat")
+        assert parser.parse_args(req) == {"foo": "bat"}
+
     def test_parse_ignore(self, app):
         req = Request.from_values("/bubble?foo=bar")
 
@@ -593,6 +664,53 @@ class ReqParseTest(object):
         assert args["foo"] == 101
         assert args["bar"] == "baz"
 
+    def test_request_parser_copy_on_write(self, app):
+        parser = RequestParser()
+        parser.add_argument("foo", type=int)
+        parser.add_argument("bar")
+        foo, bar = parser.args
+
+        parser_copy = parser.copy()
+        parser_copy.replace_argument("foo", type=str)
+        parser_copy.remove_argument("bar")
+        parser_copy.add_argument("baz")
+
+        assert parser.args == [foo, bar]
+        assert [a.name for a in parser_copy.args] == ["foo", "baz"]
+        assert parser_copy.args[0] is not foo and parser_copy.args[0].type is str
+
+    def test_request_parser_copy_is_independent(self, app):
+        parser = RequestParser()
+        parser.add_argument("foo", type=int)
+        parser_copy = parser.copy()
+
+        parser_copy.args[0].required = True
+        assert not parser.args[0].required
+        parser.args[0].choices = [1]
+        assert parser_copy.args[0].choices == ()
+
+        req = Request.from_values("/bubble")
+        assert parser.parse_args(req) == {"foo": None}
+        with pytest.raises(BadRequest):
+            parser_copy.parse_args(req)
+
+    def test_request_parser_copy_compiled(self, app):
+        parser = RequestParser().compile()
+        parser.add_argument("foo", type=int)
+        parser.add_argument("bar")
+
+        parser_copy = parser.copy()
+        assert parser_copy._compiled == []
+        assert [c.argument for c in parser_copy._plan()] == parser_copy.args
+
+        parser_copy.replace_argument("foo", type=str)
+        assert [c.argument for c in parser._plan()] == parser.args
+        assert [c.argument for c in parser_copy._plan()] == parser_copy.args
+
+        req = Request.from_values("/bubble?foo=101&bar=baz")
+        assert parser.parse_args(req) == {"foo": 101, "bar": "baz"}
+        assert parser_copy.parse_args(req) == {"foo": "101", "bar": "baz"}
+
     def test_request_parse_copy_including_settings(self):
         parser = RequestParser(trim=True, bundle_errors=True)
         parser_copy = parser.copy()
@@ -727,7 +845,173 @@ class ReqParseTest(object):
         assert args["int2"] == 2
 
 
+class CompiledRequestParserTest(object):
+    def make_parser(self):
+        parser = RequestParser(bundle_errors=True)
+        parser.add_argument("int", type=int, location="args")
+        parser.add_argument("float", type=float)
+        parser.add_argument("decimal", type=decimal.Decimal)
+        parser.add_argument("bool", type=inputs.boolean)
+        parser.add_argument("split", type=int, action="split")
+        parser.add_argument("append", action="append")
+        parser.add_argument("choice", choices=("One", "Two"), case_sensitive=False)
+        parser.add_argument("op", type=int, operators=["<=", "="], action="append")
+        parser.add_argument("trimmed", trim=True, location=["headers", "args"])
+        parser.add_argument("default", default=lambda: "computed")
+        parser.add_argument("missing", store_missing=False)
+        parser.add_argument("ignored", type=int, ignore=True)
+        return parser
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "",
+            "int=1&float=1.5&decimal=3.14&bool=true&split=1,2,3",
+            "append=a&append=b&choice=ONE&op<=1&op=2&trimmed=%20x%20&ignored=x",
+            "int=x&bool=x&split=1,x&choice=three&missing=here",
+        ],
+    )
+    def test_same_results(self, app, query):
+        parser = self.make_parser()
+        compiled = self.make_parser().compile()
+        results = []
+        for p in parser, compiled:
+            with app.test_request_context("/?" + query):
+                try:
+                    results.append(p.parse_args())
+                except BadRequest as e:
+                    results.append(e.data)
+        assert results[0] == results[1]
+
+    def test_compile(self):
+        parser = RequestParser()
+        assert parser.compile() is parser
+        parser.add_argument("foo")
+        parser.add_argument("bar")
+        assert [a.name for a in parser._plan()] == ["foo", "bar"]
+        parser.replace_argument("foo", type=int)
+        assert [a.name for a in parser._plan()] == ["bar", "foo"]
+        parser.remove_argument("bar")
+        assert [a.name for a in parser._plan()] == ["foo"]
+        assert [a.name for a in parser.copy()._plan()] == ["foo"]
+
+    def test_compile_appended_arguments(self, app):
+        parser = RequestParser().compile()
+        parser.add_argument("foo", type=int)
+        plan = parser._plan()
+        parser.args.append(Argument("bar", type=int))
+
+        req = Request.from_values("/bubble?foo=1&bar=2")
+        assert parser.parse_args(req) == {"foo": 1, "bar": 2}
+        assert parser._plan()[0] is plan[0]
+
+    def test_compile_overridden_parse(self, app):
+        class CustomArgument(Argument):
+            def parse(self, request, bundle_errors=False):
+                value, found = super(CustomArgument, self).parse(request, bundle_errors)
+                return "custom {0}".format(value), found
+
+        parser = RequestParser(argument_class=CustomArgument).compile()
+        parser.add_argument("foo")
+        req = Request.from_values("/bubble?foo=bar")
+        assert parser.parse_args(req) == {"foo": "custom bar"}
+
+    def test_native_types_skip_convert(self, app, mocker):
+        convert = mocker.spy(Argument, "convert")
+        parser = RequestParser().compile()
+        parser.add_argument("foo", type=int)
+        parser.add_argument("bar", type=inputs.boolean)
+        with app.test_request_context("/?foo=1&bar=true"):
+            assert parser.parse_args() == {"foo": 1, "bar": True}
+        assert convert.call_count == 1
+
+    def test_strict(self, app):
+        parser = RequestParser().compile()
+        parser.add_argument("foo")
+        with app.test_request_context("/?foo=1&bar=2"):
+            with pytest.raises(BadRequest) as cm:
+                parser.parse_args(strict=True)
+        assert "bar" in cm.value.description
+        assert "foo" not in cm.value.description
+
+
+class BulkConversionTest(object):
+    @pytest.fixture(params=[False, True], ids=["plain", "compiled"])
+    def compiled(self, request):
+        return request.param
+
+    def parse(self, app, query, compiled, **kwargs):
+        parser = RequestParser()
+        parser.add_argument("ids", **kwargs)
+        if compiled:
+            parser.compile()
+        with app.test_request_context("/?" + query):
+            return parser.parse_args()["ids"]
+
+    def test_split(self, app, compiled, mocker):
+        convert = mocker.spy(Argument, "convert")
+        many = mocker.spy(inputs.natural, "many")
+        ids = self.parse(
+            app, "ids=1,2,3", compiled, type=inputs.natural, action="split"
+        )
+        assert ids == [1, 2, 3]
+        assert convert.call_count == 0
+        assert many.call_count == 1
+
+    def test_append(self, app, compiled, mocker):
+        convert = mocker.spy(Argument, "convert")
+        ids = self.parse(
+            app, "ids=1&ids=%202&ids=3", compiled, type=int, action="append", trim=True
+        )
+        assert ids == [1, 2, 3]
+        assert convert.call_count == 0
+
+    @pytest.mark.parametrize("action", ["split", "append"])
+    def test_first_error(self, app, compiled, action):
+        query = "ids=1,-1,x" if action == "split" else "ids=1&ids=-1&ids=x"
+        with pytest.raises(BadRequest) as cm:
+            self.parse(app, query, compiled, type=inputs.natural, action=action)
+        assert cm.value.data["errors"] == {
+            "ids": "Invalid ids: -1. ids must be a non-negative integer"
+        }
+
+    def test_append_ignore(self, app, compiled):
+        ids = self.parse(
+            app, "ids=1&ids=x&ids=3", compiled, type=int, action="append", ignore=True
+        )
+        assert ids == [1, 3]
+
+    def test_packed(self, app, compiled):
+        ids = self.parse(
+            app, "ids=1,2,3", compiled, type=inputs.packed(int, "l"), action="split"
+        )
+        assert ids == array("l", [1, 2, 3])
+
+    def test_custom_convert(self, app, compiled):
+        class Custom(Argument):
+            def convert(self, value, op):
+                return "custom"
+
+        parser = RequestParser(argument_class=Custom)
+        parser.add_argument("ids", type=int, action="split")
+        if compiled:
+            parser.compile()
+        with app.test_request_context("/?ids=1,2"):
+            assert parser.parse_args()["ids"] == ["custom", "custom"]
+
+    def test_split_choices(self, app, compiled):
+        with pytest.raises(BadRequest) as cm:
+            self.parse(app, "ids=a,b", compiled, choices=("a", "b"), action="split")
+        assert "not a valid choice" in cm.value.data["errors"]["ids"]
+
+
 class ArgumentTest(object):
+    def test_slots(self):
+        arg = Argument("foo")
+        assert not hasattr(arg, "__dict__")
+        with pytest.raises(AttributeError):
+            arg.unknown = True
+
     def test_name(self):
         arg = Argument("foo")
         assert arg.name == "foo"
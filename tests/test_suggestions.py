@@ -0,0 +1,123 @@
+import difflib
+
+import pytest
+
+from werkzeug.exceptions import NotFound
+
+import flask_restx as restx
+
+from flask_restx.suggestions import RE_RULES, RouteIndex, route_index
+
+RULES = [
+    "/users/",
+    "/users/<int:id>",
+    "/users/<int:id>/orders/",
+    "/orders/<id>/items/",
+    "/products/",
+    "/products/<int:id>/reviews/",
+    "/accounts/settings",
+    "/admin/export",
+]
+
+
+def close_matches(path, rules):
+    rules = dict((RE_RULES.sub("", rule), rule) for rule in rules)
+    return [rules[match] for match in difflib.get_close_matches(path, rules)]
+
+
+class RouteIndexTest(object):
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/user/",
+            "/users",
+            "/USERS/",
+            "/users/orders/",
+            "/product/reviews/",
+            "/acounts/setting",
+            "/admin/exports",
+            "/unknown",
+            "/",
+            "",
+        ],
+    )
+    def test_same_as_get_close_matches(self, path):
+        assert RouteIndex(RULES).suggest(path) == close_matches(path, RULES)
+
+    def test_long_path(self):
+        assert RouteIndex(RULES).suggest("/users/" * 100) == []
+
+    def test_no_rules(self):
+        assert RouteIndex([]).suggest("/users/") == []
+
+    def test_cached(self, mocker):
+        index = RouteIndex(RULES, maxsize=2)
+        suggest = mocker.spy(index, "_suggest")
+        assert index.suggest("/admin/exports") == ["/admin/export"]
+        assert index.suggest("/admin/exports") == ["/admin/export"]
+        assert index.suggest("/unknown") == []
+        assert index.suggest("/unknown") == []
+        assert suggest.call_count == 2
+
+        index.suggest("/other")
+        assert len(index) == 2
+        index.suggest("/admin/exports")
+        assert suggest.call_count == 4
+
+        index.clear()
+        assert len(index) == 0
+
+    def test_budget(self):
+        # Stops after the first trigram and the first compared rule
+        assert len(RouteIndex(RULES, budget=0).suggest("/users/orders/")) <= 1
+        assert len(RouteIndex(RULES).suggest("/users/orders/")) > 1
+
+
+class RouteIndexApiTest(object):
+    def test_built_once(self, app):
+        api = restx.Api(app)
+        api.add_resource(restx.Resource, "/foo", endpoint="foo")
+
+        index = route_index(app)
+        assert route_index(app) is index
+        with app.test_request_context("/fooo"):
+            response = api.handle_error(NotFound())
+        assert "did you mean /foo ?" in response.data.decode()
+        assert route_index(app) is index
+
+    def test_rebuilt_after_registration(self, app):
+        api = restx.Api(app)
+        api.add_resource(restx.Resource, "/foo", endpoint="foo")
+        index = route_index(app)
+
+        api.add_resource(restx.Resource, "/bar", endpoint="bar")
+        assert route_index(app) is not index
+        with app.test_request_context("/baar"):
+            response = api.handle_error(NotFound())
+        assert "did you mean /bar ?" in response.data.decode()
+
+    def test_rebuilt_after_rule_added(self, app):
+        api = restx.Api(app)
+        api.add_resource(restx.Resource, "/foo", endpoint="foo")
+        index = route_index(app)
+
+        app.add_url_rule("/bar", "bar", lambda: "")
+        assert route_index(app) is not index
+        with app.test_request_context("/baar"):
+            response = api.handle_error(NotFound())
+        assert "did you mean /bar ?" in response.data.decode()
+
+    def test_rules_not_counted_on_reuse(self, app, mocker):
+        restx.Api(app)
+        index = route_index(app)
+        iter_rules = mocker.spy(app.url_map, "iter_rules")
+        assert route_index(app) is index
+        assert iter_rules.call_count == 0
+
+    def test_settings(self, app):
+        app.config["RESTX_ERROR_404_HELP_BUDGET"] = 0.1
+        app.config["RESTX_ERROR_404_HELP_CACHE_SIZE"] = 10
+        restx.Api(app)
+        index = route_index(app)
+        assert index.budget == 0.1
+        assert index.maxsize == 10
@@ -1,13 +1,20 @@
+import gzip
+import json
+import mmap
+
 import pytest
 
+from functools import partial
 from textwrap import dedent
 
-from flask import url_for, Blueprint
+from flask import Flask, url_for, Blueprint, make_response
 from werkzeug.datastructures import FileStorage
+from werkzeug.routing import BuildError
 
 import flask_restx as restx
 
 from flask_restx import inputs
+from flask_restx.codec import codec_for
 
 
 class SwaggerTest(object):
@@ -3571,3 +3578,529 @@ class SwaggerDeprecatedTest(object):
         assert resp.content_type == "text/html; charset=utf-8"
         resp = client.get("/ns1/test1")
         assert resp.status_code == 200
+
+
+class SpecsDocumentTest(object):
+    def test_etag_and_not_modified(self, api, client):
+        response = client.get("/swagger.json")
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"{0}"'.format(api.specs_document().etag)
+        assert response.headers["Cache-Control"] == "public, max-age=0"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert response.json["swagger"] == "2.0"
+
+        response = client.get(
+            "/swagger.json", headers={"If-None-Match": response.headers["ETag"]}
+        )
+        assert response.status_code == 304
+        assert response.data == b""
+
+    def test_gzip(self, api, client):
+        response = client.get("/swagger.json", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.content_encoding == "gzip"
+        assert gzip.decompress(response.data) == api.specs_document().body
+        assert response.headers["ETag"].endswith('-gzip"')
+
+    def test_encoded_once(self, app, api, client, mocker):
+        dumps = mocker.spy(type(codec_for(app)), "dumps")
+        for _ in range(3):
+            client.get_specs()
+        assert dumps.call_count == 1
+
+    def test_max_age(self, app, api, client):
+        app.config["RESTX_SPECS_MAX_AGE"] = 60
+        response = client.get("/swagger.json")
+        assert response.headers["Cache-Control"] == "public, max-age=60"
+
+    def test_warmup(self, app):
+        api = restx.Api()
+
+        @api.route("/test/")
+        class Test(restx.Resource):
+            def get(self):
+                return {}
+
+        app.config["RESTX_SPECS_WARMUP"] = True
+        api.init_app(app)
+        assert api._specs_document is None
+
+        @api.route("/late/")
+        class Late(restx.Resource):
+            def get(self):
+                return {}
+
+        with app.test_client() as client:
+            client.get("/test/")
+            document = api._specs_document
+            assert document is not None
+            assert document._gzipped is not None
+            assert "/test/" in document.schema["paths"]
+            assert "/late/" in document.schema["paths"]
+            assert api.warmup() is document
+
+            response = client.get("/swagger.json")
+            assert response.headers["ETag"] == '"{0}"'.format(document.etag)
+
+    def test_explicit_warmup(self, app):
+        api = restx.Api(app)
+
+        @api.route("/test/")
+        class Test(restx.Resource):
+            def get(self):
+                return {}
+
+        assert api._specs_document is None
+        document = api.warmup()
+        assert "/test/" in document.schema["paths"]
+
+    def test_warmup_blueprint(self, app):
+        blueprint = Blueprint("api", __name__, url_prefix="/api")
+        api = restx.Api(blueprint)
+        app.config["RESTX_SPECS_WARMUP"] = True
+        app.register_blueprint(blueprint)
+
+        @api.route("/test/")
+        class Test(restx.Resource):
+            def get(self):
+                return {}
+
+        with app.test_client() as client:
+            client.get("/api/test/")
+            assert "/test/" in api._specs_document.schema["paths"]
+
+    def test_warmup_blueprint_outside_app_context(self):
+        blueprint = Blueprint("api", __name__)
+        api = restx.Api(blueprint)
+        with pytest.raises(RuntimeError):
+            api.warmup()
+
+    def test_custom_representation(self, api, client):
+        @api.representation("application/json")
+        def output_json(data, code, headers=None):
+            return make_response(json.dumps({"custom": data["swagger"]}), code)
+
+        response = client.get("/swagger.json")
+        assert response.json == {"custom": "2.0"}
+        assert "ETag" not in response.headers
+
+    def test_error(self, api, client, mocker):
+        mocker.patch.object(
+            restx.Swagger, "as_dict", side_effect=Exception("unrenderable")
+        )
+        response = client.get("/swagger.json")
+        assert response.status_code == 500
+        assert "ETag" not in response.headers
+        assert api.specs_document() is None
+
+
+def make_cached_api(app, cache, description="A resource"):
+    app.config["RESTX_SPECS_CACHE_DIR"] = str(cache)
+    api = restx.Api(app)
+    ns = api.namespace("things", description="Things")
+    thing = ns.model("Thing", {"name": restx.fields.String(description=description)})
+    thing["children"] = restx.fields.List(restx.fields.Nested(thing))
+
+    @ns.route("/<int:id>")
+    class Thing(restx.Resource):
+        @ns.marshal_with(thing)
+        def get(self, id):
+            """Get a thing"""
+
+        @ns.expect(thing)
+        def put(self, id):
+            """Update a thing"""
+
+    return api
+
+
+class SpecsCacheTest(object):
+    def fingerprint(self, api):
+        with api.app.test_request_context():
+            return restx.Swagger(api).fingerprint()
+
+    def test_fingerprint(self, tmp_path):
+        api = make_cached_api(Flask(__name__), tmp_path)
+        same = make_cached_api(Flask(__name__), tmp_path)
+        other = make_cached_api(Flask(__name__), tmp_path, description="Another")
+        assert self.fingerprint(api) == self.fingerprint(same)
+        assert self.fingerprint(api) != self.fingerprint(other)
+
+    def test_fingerprint_apidoc(self, app):
+        api = restx.Api(app)
+
+        @api.route("/test/")
+        class Test(restx.Resource):
+            def get(self):
+                return {}
+
+        fingerprint = self.fingerprint(api)
+        Test.get.__apidoc__ = {"description": "documented"}
+        assert self.fingerprint(api) != fingerprint
+
+    def test_fingerprint_field_class(self, app):
+        class Custom(restx.fields.Raw):
+            __schema_type__ = "string"
+
+        api = restx.Api(app)
+        api.model("Thing", {"custom": Custom})
+        fingerprint = self.fingerprint(api)
+        Custom.__schema_type__ = "integer"
+        assert self.fingerprint(api) != fingerprint
+        Custom.__schema_format__ = "int64"
+        assert self.fingerprint(api) != fingerprint
+
+    def test_fingerprint_callable_default(self, app):
+        api = restx.Api(app)
+        model = api.model("Thing", {"name": restx.fields.String(default=lambda: "a")})
+        fingerprint = self.fingerprint(api)
+        model["name"].default = lambda: "b"
+        assert self.fingerprint(api) != fingerprint
+
+    def test_fingerprint_partial(self, app):
+        api = restx.Api(app)
+        model = api.model(
+            "Thing", {"name": restx.fields.String(default=partial(str, "a"))}
+        )
+        fingerprint = self.fingerprint(api)
+        model["name"].default = partial(str, "b")
+        assert self.fingerprint(api) != fingerprint
+
+    def test_fingerprint_unstable_representation(self, app):
+        class Opaque(object):
+            __slots__ = ()
+
+        api = restx.Api(app)
+        api.model("Thing", {"name": restx.fields.String(example=Opaque())})
+        with pytest.raises(ValueError):
+            self.fingerprint(api)
+
+    def test_unfingerprintable_not_cached(self, tmp_path, caplog):
+        app = Flask(__name__)
+        api = make_cached_api(app, tmp_path)
+        api.models["Thing"]["name"].attribute = object()
+        response = app.test_client().get("/swagger.json")
+        assert response.status_code == 200
+        assert "Unable to fingerprint the specifications" in caplog.text
+        assert list(tmp_path.glob("swagger-*")) == []
+
+    def test_cache(self, tmp_path, mocker):
+        app = Flask(__name__)
+        make_cached_api(app, tmp_path)
+        data = app.test_client().get("/swagger.json").data
+        assert len(list(tmp_path.glob("swagger-*.json"))) == 1
+        assert len(list(tmp_path.glob("swagger-*.json.gz"))) == 1
+
+        as_dict = mocker.spy(restx.Swagger, "as_dict")
+        app = Flask(__name__)
+        api = make_cached_api(app, tmp_path)
+        client = app.test_client()
+        response = client.get("/swagger.json")
+        assert response.data == data
+        assert response.content_length == len(data)
+        assert isinstance(api.specs_document().body, mmap.mmap)
+        response = client.get("/swagger.json", headers={"Accept-Encoding": "gzip"})
+        assert gzip.decompress(response.data) == data
+        assert api.__schema__ == json.loads(data)
+        assert as_dict.call_count == 0
+
+    def test_cache_mismatch(self, tmp_path, mocker):
+        make_cached_api(Flask(__name__), tmp_path).warmup()
+        as_dict = mocker.spy(restx.Swagger, "as_dict")
+        api = make_cached_api(Flask(__name__), tmp_path, description="Another")
+        document = api.warmup()
+        assert as_dict.call_count == 1
+        assert isinstance(document.body, bytes)
+        assert len(list(tmp_path.glob("swagger-*.json"))) == 1
+        assert len(list(tmp_path.glob("swagger-*.json.gz"))) == 1
+
+    def test_cache_per_api(self, tmp_path):
+        make_cached_api(Flask(__name__), tmp_path).warmup()
+        app = Flask(__name__)
+        app.config["RESTX_SPECS_CACHE_DIR"] = str(tmp_path)
+        blueprint = Blueprint("api", __name__, url_prefix="/api")
+        api = restx.Api(blueprint)
+        app.register_blueprint(blueprint)
+        (tmp_path / "unrelated.json").write_text("{}")
+        with app.app_context():
+            api.warmup()
+        assert len(list(tmp_path.glob("swagger-specs-*.json"))) == 1
+        assert len(list(tmp_path.glob("swagger-api.specs-*.json"))) == 1
+        assert (tmp_path / "unrelated.json").exists()
+
+    def test_incomplete_cache(self, tmp_path, mocker):
+        make_cached_api(Flask(__name__), tmp_path).warmup()
+        for path in tmp_path.glob("swagger-*.json.gz"):
+            path.unlink()
+        as_dict = mocker.spy(restx.Swagger, "as_dict")
+        make_cached_api(Flask(__name__), tmp_path).warmup()
+        assert as_dict.call_count == 1
+
+    def test_unwritable_cache(self, tmp_path, caplog):
+        cache = tmp_path / "file"
+        cache.write_text("not a directory")
+        app = Flask(__name__)
+        make_cached_api(app, cache)
+        response = app.test_client().get("/swagger.json")
+        assert response.status_code == 200
+        assert "Unable to cache the specifications" in caplog.text
+
+
+class IncrementalSpecsTest(object):
+    def test_added_after_first_access(self, app, client):
+        api = restx.Api(app)
+        ns = api.namespace("first")
+
+        @ns.route("/first/")
+        class First(restx.Resource):
+            def get(self):
+                return {}
+
+        with app.test_request_context():
+            assert list(api.__schema__["paths"]) == ["/first/first/"]
+
+        other = restx.Namespace("other")
+        thing = other.model("Thing", {"name": restx.fields.String})
+
+        @other.route("/other/")
+        class Other(restx.Resource):
+            @other.marshal_with(thing)
+            def get(self):
+                return {}
+
+        api.add_namespace(other)
+        data = client.get_specs()
+        assert list(data["paths"]) == ["/first/first/", "/other/other/"]
+        assert list(data["definitions"]) == ["Thing"]
+
+    def test_fragments_are_reused(self, app, mocker):
+        api = restx.Api(app)
+
+        @api.route("/first/")
+        class First(restx.Resource):
+            def get(self):
+                return {}
+
+        serialize = mocker.spy(restx.Swagger, "serialize_resource")
+        with app.test_request_context():
+            api.__schema__
+
+            @api.route("/second/")
+            class Second(restx.Resource):
+                def get(self):
+                    return {}
+
+            assert "/second/" in api.__schema__["paths"]
+        resources = [call.args[2] for call in serialize.call_args_list]
+        assert resources == [First, Second]
+
+    def test_invalidate_resource(self, app, mocker):
+        api = restx.Api(app)
+
+        @api.route("/first/")
+        class First(restx.Resource):
+            def get(self):
+                return {}
+
+        @api.route("/second/")
+        class Second(restx.Resource):
+            def get(self):
+                return {}
+
+        with app.test_request_context():
+            api.__schema__
+            serialize = mocker.spy(restx.Swagger, "serialize_resource")
+            First.get.__apidoc__ = {"description": "Changed"}
+            api.invalidate_specs(resource=First)
+            specs = api.__schema__
+        assert specs["paths"]["/first/"]["get"]["description"] == "Changed"
+        assert [call.args[2] for call in serialize.call_args_list] == [First]
+
+    def test_invalidate_model(self, app, mocker):
+        api = restx.Api(app)
+        thing = api.model("Thing", {"name": restx.fields.String})
+        detail = api.model("Detail", {"id": restx.fields.Integer})
+
+        @api.route("/thing/")
+        class ThingResource(restx.Resource):
+            @api.marshal_with(thing)
+            def get(self):
+                return {}
+
+        @api.route("/other/")
+        class Other(restx.Resource):
+            def get(self):
+                return {}
+
+        with app.test_request_context():
+            assert list(api.__schema__["definitions"]) == ["Thing"]
+            serialize = mocker.spy(restx.Swagger, "serialize_resource")
+            thing["detail"] = restx.fields.Nested(detail)
+            api.invalidate_specs(model=thing)
+            specs = api.__schema__
+        assert list(specs["definitions"]) == ["Thing", "Detail"]
+        assert [call.args[2] for call in serialize.call_args_list] == [ThingResource]
+
+    def test_invalidate_model_in_place(self, app):
+        api = restx.Api(app)
+        name = restx.fields.String()
+        thing = api.model("Thing", {"name": name})
+
+        @api.route("/thing/")
+        class ThingResource(restx.Resource):
+            @api.expect(thing)
+            def post(self):
+                return {}
+
+        with app.test_request_context():
+            assert "required" not in api.__schema__["definitions"]["Thing"]
+            name.required = True
+            api.invalidate_specs(model=thing)
+            specs = api.__schema__
+        assert specs["definitions"]["Thing"]["required"] == ["name"]
+
+    def test_error_handler_after_first_access(self, app, client):
+        api = restx.Api(app)
+
+        class MyError(Exception):
+            pass
+
+        @api.route("/test/")
+        class Test(restx.Resource):
+            def get(self):
+                """
+                Do something
+
+                :raises MyError: when it fails
+                """
+                return {}
+
+        assert client.get_specs()["paths"]["/test/"]["get"]["responses"] == {
+            "200": {"description": "Success"}
+        }
+
+        @api.errorhandler(MyError)
+        @api.response(418, "My error")
+        def handle_my_error(error):
+            return {}, 418
+
+        specs = client.get_specs()
+        assert specs["paths"]["/test/"]["get"]["responses"]["418"] == {
+            "$ref": "#/responses/MyError"
+        }
+        assert "MyError" in specs["responses"]
+
+    def test_invalidate_all(self, app, mocker):
+        api = restx.Api(app)
+
+        @api.route("/test/")
+        class Test(restx.Resource):
+            def get(self):
+                return {}
+
+        with app.test_request_context():
+            api.__schema__
+            serialize = mocker.spy(restx.Swagger, "serialize_resource")
+            api.invalidate_specs()
+            api.__schema__
+        assert serialize.call_count == 1
+
+    def test_invalidate_specs_document(self, app, client):
+        api = restx.Api(app)
+        with app.test_request_context():
+            etag = '"{0}"'.format(api.specs_document().etag)
+
+        @api.route("/test/")
+        class Test(restx.Resource):
+            def get(self):
+                return {}
+
+        response = client.get("/swagger.json", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert "/test/" in response.json["paths"]
+
+
+class SplitSpecsTest(object):
+    @pytest.fixture
+    def api(self, app):
+        api = restx.Api(app, split_specs=True)
+        things = api.namespace("things", description="Things")
+        thing = things.model("Thing", {"name": restx.fields.String})
+        others = api.namespace("others")
+        other = others.model("Other", {"id": restx.fields.Integer})
+        api.namespace("empty")
+
+        @things.route("/")
+        class Things(restx.Resource):
+            @things.marshal_with(thing)
+            def get(self):
+                return {}
+
+        @others.route("/")
+        class Others(restx.Resource):
+            @others.marshal_with(other)
+            def get(self):
+                return {}
+
+        return api
+
+    def test_index(self, api, client):
+        data = client.get_json("/swagger/index.json")
+        assert data == {
+            "urls": [
+                {"name": "things", "url": "/swagger/things.json"},
+                {"name": "others", "url": "/swagger/others.json"},
+            ]
+        }
+
+    def test_namespace_specs(self, api, client):
+        data = client.get_json("/swagger/things.json")
+        assert list(data["paths"]) == ["/things/"]
+        assert [tag["name"] for tag in data["tags"]] == ["things"]
+        assert list(data["definitions"]) == ["Thing"]
+
+        data = client.get_json("/swagger/others.json")
+        assert list(data["paths"]) == ["/others/"]
+        assert list(data["definitions"]) == ["Other"]
+
+    def test_whole_specs_unchanged(self, api, client):
+        data = client.get_specs()
+        assert set(data["paths"]) == {"/things/", "/others/"}
+        assert set(data["definitions"]) == {"Thing", "Other"}
+
+    def test_unknown_or_empty_namespace(self, api, client):
+        assert client.get("/swagger/unknown.json").status_code == 404
+        assert client.get("/swagger/empty.json").status_code == 404
+
+    def test_built_on_demand(self, api, client, mocker):
+        serialize = mocker.spy(restx.Swagger, "serialize_resource")
+        client.get("/swagger/things.json")
+        client.get("/swagger/things.json")
+        assert [call.args[1].name for call in serialize.call_args_list] == ["things"]
+
+    def test_etag(self, api, client):
+        response = client.get("/swagger/things.json")
+        etag = response.headers["ETag"]
+        response = client.get("/swagger/things.json", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_invalidated(self, api, app, client):
+        with app.test_request_context():
+            ns = api.namespaces[1]
+            assert "/things/" in api.namespace_schema(ns)["paths"]
+            api.invalidate_specs(namespace=ns)
+            assert api._namespace_schemas == {}
+
+    def test_not_split(self, app, client):
+        api = restx.Api(app)
+
+        @api.route("/things/")
+        class Things(restx.Resource):
+            def get(self):
+                return {}
+
+        assert client.get("/swagger/things.json").status_code == 404
+        with pytest.raises(BuildError):
+            with app.test_request_context():
+                url_for("specs_namespace", namespace="things")
@@ -0,0 +1,179 @@
+import pytest
+
+from jsonschema import FormatChecker
+from jsonschema.validators import validator_for
+
+import flask_restx as restx
+
+from flask_restx import fields, Model
+from flask_restx.model import ModelBase
+from flask_restx.validation import CompiledValidator, compile_validator
+
+DEFINITIONS = {
+    "Address": {
+        "type": "object",
+        "required": ["city"],
+        "properties": {
+            "city": {"type": "string", "minLength": 2},
+            "zip": {"type": "string", "pattern": "^[0-9]{5}$"},
+        },
+    },
+    "Node": {
+        "type": "object",
+        "properties": {
+            "value": {"type": "integer"},
+            "children": {"type": "array", "items": {"$ref": "#/definitions/Node"}},
+        },
+    },
+}
+
+PERSON = {
+    "type": "object",
+    "required": ["name", "age"],
+    "properties": {
+        "name": {"type": "string", "minLength": 1, "maxLength": 10},
+        "age": {"type": "integer", "minimum": 0, "maximum": 150},
+        "score": {"type": "number", "exclusiveMinimum": 0, "exclusiveMaximum": 1},
+        "role": {"type": "string", "enum": ["admin", "user"]},
+        "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 2},
+        "address": {"$ref": "#/definitions/Address"},
+        "previous": {"anyOf": [{"$ref": "#/definitions/Address"}, {"type": "null"}]},
+        "tree": {"$ref": "#/definitions/Node"},
+        "any": {"description": "no validation"},
+    },
+    "additionalProperties": False,
+}
+
+PAYLOADS = [
+    {"name": "John", "age": 42},
+    {},
+    [],
+    "string",
+    {"name": "", "age": -1, "score": 1, "role": "root", "tags": ["a", 1, "c"]},
+    {"name": "a" * 11, "age": 1.0, "score": 0.5, "extra": 1, "other": None},
+    {"name": 1, "age": True, "address": {"zip": "abc"}, "previous": {"city": "P"}},
+    {"name": "x", "age": 1, "previous": None, "address": []},
+    {"name": "x", "age": 1, "tree": {"value": "1", "children": [{"children": [{}]}]}},
+    {"name": "x", "age": 1, "tree": {"children": [{"value": 1.5}, {"value": "2"}]}},
+]
+
+
+def jsonschema_errors(schema, data, definitions=None, format_checker=None):
+    if definitions:
+        schema = dict(
+            schema,
+            **{"$id": "http://localhost/schema.json", "definitions": definitions},
+        )
+    validator = validator_for(schema)(schema, format_checker=format_checker)
+    format_error = ModelBase("Test").format_error
+    return [format_error(e) for e in validator.iter_errors(data)]
+
+
+class CompiledValidatorTest(object):
+    @pytest.mark.parametrize("data", PAYLOADS)
+    def test_same_errors_as_jsonschema(self, data):
+        validator = compile_validator(PERSON, DEFINITIONS)
+        assert validator.errors(data) == jsonschema_errors(PERSON, data, DEFINITIONS)
+
+    @pytest.mark.parametrize(
+        "schema",
+        [
+            {"type": "array", "uniqueItems": True},
+            {"oneOf": [{"type": "string"}, {"type": "integer"}]},
+            {"type": "object", "properties": {"a": {"not": {"type": "null"}}}},
+            {"type": "object", "patternProperties": {"^x": {"type": "integer"}}},
+            {"type": "integer", "multipleOf": 3},
+            {"enum": [1, True, None]},
+        ],
+    )
+    @pytest.mark.parametrize(
+        "data", [None, 1, 2, True, "x", [1, 1], {"a": None, "xa": "1"}]
+    )
+    def test_delegated_keywords(self, schema, data):
+        validator = compile_validator(schema)
+        assert validator.errors(data) == jsonschema_errors(schema, data)
+
+    def test_format_checker(self):
+        schema = {
+            "type": "object",
+            "properties": {"ip": {"type": "string", "format": "ipv4"}},
+        }
+        checker = FormatChecker()
+        data = {"ip": "192.168.1"}
+        assert compile_validator(schema).errors(data) == []
+        assert compile_validator(schema, format_checker=checker).errors(
+            data
+        ) == jsonschema_errors(schema, data, format_checker=checker)
+
+    def test_is_valid(self):
+        validator = CompiledValidator(PERSON, DEFINITIONS)
+        assert validator.is_valid({"name": "John", "age": 42})
+        assert not validator.is_valid({"name": "John"})
+
+    def test_source(self):
+        validator = compile_validator({"type": "object", "required": ["name"]})
+        assert "'name' not in data" in validator.__source__
+
+    def test_model_compiled_engine(self):
+        from werkzeug.exceptions import BadRequest
+
+        model = Model(
+            "Person",
+            {"name": fields.String(required=True), "age": fields.Integer(min=0)},
+        )
+        validator = model.get_validator(engine="compiled")
+        assert isinstance(validator, CompiledValidator)
+        assert model.get_validator(engine="compiled") is validator
+        assert model.get_validator() is not validator
+
+        model.validate({"name": "John", "age": 1}, engine="compiled")
+        with pytest.raises(BadRequest) as excinfo:
+            model.validate({"age": -1}, engine="compiled")
+        assert excinfo.value.data["errors"] == {
+            "name": "'name' is a required property",
+            "age": "-1 is less than the minimum of 0",
+        }
+
+    def test_model_unknown_engine(self):
+        model = Model("Person", {"name": fields.String})
+        with pytest.raises(ValueError):
+            model.get_validator(engine="unknown")
+
+
+class CompiledValidationEngineTest(object):
+    @pytest.fixture
+    def api(self, app):
+        app.config["RESTX_VALIDATION_ENGINE"] = "compiled"
+        return restx.Api(app, validate=True)
+
+    def test_payload_validation(self, api, client):
+        address = api.model("Address", {"city": fields.String(required=True)})
+        person = api.model(
+            "Person",
+            {
+                "name": fields.String(required=True),
+                "address": fields.Nested(address),
+            },
+        )
+
+        @api.route("/people/")
+        class People(restx.Resource):
+            @api.expect(person)
+            def post(self):
+                return {}
+
+            @api.expect([person])
+            def put(self):
+                return {}
+
+        assert client.post_json("/people/", {"name": "John"}) == {}
+
+        out = client.post_json("/people/", {"address": {}}, status=400)
+        assert out["errors"] == {
+            "name": "'name' is a required property",
+            "address.city": "'city' is a required property",
+        }
+
+        resp = client.put("/people/", json=[{"name": "John"}, {"name": 1}])
+        assert resp.status_code == 400
+        assert resp.json["errors"] == {"1.name": "1 is not of type 'string'"}